@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Headless calculation package behind the Statistical Sample Size Calculator.
+
+Nothing in here imports PyQt5, so batch jobs and other tools can use the
+formulas without creating a QApplication.
+"""
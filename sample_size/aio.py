@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio API for the calculations.
+
+The solvers are CPU-bound (noncentral t/F solves, root finding, simulation)
+and would block an event loop if called directly. AsyncCalculator mirrors
+every calculation of the GUI as a coroutine that runs the solve on an
+executor instead:
+
+    calc = AsyncCalculator(max_concurrency=4)
+    n = await calc.oneway_sample(0.05, 0.80, 0.25, groups=3, timeout=2.0)
+
+At most max_concurrency calculations run at a time; the rest wait their
+turn without occupying an executor thread. Identical scalar requests that
+are in flight together are coalesced: the first starts the computation and
+later callers await the same result. Every call takes an optional timeout
+(asyncio.TimeoutError) and can be cancelled. A caller giving up never
+cancels a computation other callers are waiting for, and a computation
+that nobody waits for any more is dropped if it has not started yet (a solve
+already running on the executor finishes in the background; its result is
+still cached).
+
+Scalar results come back exactly as from the synchronous functions; array
+calls work too but are not coalesced.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sample_size import engine, curves, factorial, sequential, simulation, solver
+from sample_size.cache import make_key
+
+
+class _Flight:
+    """One computation in flight and the number of callers awaiting it."""
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+        self.started = False # Running on the executor (can no longer be cancelled)
+
+
+class AsyncCalculator:
+    """Coroutine versions of the calculations with bounded concurrency, timeouts and request coalescing."""
+
+    def __init__(self, max_concurrency=None, executor=None, timeout=None):
+        """
+        max_concurrency defaults to the CPU count. executor defaults to a thread
+        pool of that size (a ProcessPoolExecutor works as well); it is shut
+        down by close() only if it was created here. timeout is the default
+        per-call timeout in seconds (None = no limit).
+        """
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="async-calc")
+        self._semaphore = None # Created on first use, inside the running loop
+        self._flights = {}     # coalescing key -> _Flight
+        self.timeout = timeout
+        self.computations = 0  # Solves actually started
+        self.coalesced = 0     # Calls that joined a solve already in flight
+
+    async def run(self, func, *args, timeout=None, **kwargs):
+        """Run func(*args, **kwargs) on the executor; the building block of every calculation method."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        name = f"{func.__module__}.{func.__qualname__}"
+        key = make_key(name, *args, *sorted(kwargs.items()))
+        flight = self._flights.get(key) if key is not None else None
+        if flight is None:
+            flight = _Flight(None)
+            flight.task = asyncio.ensure_future(self._compute(flight, func, args, kwargs))
+            if key is not None:
+                self._flights[key] = flight
+                flight.task.add_done_callback(lambda _task: self._flights.pop(key, None))
+        else:
+            self.coalesced += 1
+        flight.waiters += 1
+        try:
+            # shield: a caller timing out or being cancelled must not cancel the shared computation
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout if timeout is not None else self.timeout)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                if not flight.started:
+                    flight.task.cancel() # Still queued for a slot: drop it
+                elif key is not None:
+                    # Running on, but a new identical request should not wait on an abandoned solve
+                    self._flights.pop(key, None)
+
+    async def _compute(self, flight, func, args, kwargs):
+        async with self._semaphore:
+            flight.started = True
+            self.computations += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, _call, func, args, kwargs)
+
+    def close(self):
+        """Shut down the executor if this calculator created it."""
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    # --- The calculations (same arguments as the synchronous functions, plus timeout) ---
+
+    async def indep_t_sample(self, alpha, power, effect, tails=engine.TWO_TAILED, timeout=None):
+        """N per group for the independent t-test."""
+        return await self.run(engine.indep_t_sample, alpha, power, effect, tails, timeout=timeout)
+
+    async def paired_t_sample(self, alpha, power, effect, tails=engine.TWO_TAILED, timeout=None):
+        """Number of pairs for the paired t-test."""
+        return await self.run(engine.paired_t_sample, alpha, power, effect, tails, timeout=timeout)
+
+    async def one_t_sample(self, alpha, power, effect, tails=engine.TWO_TAILED, timeout=None):
+        """N for the one-sample t-test."""
+        return await self.run(engine.one_t_sample, alpha, power, effect, tails, timeout=timeout)
+
+    async def oneway_sample(self, alpha, power, effect, groups, timeout=None):
+        """N per group for one-way ANOVA."""
+        return await self.run(engine.oneway_sample, alpha, power, effect, groups, timeout=timeout)
+
+    async def factorial_sample(self, alpha, power, f_effect, levels, max_order=None, timeout=None):
+        """FactorialResult for a factorial ANOVA design."""
+        return await self.run(factorial.sample_size, alpha, power, f_effect, tuple(levels), max_order, timeout=timeout)
+
+    async def pearson_sample(self, alpha, power, r, tails=engine.TWO_TAILED, timeout=None):
+        """N for a Pearson correlation."""
+        return await self.run(engine.pearson_sample, alpha, power, r, tails, timeout=timeout)
+
+    async def linear_reg_sample(self, alpha, power, f2, predictors, timeout=None):
+        """Total N for multiple linear regression (exact noncentral F)."""
+        return await self.run(engine.linear_reg_sample, alpha, power, f2, predictors, timeout=timeout)
+
+    async def logistic_reg_sample(self, alpha, power, odds_ratio, p1, r2_other=0.0, timeout=None):
+        """Total N for logistic regression (Hsieh et al.)."""
+        return await self.run(engine.logistic_reg_sample, alpha, power, odds_ratio, p1, r2_other, timeout=timeout)
+
+    async def chi_ind_sample(self, alpha, power, w, df, timeout=None):
+        """Total N for the chi-square test."""
+        return await self.run(engine.chi_ind_sample, alpha, power, w, df, timeout=timeout)
+
+    async def achieved_power(self, test_type, alpha, n, effect, design=None, timeout=None):
+        """Power of an Advanced-tab test type at sample size n."""
+        return await self.run(solver.power, test_type, alpha, n, effect, design, timeout=timeout)
+
+    async def sample_size(self, test_type, alpha, power, effect, design=None, timeout=None):
+        """Smallest sample size of an Advanced-tab test type reaching the power."""
+        return await self.run(solver.sample_size, test_type, alpha, power, effect, design, timeout=timeout)
+
+    async def mdes(self, test_type, alpha, power, n, design=None, timeout=None):
+        """Minimum detectable effect of an Advanced-tab test type at sample size n."""
+        return await self.run(solver.mdes, test_type, alpha, power, n, design, timeout=timeout)
+
+    async def power_vs_n(self, test_type, alpha, effect, n_max, points, design=None, timeout=None):
+        """(n, power) curve arrays."""
+        return await self.run(curves.power_vs_n, test_type, alpha, effect, n_max, points, design, timeout=timeout)
+
+    async def power_vs_effect(self, test_type, alpha, n, effect_max, points, design=None, timeout=None):
+        """(effect, power) curve arrays."""
+        return await self.run(curves.power_vs_effect, test_type, alpha, n, effect_max, points, design, timeout=timeout)
+
+    async def sequential_sample_size(self, test_type, alpha, power, effect, design=None,
+                                     looks=sequential.DEFAULT_LOOKS, boundary=sequential.DEFAULT_BOUNDARY, sides=2,
+                                     timeout=None):
+        """SequentialSampleSize of a group-sequential design."""
+        return await self.run(sequential.sample_size, test_type, alpha, power, effect, design,
+                              tuple(looks) if isinstance(looks, list) else looks, boundary, sides, timeout=timeout)
+
+    async def simulate_linear_reg_power(self, alpha, n, f2, predictors, distribution="Normal", seed=None, timeout=None):
+        """Simulated power of a linear regression."""
+        return await self.run(simulation.linear_reg_power, alpha, n, f2, predictors, distribution, seed=seed,
+                              timeout=timeout)
+
+    async def simulate_logistic_reg_power(self, alpha, n, odds_ratio, p1, r2_other=0.0, distribution="Normal",
+                                          seed=None, timeout=None):
+        """Simulated power of a logistic regression."""
+        return await self.run(simulation.logistic_reg_power, alpha, n, odds_ratio, p1, r2_other, distribution,
+                              seed=seed, timeout=timeout)
+
+
+def _call(func, args, kwargs):
+    return func(*args, **kwargs)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Cost-optimal allocation between the two groups of the independent t-test.
+
+When a subject costs cost1 in group 1 and cost2 in group 2, equal groups
+are not the cheapest design. For the normal approximation the optimum ratio
+n2 / n1 is sqrt(cost1 / cost2), whether the goal is the cheapest design
+reaching a power (min_cost) or the most powerful design within a budget
+(max_power). With whole subjects and the exact noncentral t the best
+integer design can sit slightly off that ratio, so both functions search a
+grid of candidate ratios around it: every design x candidate pair is one
+element of a single vectorized engine call, and the best candidate is
+picked per design. For min_cost each candidate's group 1 size is then
+paired with the smallest group 2 reaching the power, so every candidate is
+on the cost frontier, and the group sizes next to the winner's are tried
+as well. cost1, cost2, budget, alpha, power and d broadcast
+against each other, so a whole cost table evaluates in one call.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+
+SPREAD = 3.0          # Candidate ratios go from optimum / SPREAD to optimum * SPREAD
+CANDIDATES = 61       # ... on a geometric grid (odd, so the analytic optimum is one of them)
+MAX_RATIO = 100.0
+POLISH = 3            # min_cost also tries group sizes up to this far from the best candidate's
+
+# ratio: n2 / n1 of the chosen design; n1, n2, total_n: its group sizes; cost and power: what it costs and achieves
+Allocation = namedtuple("Allocation", ["ratio", "n1", "n2", "total_n", "cost", "power"])
+
+
+def optimal_ratio(cost1, cost2):
+    """n2 / n1 minimizing the cost of a given power (normal approximation): sqrt(cost1 / cost2)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.sqrt(np.asarray(cost1, dtype=float) / np.asarray(cost2, dtype=float))
+    return np.where(np.isfinite(ratio) & (ratio > 0), ratio, np.nan)
+
+
+def candidate_ratios(cost1, cost2, ratios=None):
+    """Candidate ratios per design, shape (..., candidates): a grid around optimal_ratio() or the given ratios."""
+    if ratios is not None:
+        ratios = np.asarray(ratios, dtype=float)
+        return np.broadcast_to(ratios, np.broadcast(np.asarray(cost1), np.asarray(cost2)).shape + ratios.shape)
+    steps = np.geomspace(1 / SPREAD, SPREAD, CANDIDATES)
+    return np.clip(optimal_ratio(cost1, cost2)[..., None] * steps, 1 / MAX_RATIO, MAX_RATIO)
+
+
+def _best(score, *arrays):
+    """Per design, the candidate with the highest score (NaN scores never win); arrays are picked along."""
+    score = np.where(np.isnan(score), -np.inf, score)
+    pick = np.argmax(score, axis=-1)[..., None]
+    found = np.isfinite(np.take_along_axis(score, pick, axis=-1)[..., 0])
+    return [np.where(found, np.take_along_axis(np.broadcast_to(a, score.shape), pick, axis=-1)[..., 0], np.nan)
+            for a in arrays]
+
+
+def _smallest_n2(alpha, power, d, tails, n1, n2):
+    """
+    Smallest group 2 size reaching the power with n1 in group 1, walking from n2
+    (power is symmetric in the groups, so this works the other way round too).
+    """
+    alpha, power, d, tails, n1, n2 = np.broadcast_arrays(alpha, power, d, np.asarray(tails), n1, n2)
+    shape = n1.shape
+    alpha, power, d, tails, n1, n2 = (np.ravel(v) for v in (alpha, power, d, tails, n1, n2))
+    valid = np.isfinite(n1) & np.isfinite(n2)
+    result = np.full(n1.shape, np.nan)
+    if valid.any():
+        result[valid] = engine._refine_integer_n(
+            lambda m, a, n, e, t: engine.indep_t_power(a, n, e, t, target=None, ratio=m / n), power[valid],
+            n2[valid], 2, (alpha[valid], n1[valid], d[valid], tails[valid]))
+    return result.reshape(shape)
+
+
+def min_cost(alpha, power, d, cost1, cost2, tails=engine.TWO_TAILED, ratios=None):
+    """Cheapest design reaching the target power; returns an Allocation of arrays (NaN where none does)."""
+    alpha, power, d, cost1, cost2 = (np.asarray(v, dtype=float)[..., None]
+                                     for v in (alpha, power, d, cost1, cost2))
+    ratio = candidate_ratios(cost1[..., 0], cost2[..., 0], ratios)
+    n1 = engine.indep_t_sample(alpha, power, d, tails, ratio) # Every design x candidate at once
+    n2 = _smallest_n2(alpha, power, d, tails, n1, engine.second_group_n(n1, ratio))
+    # Among equally cheap candidates, prefer the smaller total N
+    n1, n2 = _best(-(cost1 * n1 + cost2 * n2 + 1e-9 * (n1 + n2)), n1, n2)
+    # The cheapest whole-subject design can fall between two candidates (a subject of an expensive
+    # small group is worth several of the other): fix either group near the winner, solve the other
+    offsets = np.arange(-POLISH, POLISH + 1)
+    fixed1 = np.maximum(n1[..., None] + offsets, 2)
+    fixed2 = np.maximum(n2[..., None] + offsets, 2)
+    n1 = np.concatenate([fixed1, _smallest_n2(alpha, power, d, tails, fixed2, n1[..., None])], axis=-1)
+    n2 = np.concatenate([_smallest_n2(alpha, power, d, tails, fixed1, n2[..., None]), fixed2], axis=-1)
+    cost = cost1 * n1 + cost2 * n2
+    ratio, n1, n2, cost = _best(-(cost + 1e-9 * (n1 + n2)), n2 / n1, n1, n2, cost)
+    achieved = engine.indep_t_power(alpha[..., 0], n1, d[..., 0], tails, ratio=ratio)
+    return Allocation(ratio, n1, n2, n1 + n2, cost, achieved)
+
+
+def max_power(alpha, budget, d, cost1, cost2, tails=engine.TWO_TAILED, ratios=None):
+    """
+    Most powerful design within the budget; returns an Allocation of arrays
+    (NaN where the budget cannot buy 2 subjects per group). Each candidate
+    ratio fixes n1, and group 2 gets whatever budget is left.
+    """
+    alpha, budget, d, cost1, cost2 = (np.asarray(v, dtype=float)[..., None]
+                                      for v in (alpha, budget, d, cost1, cost2))
+    ratio = candidate_ratios(cost1[..., 0], cost2[..., 0], ratios)
+
+    def spend(n1=None, n2=None):
+        """Fix one group's size and give the rest of the budget to the other."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if n1 is None:
+                n1 = np.floor((budget - cost2 * n2) / cost1 + 1e-9)
+            else:
+                n2 = np.floor((budget - cost1 * n1) / cost2 + 1e-9)
+        valid = (n1 >= 2) & (n2 >= 2) & (cost1 > 0) & (cost2 > 0)
+        n1, n2 = np.where(valid, n1, np.nan), np.where(valid, n2, np.nan)
+        power = engine.indep_t_power(alpha, n1, d, tails, ratio=n2 / n1)
+        return power - 1e-12 * (cost1 * n1 + cost2 * n2) / budget, n1, n2 # Ties: prefer the cheaper design
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score, n1, n2 = spend(n1=np.floor(budget / (cost1 + cost2 * ratio) + 1e-9))
+    n1, n2 = _best(score, n1, n2)
+    # As in min_cost, try the group sizes next to the winner's
+    offsets = np.arange(-POLISH, POLISH + 1)
+    candidates = [spend(n1=n1[..., None] + offsets), spend(n2=n2[..., None] + offsets)]
+    score, n1, n2 = (np.concatenate(parts, axis=-1) for parts in zip(*candidates))
+    n1, n2 = _best(score, n1, n2)
+    power = engine.indep_t_power(alpha[..., 0], n1, d[..., 0], tails, ratio=n2 / n1)
+    return Allocation(n2 / n1, n1, n2, n1 + n2, cost1[..., 0] * n1 + cost2[..., 0] * n2, power)
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Batch planning mode: stream a CSV/Parquet file of design points through the engine.
+
+Each input row describes one design (test, alpha, power, effect and whatever
+design parameters the test needs). The file is read in chunks, every chunk
+is split by test and each part goes through the vectorized engine function
+in a single call, and the results are appended to the output file before the
+next chunk is read, so memory use is bounded by the chunk size.
+
+Usage:
+    python sample_size_calculator.py batch designs.csv results.csv
+    python -m sample_size.batch designs.parquet results.parquet --chunk-size 200000
+
+Parquet support needs pyarrow; CSV only needs the standard library.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+from sample_size import engine
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Test name -> (engine function, design columns passed after alpha, power, effect, total N multiplier column)
+# The multiplier column turns a per-group result into a total N (None = result already is the total);
+# a function gets n and the design columns and returns the total.
+TESTS = {
+    "indep_t": (engine.indep_t_sample, ("tails", "ratio"), # ratio = n2 / n1, n is group 1
+                lambda n, tails, ratio: n + engine.second_group_n(n, ratio)),
+    "paired_t": (engine.paired_t_sample, ("tails",), None),
+    "one_t": (engine.one_t_sample, ("tails",), None),
+    "oneway": (engine.oneway_sample, ("groups",), "groups"),
+    "anova_effect": (engine.anova_cell_sample, ("df_num", "cells"), "cells"), # One effect of a factorial design, n per cell
+    "pearson": (engine.pearson_sample, ("tails",), None),
+    "linear_reg": (engine.linear_reg_sample, ("predictors",), None),
+    "logistic_reg": (engine.logistic_reg_sample, ("p1", "r2_other"), None), # effect = odds ratio
+    "chi_ind": (engine.chi_ind_sample, ("df",), None),
+}
+
+TEXT_COLUMNS = ("test", "tails")
+TEXT_CHOICES = {"tails": (engine.TWO_TAILED, engine.ONE_TAILED)} # Other values give NaN, like bad numbers
+COLUMN_DEFAULTS = {"tails": engine.TWO_TAILED, "r2_other": 0.0, "ratio": 1.0}
+
+
+# --- Readers / writers ---
+
+def _iter_csv(path, chunk_size):
+    fh = open(path, newline="")
+    reader = csv.reader(fh)
+    header = next(reader, None) # Read now, so an empty file fails before any output is written
+    if header is None:
+        fh.close()
+        raise ValueError(f"{path} is empty: expected a header row (test, alpha, power, effect, ...)")
+    return _csv_chunks(fh, reader, header, chunk_size)
+
+
+def _csv_chunks(fh, reader, header, chunk_size):
+    with fh:
+        width = len(header)
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+            # Ragged rows are fitted to the header (missing cells empty, extra cells dropped, as csv.DictReader
+            # does), so one bad line cannot shorten the columns of the whole chunk
+            rows = [row if len(row) == width else (row + [""] * width)[:width] for row in rows]
+            yield {name: np.array(col, dtype=str) for name, col in zip(header, zip(*rows))}
+
+
+def _iter_parquet(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Reading Parquet files requires pyarrow (pip install pyarrow)")
+    for record_batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield {name: col.to_numpy(zero_copy_only=False) for name, col in zip(record_batch.schema.names, record_batch.columns)}
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the input file as dicts of column name -> array, chunk_size rows at a
+    time. A CSV file without a header row raises ValueError right away.
+    """
+    if path.lower().endswith(".parquet"):
+        return _iter_parquet(path, chunk_size)
+    return _iter_csv(path, chunk_size)
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self._fh = open(path, "w", newline="")
+        self._writer = csv.writer(self._fh)
+        self._header = None
+
+    def write(self, columns):
+        if self._header is None:
+            self._header = list(columns)
+            self._writer.writerow(self._header)
+        self._writer.writerows(zip(*(columns[name] for name in self._header)))
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Writing Parquet files requires pyarrow (pip install pyarrow)")
+        self._pa, self._pq = pa, pq
+        self._path = path
+        self._writer = None
+
+    def write(self, columns):
+        table = self._pa.table(columns)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path):
+    """Incremental writer chosen by file extension (.parquet or CSV)."""
+    if path.lower().endswith(".parquet"):
+        return _ParquetWriter(path)
+    return _CsvWriter(path)
+
+
+# --- Computation ---
+
+def _column(columns, name, size):
+    """Fetch a column as float (or str for text columns), filling defaults for missing ones."""
+    text = name in TEXT_COLUMNS
+    default = COLUMN_DEFAULTS.get(name, "" if text else np.nan)
+    if name not in columns:
+        return np.full(size, default, dtype=object if text else float)
+    col = columns[name]
+    if text:
+        if col.dtype == object:
+            col = np.where(col == None, "", col) # Parquet nulls  # noqa: E711
+        col = col.astype(str)
+        return np.where(col == "", default, col)
+    col = _to_float(col)
+    return col if np.isnan(default) else np.where(np.isnan(col), default, col) # Empty cells get the column's default
+
+
+def _parse_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+def _to_float(col):
+    """Numeric column as float; empty, null and non-numeric cells become NaN (so their rows give NaN)."""
+    if col.dtype.kind in "biuf":
+        return col.astype(float)
+    if col.dtype == object:
+        col = np.where(col == None, "", col).astype(str) # Parquet nulls  # noqa: E711
+    col = np.where(col == "", "nan", col)
+    try:
+        return col.astype(float)
+    except ValueError: # Parse the distinct values one by one; columns hold few of them
+        values, index = np.unique(col, return_inverse=True)
+        return np.array([_parse_float(value) for value in values])[index.reshape(col.shape)]
+
+
+def compute_chunk(columns):
+    """
+    Compute n and total N for every row of a chunk.
+
+    Rows are grouped by test so each test costs one vectorized engine call.
+    Unknown tests and invalid inputs give NaN.
+    """
+    size = len(next(iter(columns.values())))
+    converted = {}
+
+    def get(name):
+        if name not in converted:
+            converted[name] = _column(columns, name, size)
+        return converted[name]
+
+    tests = get("test")
+    n = np.full(size, np.nan)
+    n_total = np.full(size, np.nan)
+    for test in np.unique(tests):
+        if test not in TESTS:
+            continue
+        func, design_columns, multiplier = TESTS[test]
+        rows = tests == test
+        for name in design_columns:
+            if name in TEXT_CHOICES:
+                rows &= np.isin(get(name), TEXT_CHOICES[name])
+        if not rows.any():
+            continue
+        args = [get(name)[rows] for name in ("alpha", "power", "effect") + design_columns]
+        n[rows] = func(*args)
+        if multiplier is None:
+            n_total[rows] = n[rows]
+        elif callable(multiplier):
+            n_total[rows] = multiplier(n[rows], *args[3:])
+        elif isinstance(multiplier, str):
+            n_total[rows] = n[rows] * get(multiplier)[rows]
+        else:
+            n_total[rows] = n[rows] * multiplier
+    return n, n_total
+
+
+def run_batch(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, report=None):
+    """
+    Stream input_path through the engine into output_path.
+
+    report(rows_done, seconds) is called after every chunk. Returns the total
+    number of rows and the elapsed wall time.
+    """
+    start = time.perf_counter()
+    rows_done = 0
+    chunks = read_chunks(input_path, chunk_size)
+    writer = open_writer(output_path)
+    try:
+        for columns in chunks:
+            n, n_total = compute_chunk(columns)
+            columns["n"] = n
+            columns["n_total"] = n_total
+            writer.write(columns)
+            rows_done += len(n)
+            if report is not None:
+                report(rows_done, time.perf_counter() - start)
+    finally:
+        writer.close()
+    return rows_done, time.perf_counter() - start
+
+
+def _print_progress(rows_done, seconds):
+    rate = rows_done / seconds if seconds > 0 else float("inf")
+    print(f"{rows_done:,} rows in {seconds:.2f} s ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="sample_size_calculator.py batch",
+        description="Compute sample sizes for every row of a CSV/Parquet file. "
+                    "Columns: test (" + ", ".join(TESTS) + "), alpha, power, effect, "
+                    "plus tails / ratio / groups / df_num / cells / predictors / df / p1 / r2_other as the test needs.")
+    parser.add_argument("input", help="Input .csv or .parquet file")
+    parser.add_argument("output", help="Output .csv or .parquet file (n and n_total columns are appended)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk (default: %(default)s)")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        parser.error(f"input file not found: {args.input}")
+    try:
+        rows_done, seconds = run_batch(args.input, args.output, args.chunk_size,
+                                       report=None if args.quiet else _print_progress)
+    except ValueError as e: # Empty input
+        parser.exit(1, f"{parser.prog}: error: {e}\n")
+    print("Done: ", end="", file=sys.stderr)
+    _print_progress(rows_done, seconds)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
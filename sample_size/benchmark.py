@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for every calculation path, with regression tracking.
+
+Each calculation is timed in up to three modes:
+
+    cold     one scalar design, result cache cleared before every call (the real solve)
+    warm     the same design again, answered from the result cache
+    batched  one vectorized call over BATCH_SIZE random designs (the batch mode / server path)
+
+plus the GUI's startup time (window shown, from --profile-startup in a
+child process). Every timing is the median of repeated runs. Results are
+written as JSON; given a baseline file from an earlier run, any timing more
+than --threshold slower than its baseline (and slower by more than the
+noise floor) is reported as a regression and the exit status is 1.
+
+Usage:
+    python -m sample_size.benchmark --save-baseline bench_baseline.json
+    python -m sample_size.benchmark --baseline bench_baseline.json --output bench.json
+    python -m sample_size.benchmark --only oneway,chi_ind --skip-gui
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from sample_size import curves, engine, factorial, sequential, simulation, solver, tables
+from sample_size.cache import RESULT_CACHE
+
+BATCH_SIZE = 10_000
+DEFAULT_THRESHOLD = 0.25  # Fail when a timing is more than 25% slower than its baseline
+NOISE_FLOOR_S = 20e-6     # ... and slower by more than this (microsecond timings jitter)
+MIN_TIME_S = 0.2          # Repeat each measurement for at least this long
+GUI_RUNS = 3
+
+
+def _uniform(rng, size, lo, hi):
+    return rng.uniform(lo, hi, size)
+
+
+def _alpha_power(rng, size):
+    return rng.choice([0.01, 0.05, 0.1], size), _uniform(rng, size, 0.6, 0.95)
+
+
+# name -> (function, scalar arguments, batched arguments(rng, size) or None)
+CASES = {
+    "indep_t": (engine.indep_t_sample, (0.05, 0.80, 0.5),
+                lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.1, 1.0))),
+    "paired_t": (engine.paired_t_sample, (0.05, 0.80, 0.5),
+                 lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.1, 1.0))),
+    "one_t": (engine.one_t_sample, (0.05, 0.80, 0.5),
+              lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.1, 1.0))),
+    "oneway": (engine.oneway_sample, (0.05, 0.80, 0.25, 3),
+               lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.1, 0.5), rng.integers(2, 7, size))),
+    "factorial": (factorial.sample_size, (0.05, 0.80, 0.25, (2, 3, 2)), None),
+    "anova_effect": (engine.anova_cell_sample, (0.05, 0.80, 0.25, 2, 12),
+                     lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.1, 0.5),
+                                        rng.integers(1, 6, size), rng.integers(6, 25, size))),
+    "pearson": (engine.pearson_sample, (0.05, 0.80, 0.3),
+                lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.05, 0.5))),
+    "linear_reg": (engine.linear_reg_sample, (0.05, 0.80, 0.15, 3),
+                   lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.02, 0.35), rng.integers(1, 10, size))),
+    "logistic_reg": (engine.logistic_reg_sample, (0.05, 0.80, 2.0, 0.3, 0.1),
+                     lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 1.2, 3.0),
+                                        _uniform(rng, size, 0.1, 0.5), _uniform(rng, size, 0.0, 0.5))),
+    "chi_ind": (engine.chi_ind_sample, (0.05, 0.80, 0.3, 1),
+                lambda rng, size: (*_alpha_power(rng, size), _uniform(rng, size, 0.1, 0.5), rng.integers(1, 7, size))),
+    "achieved_power": (solver.power, ("ANOVA (One-way)", 0.05, 40, 0.25, 3),
+                       lambda rng, size: ("ANOVA (One-way)", rng.choice([0.01, 0.05, 0.1], size),
+                                          rng.integers(5, 200, size), _uniform(rng, size, 0.1, 0.5),
+                                          rng.integers(2, 7, size))),
+    "mdes": (solver.mdes, ("Chi-Square", 0.05, 0.80, 100, 2),
+             lambda rng, size: ("Chi-Square", *_alpha_power(rng, size), rng.integers(20, 500, size),
+                                rng.integers(1, 6, size))),
+    "solver_sample": (solver.sample_size, ("Linear Regression", 0.05, 0.80, 0.15, 3),
+                      lambda rng, size: ("Linear Regression", *_alpha_power(rng, size),
+                                         _uniform(rng, size, 0.02, 0.35), rng.integers(1, 10, size))),
+    # A few distinct alpha / power pairs, as in a sweep over effect sizes (each pair is one boundary solve)
+    "sequential": (sequential.sample_size, ("T-Test (Independent)", 0.05, 0.90, 0.5),
+                   lambda rng, size: ("T-Test (Independent)", rng.choice([0.01, 0.05, 0.1], size),
+                                      rng.choice([0.8, 0.9], size), _uniform(rng, size, 0.1, 1.0))),
+    "curve": (curves.power_vs_n, ("T-Test (Independent)", 0.05, 0.3, 500, 1000), None),
+    "simulation": (lambda *args: simulation.linear_reg_power(*args, seed=1, workers=1, max_replications=2000,
+                                                             ci_half_width=0),
+                   (0.05, 77, 0.15, 3), None),
+}
+
+
+def _measure(func, setup=None, min_time=MIN_TIME_S, max_reps=10_000):
+    """Median and minimum seconds of func() over repeated runs (setup() runs untimed before each)."""
+    times = []
+    total = 0.0
+    while (total < min_time or len(times) < 3) and len(times) < max_reps:
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    return {"median_s": statistics.median(times), "min_s": min(times), "reps": len(times)}
+
+
+def run_calculations(names=None, min_time=MIN_TIME_S, report=None):
+    """Time the calculation CASES (all, or just names); returns {"<case>/<mode>": timing}."""
+    rng = np.random.default_rng(0)
+    results = {}
+    for name, (func, args, batched) in CASES.items():
+        if names and name not in names:
+            continue
+        call = lambda: func(*args)  # noqa: E731
+        func(*args) # Load whatever the path imports / reads (scipy distributions, tables)
+        results[f"{name}/cold"] = _measure(call, RESULT_CACHE.clear, min_time)
+        if hasattr(func, "cache_name"): # Memoized: time a cache hit
+            results[f"{name}/warm"] = _measure(call, None, min_time)
+        if batched is not None:
+            batch_args = batched(rng, BATCH_SIZE)
+            timing = _measure(lambda: func(*batch_args), None, min_time)
+            timing["per_design_s"] = timing["median_s"] / BATCH_SIZE
+            results[f"{name}/batched"] = timing
+        if report is not None:
+            report(name, {k: v for k, v in results.items() if k.startswith(name + "/")})
+    return results
+
+
+def run_gui_startup(runs=GUI_RUNS):
+    """Median window-shown and warm-up times of the GUI in a child process, or None if it cannot start."""
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_size_calculator.py")
+    env = dict(os.environ)
+    if "DISPLAY" not in env and "WAYLAND_DISPLAY" not in env and sys.platform.startswith("linux"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    shown, warmed = [], []
+    for _ in range(runs):
+        try:
+            proc = subprocess.run([sys.executable, script, "--profile-startup"], env=env, capture_output=True,
+                                  text=True, timeout=120)
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        milestones = dict(re.findall(r"^\s+(.+?)\s+([\d.]+)$", proc.stderr, re.MULTILINE))
+        if "window shown" not in milestones:
+            return None # PyQt5 missing or no usable display
+        shown.append(float(milestones["window shown"]))
+        warmed.append(float(milestones.get("numerics warmed up", "nan")))
+    return {"gui/window_shown": {"median_s": statistics.median(shown), "min_s": min(shown), "reps": runs},
+            "gui/numerics_warmed_up": {"median_s": statistics.median(warmed), "min_s": min(warmed), "reps": runs}}
+
+
+def environment():
+    import scipy
+    return {"python": platform.python_version(), "numpy": np.__version__, "scipy": scipy.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(), "tables": tables.load() is not None,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, noise_floor=NOISE_FLOOR_S):
+    """(name, current, baseline, ratio, regressed) for every timing present in both runs."""
+    rows = []
+    for name, timing in results.items():
+        if name not in baseline:
+            continue
+        current, before = timing["median_s"], baseline[name]["median_s"]
+        ratio = current / before if before > 0 else float("inf")
+        regressed = ratio > 1 + threshold and current - before > noise_floor
+        rows.append((name, current, before, ratio, regressed))
+    return rows
+
+
+def _format_seconds(seconds):
+    if seconds != seconds:
+        return "n/a"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sample_size.benchmark",
+                                     description="Time every calculation path and compare against a baseline.")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON from an earlier run; exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="write the results as a new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default %(default)s)")
+    parser.add_argument("--only", help="comma-separated case names (default: all of " + ", ".join(CASES) + ")")
+    parser.add_argument("--skip-gui", action="store_true", help="don't time the GUI startup")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME_S, help="seconds per measurement")
+    args = parser.parse_args(argv)
+
+    names = set(args.only.split(",")) if args.only else None
+    unknown = (names or set()) - set(CASES)
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    def report(name, timings):
+        parts = [f"{key.split('/')[1]} {_format_seconds(t['median_s'])}" for key, t in timings.items()]
+        print(f"{name:<16} " + "   ".join(parts), file=sys.stderr, flush=True)
+
+    results = run_calculations(names, args.min_time, report)
+    if not args.skip_gui and not names:
+        gui = run_gui_startup()
+        if gui is None:
+            print("gui              skipped (PyQt5 or a display is not available)", file=sys.stderr)
+        else:
+            results.update(gui)
+            report("gui", gui)
+
+    document = {"environment": environment(), "threshold": args.threshold, "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as fh:
+                json.dump(document, fh, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)["results"]
+    rows = compare(results, baseline, args.threshold)
+    regressions = [row for row in rows if row[4]]
+    print(f"\n{'timing':<28}{'now':>12}{'baseline':>12}{'ratio':>8}", file=sys.stderr)
+    for name, current, before, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<28}{_format_seconds(current):>12}{_format_seconds(before):>12}{ratio:>8.2f}{flag}",
+              file=sys.stderr)
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} in {len(rows)} timings", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded, thread-safe LRU cache for calculation results.
+
+The engine's public functions are wrapped with memoize(), so repeated
+single-design calls (the GUI re-clicking Calculate, a script asking for the
+same design twice) are answered from the cache instead of re-running
+norm.ppf or an iterative solver. Keys are the calculation name plus its
+normalized arguments: defaults filled in, NumPy scalars turned into Python
+numbers and floats rounded to 12 significant digits, so 0.05 and
+np.float64(0.05) share an entry.
+
+Only all-scalar calls are cached (tuples of scalars count as scalars); array
+calls are already vectorized and go straight through. The default size can be set with SAMPLE_SIZE_CACHE_SIZE
+(0 disables caching).
+"""
+
+import functools
+import inspect
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from sample_size import instrument
+
+DEFAULT_MAXSIZE = int(os.environ.get("SAMPLE_SIZE_CACHE_SIZE", "4096"))
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "size", "maxsize"])
+
+_MISSING = object()
+
+
+class ResultCache:
+    """LRU mapping from normalized calculation inputs to results, safe to share between threads."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = max(int(maxsize), 0)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if self._maxsize == 0:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False) # Evict the least recently used entry
+
+    def resize(self, maxsize):
+        """Change the capacity, evicting the oldest entries if it shrinks."""
+        with self._lock:
+            self._maxsize = max(int(maxsize), 0)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, len(self._data), self._maxsize)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Shared by the GUI, the batch mode and any other caller of the engine
+RESULT_CACHE = ResultCache()
+
+
+def cache_info():
+    """Hit/miss counters and size of the shared result cache."""
+    return RESULT_CACHE.info()
+
+
+def configure(maxsize):
+    """Resize the shared result cache (0 disables it)."""
+    RESULT_CACHE.resize(maxsize)
+
+
+def _normalize(value):
+    """Hashable, canonical form of one scalar argument (or tuple of scalars), or _MISSING otherwise."""
+    if isinstance(value, str) or value is None:
+        return value
+    if isinstance(value, tuple): # e.g. the levels of a factorial design
+        items = tuple(_normalize(item) for item in value)
+        return _MISSING if _MISSING in items else items
+    if np.ndim(value) != 0:
+        return _MISSING
+    value = np.asarray(value).item()
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, float):
+        return float(f"{value:.12g}")
+    return _MISSING
+
+
+def _freeze(result):
+    """Make array results read-only so a cached value cannot be changed by a caller."""
+    if isinstance(result, tuple):
+        items = [_freeze(item) for item in result]
+        return result._make(items) if hasattr(result, "_fields") else tuple(items) # Keep namedtuples
+    if isinstance(result, np.ndarray):
+        result.setflags(write=False)
+    return result
+
+
+def make_key(name, *values):
+    """Cache key for a calculation name and its inputs, or None unless every input is a scalar."""
+    key = (name,) + tuple(_normalize(value) for value in values)
+    return None if _MISSING in key else key
+
+
+def memoize(name, cache=None):
+    """Decorator caching all-scalar calls of a calculation under the given name."""
+    def decorator(func):
+        signature = inspect.signature(func)
+        defaults = tuple(p.default for p in signature.parameters.values())
+
+        def lookup(args, kwargs):
+            target = RESULT_CACHE if cache is None else cache
+            if kwargs:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                values = tuple(bound.arguments.values())
+            else:
+                values = args + defaults[len(args):] # Positional call: fill in the defaults directly
+            key = make_key(name, *values)
+            if key is None:
+                return func(*args, **kwargs) # Array call: already vectorized, not cached
+            result = target.get(key, _MISSING)
+            if result is _MISSING:
+                instrument.count("cache_misses")
+                result = _freeze(func(*args, **kwargs))
+                target.put(key, result)
+            else:
+                instrument.count("cache_hits")
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if instrument.enabled:
+                with instrument.span(name):
+                    return lookup(args, kwargs)
+            return lookup(args, kwargs)
+
+        wrapper.cache_name = name
+        return wrapper
+    return decorator
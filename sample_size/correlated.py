@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Sample sizes for correlated observations: cluster-randomized trials and repeated measures.
+
+Cluster-randomized trials randomize whole clusters (schools, clinics,
+villages) of subjects whose outcomes correlate with the intraclass
+correlation icc. Analysed on cluster means, each arm is a sample of
+clusters whose means have variance sigma^2 * DE / m, with mean cluster size
+m and design effect DE = 1 + ((1 + cv^2) m - 1) icc, cv being the
+coefficient of variation of the cluster sizes (Eldridge et al. 2006; cv = 0
+for equal clusters). A trial of k clusters per arm is then the independent
+t-test (or one-way ANOVA) of k observations per group with the effect size
+scaled by sqrt(m / DE), so the engine's exact solvers give the number of
+clusters directly, with the cluster-level degrees of freedom. Every
+argument broadcasts and table() lays ICC x cluster size x effect out as
+one vectorized call.
+
+Repeated-measures ANOVA follows G*Power: subjects in `groups` groups are
+measured `measures` times with correlation corr between measures. With
+u = measures / (1 - corr) the within-subject and interaction effects have
+noncentrality f^2 u N epsilon and (measures - 1) epsilon numerator df, where
+epsilon in [1 / (measures - 1), 1] is the Greenhouse-Geisser correction for
+nonsphericity; the between-subject effect has f^2 N measures / (1 + (measures
+- 1) corr) and groups - 1 df.
+
+Invalid inputs (ICC outside [0, 1), epsilon out of range, ...) give NaN as in
+the engine.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+RM_EFFECTS = ("Within", "Between", "Interaction")
+
+# clusters: clusters per arm (group 1 for unequal allocation); subjects: clusters * mean cluster size
+ClusterSampleSize = namedtuple("ClusterSampleSize", ["clusters", "subjects", "design_effect"])
+
+# Axis values and results laid out as (icc, cluster_size, effect)
+ClusterTable = namedtuple("ClusterTable", ["icc", "cluster_size", "effect", "clusters", "subjects", "design_effect"])
+
+
+@memoize("design_effect")
+def design_effect(icc, cluster_size, cv=0.0):
+    """Variance inflation of a cluster design: 1 + ((1 + cv^2) m - 1) icc (NaN for invalid inputs)."""
+    icc, m, cv = (np.asarray(v, dtype=float) for v in (icc, cluster_size, cv))
+    valid = (icc >= 0) & (icc < 1) & (m >= 1) & (cv >= 0)
+    return np.where(valid, 1 + ((1 + cv ** 2) * m - 1) * icc, np.nan)
+
+
+def _cluster_effect(effect, icc, cluster_size, cv):
+    """Effect size on the scale of the cluster means, and the design effect."""
+    de = design_effect(icc, cluster_size, cv)
+    return np.asarray(effect, dtype=float) * np.sqrt(np.asarray(cluster_size, dtype=float) / de), de
+
+
+def _result(clusters, cluster_size, de):
+    return ClusterSampleSize(clusters, clusters * np.asarray(cluster_size, dtype=float), de)
+
+
+@memoize("cluster_t_power")
+def cluster_t_power(alpha, clusters, d, icc, cluster_size, cv=0.0, tails=engine.TWO_TAILED, ratio=1.0):
+    """Power of a two-arm cluster-randomized trial with clusters per arm (group 1) and Cohen's d."""
+    d_cluster, _ = _cluster_effect(d, icc, cluster_size, cv)
+    return engine.indep_t_power(alpha, clusters, d_cluster, tails, ratio=ratio)
+
+
+@memoize("cluster_t_sample")
+def cluster_t_sample(alpha, power, d, icc, cluster_size, cv=0.0, tails=engine.TWO_TAILED, ratio=1.0):
+    """Clusters per arm for a two-arm cluster-randomized trial; returns a ClusterSampleSize."""
+    d_cluster, de = _cluster_effect(d, icc, cluster_size, cv)
+    return _result(engine.indep_t_sample(alpha, power, d_cluster, tails, ratio), cluster_size, de)
+
+
+@memoize("cluster_anova_power")
+def cluster_anova_power(alpha, clusters, f_effect, groups, icc, cluster_size, cv=0.0):
+    """Power of a cluster-randomized trial with groups arms of clusters clusters each and Cohen's f."""
+    f_cluster, _ = _cluster_effect(f_effect, icc, cluster_size, cv)
+    return engine.oneway_power(alpha, np.asarray(clusters, dtype=float) * groups, f_cluster, groups)
+
+
+@memoize("cluster_anova_sample")
+def cluster_anova_sample(alpha, power, f_effect, groups, icc, cluster_size, cv=0.0):
+    """Clusters per arm for a cluster-randomized trial with groups arms; returns a ClusterSampleSize."""
+    f_cluster, de = _cluster_effect(f_effect, icc, cluster_size, cv)
+    return _result(engine.oneway_sample(alpha, power, f_cluster, groups), cluster_size, de)
+
+
+def table(alpha, power, effect, icc, cluster_size, cv=0.0, groups=2):
+    """
+    Clusters per arm over every ICC x cluster size x effect combination of the
+    given axis values, in one vectorized solve. groups = 2 is the t-test with
+    Cohen's d, more groups the one-way ANOVA with Cohen's f.
+    """
+    icc, cluster_size, effect = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (icc, cluster_size, effect))
+    grid = np.ix_(icc, cluster_size, effect)
+    if groups == 2:
+        result = cluster_t_sample(alpha, power, grid[2], grid[0], grid[1], cv)
+    else:
+        result = cluster_anova_sample(alpha, power, grid[2], groups, grid[0], grid[1], cv)
+    shape = grid[0].shape[:1] + grid[1].shape[1:2] + grid[2].shape[2:]
+    return ClusterTable(icc, cluster_size, effect, *(np.broadcast_to(v, shape) for v in result))
+
+
+def _rm_parameters(n_total, f_effect, groups, measures, corr, epsilon, effect):
+    """Noncentrality and degrees of freedom of the repeated-measures F test of the effect."""
+    if effect not in RM_EFFECTS:
+        raise ValueError(f"Unknown effect {effect!r}, expected one of: {', '.join(RM_EFFECTS)}")
+    n_total, f_effect, groups, measures, corr, epsilon = (
+        np.asarray(v, dtype=float) for v in (n_total, f_effect, groups, measures, corr, epsilon))
+    valid = ((groups >= 1) & (measures >= 2) & (corr > -1 / (measures - 1)) & (corr < 1)
+             & (epsilon >= 1 / (measures - 1) - 1e-12) & (epsilon <= 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if effect == "Between":
+            nc = f_effect ** 2 * n_total * measures / (1 + (measures - 1) * corr)
+            df_num, df_denom = groups - 1, n_total - groups
+            valid &= groups >= 2
+        else:
+            nc = f_effect ** 2 * n_total * measures / (1 - corr) * epsilon
+            df_num = (measures - 1) * epsilon * (1 if effect == "Within" else groups - 1)
+            df_denom = (n_total - groups) * (measures - 1) * epsilon
+            if effect == "Interaction":
+                valid &= groups >= 2
+    return np.where(valid, nc, np.nan), df_num, df_denom
+
+
+@memoize("rm_anova_power")
+def rm_anova_power(alpha, n_total, f_effect, groups, measures, corr, epsilon=1.0, effect="Within"):
+    """Power of a repeated-measures ANOVA effect for a total sample size (noncentral F)."""
+    nc, df_num, df_denom = _rm_parameters(n_total, f_effect, groups, measures, corr, epsilon, effect)
+    with np.errstate(invalid="ignore"):
+        return engine._f_power_nc(alpha, nc, df_num, df_denom)
+
+
+@memoize("rm_anova_sample")
+def rm_anova_sample(alpha, power, f_effect, groups, measures, corr, epsilon=1.0, effect="Within"):
+    """Total sample size for a repeated-measures ANOVA effect (exact noncentral F)."""
+    alpha, power, f_effect, groups, measures, corr, epsilon = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (alpha, power, f_effect, groups, measures, corr, epsilon)))
+    shape = alpha.shape
+    alpha, power, f_effect, groups, measures, corr, epsilon = (
+        np.ravel(v) for v in (alpha, power, f_effect, groups, measures, corr, epsilon))
+    nc, _, _ = _rm_parameters(groups + 1, f_effect, groups, measures, corr, epsilon, effect)
+    valid = np.isfinite(nc) & (f_effect > 0) & (groups == np.round(groups)) & (measures == np.round(measures))
+    n = np.full(alpha.shape, np.nan)
+    if valid.any():
+        idx = np.nonzero(valid)[0]
+        n[idx] = engine._min_integer_n(
+            lambda m: rm_anova_power(alpha[idx], m, f_effect[idx], groups[idx], measures[idx], corr[idx],
+                                     epsilon[idx], effect),
+            power[idx], groups[idx].astype(np.int64) + 1)
+    return n.reshape(shape)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Power curves for the GUI's plot panel (and anyone else who wants them).
+
+power() evaluates the power of one of the Advanced tab's test types (see
+sample_size.solver) over a whole array of sample sizes or effect sizes in a
+single vectorized engine call, so a 1,000-point curve costs about as much
+as one statsmodels solve_power. Sample sizes follow the Advanced tab's
+conventions: N per group for the independent t-test and ANOVA, N pairs for
+the paired t-test and total N otherwise.
+"""
+
+import numpy as np
+
+from sample_size import solver
+from sample_size.solver import TEST_TYPES
+
+
+def power(test_type, alpha, n, effect, design=None):
+    """Power for the given test type; n, effect and design broadcast like the engine functions."""
+    return solver.power(test_type, alpha, n, effect, design)
+
+
+def n_axis(test_type, n_max, points, design=None):
+    """Evenly spaced sample sizes from the smallest valid N to n_max (not rounded, the curves are smooth)."""
+    lo = float(TEST_TYPES[test_type].min_n(design))
+    return np.linspace(lo, max(n_max, lo + 1), points)
+
+
+def effect_axis(test_type, effect_max, points):
+    """Evenly spaced effect sizes from 0 to effect_max (kept below 1 for correlations)."""
+    effect_max = min(effect_max, 0.999 * TEST_TYPES[test_type].max_effect)
+    return np.linspace(0.0, effect_max, points)
+
+
+def power_vs_n(test_type, alpha, effect, n_max, points, design=None):
+    """(n, power) arrays for a fixed effect size."""
+    n = n_axis(test_type, n_max, points, design)
+    return n, power(test_type, alpha, n, effect, design)
+
+
+def power_vs_effect(test_type, alpha, n, effect_max, points, design=None):
+    """(effect, power) arrays for a fixed sample size."""
+    effect = effect_axis(test_type, effect_max, points)
+    return effect, power(test_type, alpha, n, effect, design)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Sample sizes for studies with many endpoints under a multiple-comparison correction.
+
+Every endpoint is an independent-samples t-test (standardized effect d, the
+same groups for all endpoints) and the endpoints are tested together with
+Bonferroni, Holm, Hochberg or Benjamini-Hochberg (FDR) at an overall alpha.
+
+sample_size() sizes every endpoint on its own at the per-endpoint alpha of
+the correction, in one vectorized engine call: alpha / m for the FWER
+methods (the first, strictest step of Holm and Hochberg, so every endpoint
+keeps its power whatever the others do), and Jung's (2005) alpha* =
+r1 q / (m0 (1 - q)) for the FDR, with r1 = power * m1 expected true
+rejections among the m1 endpoints with an effect and m0 = m - m1 nulls.
+
+Study-level power depends on how the endpoints correlate, so
+simulate_power() draws the endpoints' test statistics from a multivariate
+normal with the given correlation matrix (a number means the same
+correlation for every pair), shifted by each endpoint's noncentrality, and
+applies the step-down or step-up procedure to every replicate at once. It
+reports disjunctive power (at least one endpoint with an effect rejected)
+and conjunctive power (all of them). study_sample_size() searches N for
+either goal. The search reuses the same draws for every N (common random
+numbers), so the simulated power moves with N without Monte Carlo jitter
+and a bisection needs no extra replications.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+METHODS = ("Bonferroni", "Holm", "Hochberg", "FDR (Benjamini-Hochberg)")
+GOALS = ("Disjunctive", "Conjunctive")  # At least one / every endpoint with an effect rejected
+DEFAULT_SIMULATIONS = 10_000
+MAX_DRAWS = 20_000_000  # Largest simulations * endpoints held in memory
+MAX_N = 10_000_000
+
+# adjusted_alpha: per-endpoint alpha; n: N (group 1) per endpoint, NaN for endpoints without an effect
+# n_max: N that powers every endpoint on its own
+EndpointSampleSize = namedtuple("EndpointSampleSize", ["method", "adjusted_alpha", "n", "n_max"])
+
+# marginal: rejection rate of every endpoint; disjunctive / conjunctive: see GOALS
+# expected_true: mean number of endpoints with an effect rejected
+# false_positive: probability of rejecting at least one endpoint without an effect
+StudyPower = namedtuple("StudyPower", ["n", "marginal", "disjunctive", "conjunctive", "expected_true",
+                                       "false_positive", "simulations", "seed"])
+
+# n: smallest N (group 1) whose simulated power for the goal reaches the target; power: StudyPower at n
+StudySampleSize = namedtuple("StudySampleSize", ["goal", "n", "power", "evaluations"])
+
+
+def _check_method(method):
+    if method not in METHODS:
+        raise ValueError(f"Unknown correction {method!r}, expected one of: {', '.join(METHODS)}")
+
+
+def adjusted_alpha(method, alpha, power, effects):
+    """Per-endpoint alpha of the correction for endpoints with the given effects (shape (..., m))."""
+    _check_method(method)
+    effects = np.asarray(effects, dtype=float)
+    m = effects.shape[-1]
+    if method != "FDR (Benjamini-Hochberg)":
+        return np.asarray(alpha, dtype=float) / m
+    m1 = np.count_nonzero(effects, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        jung = power * m1 * alpha / ((m - m1) * (1 - alpha))
+    # Without nulls every rejection is a true one, so the FDR leaves alpha as it is
+    return np.where(m1 == m, alpha, np.minimum(jung, alpha))
+
+
+@memoize("endpoints.sample_size")
+def sample_size(alpha, power, effects, method="Bonferroni", ratio=1.0, tails=engine.TWO_TAILED):
+    """
+    N per endpoint at the corrected alpha; returns an EndpointSampleSize.
+    effects has the endpoints on its last axis; alpha and power broadcast against the other axes.
+    """
+    effects = np.asarray(effects, dtype=float)
+    alpha, power = np.asarray(alpha, dtype=float), np.asarray(power, dtype=float)
+    adjusted = adjusted_alpha(method, alpha, power, effects)
+    n = engine.indep_t_sample(adjusted[..., None], power[..., None], np.abs(effects), tails, ratio)
+    with np.errstate(invalid="ignore"):
+        n_max = np.where(np.isnan(n).all(axis=-1), np.nan, np.nanmax(np.where(np.isnan(n), -np.inf, n), axis=-1))
+    return EndpointSampleSize(method, adjusted, n, n_max)
+
+
+def _correlated_normals(corr, m, simulations, seed):
+    """simulations x m standard normal draws whose columns have the correlation matrix corr."""
+    corr = np.asarray(corr, dtype=float)
+    if corr.ndim == 0:
+        corr = np.full((m, m), float(corr))
+        np.fill_diagonal(corr, 1.0)
+    if corr.shape != (m, m):
+        raise ValueError(f"The correlation matrix must be {m} x {m}, one row per endpoint")
+    if not np.allclose(corr, corr.T) or not np.allclose(np.diag(corr), 1.0):
+        raise ValueError("The correlation matrix must be symmetric with ones on the diagonal")
+    eigenvalues, vectors = np.linalg.eigh(corr)
+    if eigenvalues.min() < -1e-8:
+        raise ValueError("The correlation matrix is not positive semi-definite")
+    root = vectors * np.sqrt(np.clip(eigenvalues, 0, None))
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((simulations, m)) @ root.T
+
+
+def _critical_values(method, alpha, m, df, tails):
+    """|t| each ordered statistic (largest first) must reach, from the p-value thresholds of the method."""
+    from scipy.stats import t
+    k = np.arange(1, m + 1)
+    if method == "Bonferroni":
+        thresholds = np.full(m, alpha / m)
+    elif method == "FDR (Benjamini-Hochberg)":
+        thresholds = k * alpha / m
+    else: # Holm and Hochberg share the thresholds alpha / (m - k + 1) and differ in the direction of the steps
+        thresholds = alpha / (m - k + 1)
+    if tails == engine.TWO_TAILED:
+        thresholds = thresholds / 2
+    return t.isf(thresholds, df)
+
+
+def _rejections(method, statistics, critical):
+    """Which endpoints the method rejects in every replicate (rows of statistics)."""
+    if method == "Bonferroni":
+        return statistics >= critical[0]
+    order = np.argsort(-statistics, axis=-1) # Largest statistic = smallest p-value first
+    passes = np.take_along_axis(statistics, order, axis=-1) >= critical
+    if method == "Holm": # Step-down: reject up to the first failure
+        ordered = np.logical_and.accumulate(passes, axis=-1)
+    else: # Step-up: reject everything up to the last success
+        ordered = np.logical_or.accumulate(passes[..., ::-1], axis=-1)[..., ::-1]
+    rejected = np.empty_like(ordered)
+    np.put_along_axis(rejected, order, ordered, axis=-1)
+    return rejected
+
+
+def _power(draws, n, effects, alpha, method, ratio, tails, seed):
+    """StudyPower at N from the correlated standard normal draws."""
+    n2 = engine.second_group_n(n, ratio)
+    drift = effects * np.sqrt(n * n2 / (n + n2))
+    statistics = draws + drift
+    if tails == engine.TWO_TAILED:
+        statistics = np.abs(statistics)
+    else: # One-tailed in the direction of each endpoint's effect (positive for the nulls)
+        statistics = statistics * np.where(effects < 0, -1.0, 1.0)
+    critical = _critical_values(method, alpha, effects.size, n + n2 - 2, tails)
+    rejected = _rejections(method, statistics, critical)
+    true = effects != 0
+    return StudyPower(n, rejected.mean(axis=0), rejected[:, true].any(axis=1).mean(),
+                      rejected[:, true].all(axis=1).mean(), rejected[:, true].sum(axis=1).mean(),
+                      rejected[:, ~true].any(axis=1).mean(), len(draws), seed)
+
+
+def _setup(effects, corr, alpha, method, tails, simulations, seed):
+    _check_method(method)
+    if tails not in (engine.TWO_TAILED, engine.ONE_TAILED):
+        raise ValueError(f"tails must be {engine.TWO_TAILED!r} or {engine.ONE_TAILED!r}")
+    effects = np.atleast_1d(np.asarray(effects, dtype=float))
+    if effects.ndim != 1 or not np.count_nonzero(effects):
+        raise ValueError("Give one effect size per endpoint, at least one of them nonzero")
+    if simulations * effects.size > MAX_DRAWS:
+        raise ValueError(f"{simulations:,} simulations of {effects.size} endpoints exceed {MAX_DRAWS:,} draws")
+    if not 0 < alpha < 1:
+        raise ValueError("alpha must be between 0 and 1")
+    seed = int(np.random.SeedSequence(seed).entropy) if seed is None else seed # Reported, so runs can be repeated
+    return effects, _correlated_normals(corr, effects.size, simulations, seed), seed
+
+
+def simulate_power(n, effects, corr=0.0, alpha=0.05, method="Bonferroni", ratio=1.0, tails=engine.TWO_TAILED,
+                   simulations=DEFAULT_SIMULATIONS, seed=None):
+    """Simulated StudyPower of the corrected endpoints with N subjects in group 1."""
+    effects, draws, seed = _setup(effects, corr, alpha, method, tails, simulations, seed)
+    return _power(draws, int(n), effects, alpha, method, ratio, tails, seed)
+
+
+def study_sample_size(alpha, power, effects, corr=0.0, method="Bonferroni", goal="Disjunctive", ratio=1.0,
+                      tails=engine.TWO_TAILED, simulations=DEFAULT_SIMULATIONS, seed=None):
+    """
+    Smallest N (group 1) whose simulated disjunctive or conjunctive power
+    reaches the target; returns a StudySampleSize (n is NaN if MAX_N does not).
+    """
+    if goal not in GOALS:
+        raise ValueError(f"Unknown goal {goal!r}, expected one of: {', '.join(GOALS)}")
+    effects, draws, seed = _setup(effects, corr, alpha, method, tails, simulations, seed)
+    score = (lambda p: p.disjunctive) if goal == "Disjunctive" else (lambda p: p.conjunctive)
+    evaluated = {}
+
+    def at(n):
+        if n not in evaluated:
+            evaluated[n] = _power(draws, n, effects, alpha, method, ratio, tails, seed)
+        return evaluated[n]
+
+    # The endpoints sized one by one bracket the answer closely: the weakest one for "all", the strongest for "any"
+    marginal = sample_size(alpha, power, effects, method, ratio, tails).n
+    true_n = marginal[effects != 0]
+    guess = int(np.nanmax(true_n) if goal == "Conjunctive" else np.nanmin(true_n)) if np.isfinite(true_n).any() else 2
+    lo, hi = None, max(guess, 2)
+    while score(at(hi)) < power: # Double until the target is reached ...
+        if hi >= MAX_N:
+            return StudySampleSize(goal, np.nan, at(hi), len(evaluated))
+        lo, hi = hi, min(hi * 2, MAX_N)
+    while lo is None and hi > 2: # ... or halve until it is not
+        half = max(hi // 2, 2)
+        if score(at(half)) >= power:
+            hi = half
+        else:
+            lo = half
+    while lo is not None and hi - lo > 1:
+        mid = (lo + hi) // 2
+        if score(at(mid)) >= power:
+            hi = mid
+        else:
+            lo = mid
+    return StudySampleSize(goal, hi, at(hi), len(evaluated))
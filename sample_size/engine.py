@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized sample size engine.
+
+Every function accepts scalars or NumPy arrays for alpha, power, effect size
+and the design parameters (groups, predictors, df, ...) and broadcasts them
+against each other, so one call evaluates a whole table of design points.
+Sample sizes come back as float arrays of whole numbers, with NaN where the
+inputs are invalid (e.g. zero effect size) instead of raising, so one bad
+row does not spoil a batch.
+
+All-scalar calls of the public functions are memoized in the shared LRU
+cache from sample_size.cache.
+"""
+
+import numpy as np
+from scipy.stats import norm, t as t_dist, nct, f as f_dist, ncf, chi2, ncx2
+
+from sample_size import instrument
+from sample_size.cache import memoize
+
+TWO_TAILED = "Two-tailed"
+ONE_TAILED = "One-tailed"
+
+MAX_N = 10_000_000 # Upper limit for the iterative solvers, larger answers come back as NaN
+
+
+# --- Helpers ---
+
+def _two_tailed(tails):
+    """
+    Masks of the two-tailed tests and of the valid tails values (TWO_TAILED or ONE_TAILED).
+
+    A single invalid value raises ValueError; invalid cells of an array of
+    tails are only flagged, so the callers give NaN for them.
+    """
+    tails = np.asarray(tails)
+    two_tailed = tails == TWO_TAILED
+    valid = two_tailed | (tails == ONE_TAILED)
+    if tails.ndim == 0 and not valid:
+        raise ValueError(f"tails must be {TWO_TAILED!r} or {ONE_TAILED!r}, not {tails.item()!r}")
+    return two_tailed, valid
+
+
+@memoize("get_z_scores")
+def get_z_scores(alpha, power, tails=TWO_TAILED):
+    """Z scores for alpha and beta; tails may be a string or an array of strings (NaN for invalid cells)."""
+    alpha = np.asarray(alpha, dtype=float)
+    two_tailed, valid = _two_tailed(tails)
+    alpha_adjusted = np.where(two_tailed, alpha / 2, np.where(valid, alpha, np.nan))
+    z_alpha = norm.ppf(1 - alpha_adjusted)
+    z_beta = norm.ppf(np.asarray(power, dtype=float))
+    return z_alpha, z_beta
+
+
+def _ceil_n(n):
+    """Round sample sizes up, mapping inf/negative results to NaN."""
+    n = np.asarray(n, dtype=float)
+    return np.where(np.isfinite(n) & (n > 0), np.ceil(n), np.nan)
+
+
+def _min_integer_n(power_fn, target, lo, max_n=MAX_N):
+    """
+    Smallest integer n >= lo with power_fn(n) >= target, for every element at once.
+
+    power_fn must be increasing in n and accept an integer array shaped like
+    target. The upper bracket is found by doubling, then the gap is closed by
+    bisection, so the cost is O(log n) vectorized power evaluations.
+    """
+    power_fn = instrument.counted(power_fn)
+    target, lo = np.broadcast_arrays(np.asarray(target, dtype=float), np.asarray(lo, dtype=np.int64))
+    done = power_fn(lo) >= target
+    # Double the upper bracket until it reaches the target power
+    hi = np.maximum(lo * 2, lo + 1)
+    reached = done | (power_fn(hi) >= target)
+    while not reached.all() and (hi[~reached] < max_n).any():
+        hi = np.where(reached, hi, np.minimum(hi * 2, max_n))
+        reached = done | (power_fn(hi) >= target)
+    # Bisect with power(lo) < target <= power(hi); hi // 2 was the last failed bracket
+    active = reached & ~done
+    lo = np.where(active, hi // 2, lo)
+    while True:
+        active &= hi - lo > 1
+        if not active.any():
+            break
+        mid = (lo + hi) // 2
+        ok = power_fn(mid) >= target
+        hi = np.where(active & ok, mid, hi)
+        lo = np.where(active & ~ok, mid, lo)
+    n = np.where(done, lo, hi).astype(float)
+    return np.where(reached, n, np.nan)
+
+
+def _refine_integer_n(power_fn, target, n0, lo, args, max_steps=8):
+    """
+    Exact integer n from a warm start n0, for every element at once.
+
+    Walks n0 up (or down) one step at a time until it is the smallest n >= lo
+    with power_fn(n, *args) >= target. A good warm start is off by one or two,
+    so this usually costs two or three vectorized power evaluations. Elements
+    that have not settled after max_steps fall back to _min_integer_n.
+    args must already be broadcast to the shape of target; power is only
+    re-evaluated for the elements that are still moving.
+    """
+    power_fn = instrument.counted(power_fn)
+    n = np.maximum(np.where(np.isfinite(n0), n0, lo), lo).astype(np.int64)
+    ok = power_fn(n, *args) >= target
+    # Too small: step up until the target power is reached
+    moving_up = ~ok
+    for _ in range(max_steps):
+        if not moving_up.any():
+            break
+        idx = np.nonzero(moving_up)[0]
+        n[idx] += 1
+        moving_up[idx] = power_fn(n[idx], *(a[idx] for a in args)) < target[idx]
+    # Large enough: step down while the previous n still reaches it
+    moving_down = ok & (n > lo)
+    for _ in range(max_steps):
+        if not moving_down.any():
+            break
+        idx = np.nonzero(moving_down)[0]
+        ok_below = power_fn(n[idx] - 1, *(a[idx] for a in args)) >= target[idx]
+        n[idx[ok_below]] -= 1
+        moving_down[idx] = ok_below & (n[idx] > lo)
+    result = n.astype(float)
+    unsettled = moving_up | moving_down
+    if unsettled.any():
+        idx = np.nonzero(unsettled)[0]
+        sub_args = [a[idx] for a in args]
+        result[idx] = _min_integer_n(lambda m: power_fn(m, *sub_args), target[idx], lo)
+    return result
+
+
+def _bisect_increasing(fn, target, lo, hi, tol=1e-6, max_iter=200):
+    """
+    Solve fn(x) = target for x in [lo, hi] elementwise, fn increasing in x.
+
+    hi is doubled where it does not bracket the root yet. Elements that
+    cannot be bracketed come back as NaN.
+    """
+    fn = instrument.counted(fn)
+    target, lo, hi = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (target, lo, hi)))
+    lo, hi = lo.copy(), hi.copy()
+    for _ in range(60):
+        short = fn(hi) < target
+        if not short.any():
+            break
+        hi = np.where(short, hi * 2, hi)
+    bracketed = fn(hi) >= target
+    for _ in range(max_iter):
+        if (hi - lo <= tol).all():
+            break
+        mid = (lo + hi) / 2
+        ok = fn(mid) >= target
+        hi = np.where(ok, mid, hi)
+        lo = np.where(ok, lo, mid)
+    return np.where(bracketed, hi, np.nan)
+
+
+def _probit(p):
+    """Power on the probit scale, where it is close to linear in the effect size."""
+    return norm.ppf(np.clip(p, 1e-300, 1 - 1e-16))
+
+
+def _solve_increasing(fn, target, lo, hi, args=(), tol=1e-6, f_tol=1e-10, max_iter=60, transform=None):
+    """
+    Solve fn(x, *args) = target for x >= lo elementwise, fn increasing in x.
+
+    hi is doubled where it does not bracket the root yet, then the bracket is
+    closed with the Illinois variant of regula falsi. Only elements that have
+    not converged are re-evaluated. args must already be broadcast to the
+    shape of target. transform (e.g. _probit for powers) is applied to fn and
+    target first; the closer it makes fn to linear, the fewer steps are needed
+    (3-5 for powers on the probit scale, where bisection needs 20+).
+    Returns the upper end of the final bracket (so fn >= target there, within
+    f_tol on the transformed scale), NaN where no bracket was found.
+    """
+    if transform is not None:
+        return _solve_increasing(lambda x, *a: transform(fn(x, *a)), transform(target), lo, hi, args,
+                                 tol, f_tol, max_iter)
+    fn = instrument.counted(fn)
+    shape = np.shape(target)
+    target = np.ravel(np.asarray(target, dtype=float)) # Worked on flat, reshaped at the end
+    args = tuple(np.ravel(a) for a in args)
+    lo = np.broadcast_to(np.asarray(lo, dtype=float), shape).ravel().copy()
+    hi = np.broadcast_to(np.asarray(hi, dtype=float), shape).ravel().copy()
+    f_lo = fn(lo, *args) - target
+    f_hi = fn(hi, *args) - target
+    for _ in range(60):
+        idx = np.flatnonzero(f_hi < 0)
+        if not idx.size:
+            break
+        lo[idx], f_lo[idx] = hi[idx], f_hi[idx] # Still below target: becomes the lower end
+        hi[idx] *= 2
+        f_hi[idx] = fn(hi[idx], *(a[idx] for a in args)) - target[idx]
+    bracketed = f_hi >= 0
+    at_lo = f_lo >= 0 # Target already reached at lo
+    active = bracketed & ~at_lo & (hi - lo > tol) & (f_hi > f_tol)
+    last_side = np.zeros(target.shape, dtype=np.int8) # +1: hi was replaced last, -1: lo was
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if not idx.size:
+            break
+        l, h, fl, fh = lo[idx], hi[idx], f_lo[idx], f_hi[idx]
+        x = h - fh * (h - l) / (fh - fl)
+        x = np.where((x > l) & (x < h), x, (l + h) / 2) # Guard against round-off leaving the bracket
+        fx = fn(x, *(a[idx] for a in args)) - target[idx]
+        up = fx >= 0
+        # Illinois: halve the stale end's value when the same end is replaced twice in a row
+        f_lo[idx] = np.where(up & (last_side[idx] == 1), fl / 2, fl)
+        f_hi[idx] = np.where(~up & (last_side[idx] == -1), fh / 2, fh)
+        hi[idx[up]], f_hi[idx[up]] = x[up], fx[up]
+        lo[idx[~up]], f_lo[idx[~up]] = x[~up], fx[~up]
+        last_side[idx] = np.where(up, 1, -1)
+        active[idx] = (hi[idx] - lo[idx] > tol) & ~(up & (fx <= f_tol))
+    return np.where(at_lo, lo, np.where(bracketed, hi, np.nan)).reshape(shape)
+
+
+# --- Power functions ---
+
+def _t_power(alpha, df, nc, tails, target=None):
+    """
+    Power of a t-test from its df and noncentrality parameter.
+
+    When target is given (solver use), the lower rejection region of a
+    two-tailed test is only evaluated where it can move the result across
+    target. That region has probability at most Phi(-nc), so elsewhere it
+    cannot change the power >= target decision and the expensive noncentral
+    CDF is skipped; the returned value is then only exact for that comparison.
+    """
+    two_tailed, valid = _two_tailed(tails)
+    alpha = np.where(valid, np.asarray(alpha, dtype=float), np.nan)
+    alpha, df, nc = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha, df, nc)))
+    two_tailed = np.broadcast_to(two_tailed, alpha.shape)
+    crit = t_dist.isf(np.where(two_tailed, alpha / 2, alpha), df)
+    power = np.asarray(nct.sf(crit, df, nc), dtype=float).copy()
+    needed = two_tailed.copy()
+    if target is not None:
+        needed &= (power < target) & (power + norm.cdf(-nc) >= target)
+    if needed.any():
+        # P(T < -crit | nc) written as an upper tail: nct.cdf returns NaN far out in the lower tail
+        power[needed] += nct.sf(crit[needed], df[needed], -nc[needed])
+    return power
+
+
+def second_group_n(n1, ratio):
+    """Size of group 2 for n1 in group 1 and allocation ratio n2 / n1, rounded up."""
+    n2 = np.asarray(ratio, dtype=float) * np.asarray(n1, dtype=float)
+    return np.ceil(n2 - 1e-9 * n2) # Allow for round-off in ratio (0.3 * 10 is 3.0000000000000004)
+
+
+@memoize("indep_t_power")
+def indep_t_power(alpha, n, d, tails=TWO_TAILED, target=None, ratio=1.0):
+    """
+    Power of the independent samples t-test (noncentral t) with n in group 1
+    and ratio * n in group 2 (n per group for the default ratio of 1).
+    """
+    n, d = np.asarray(n, dtype=float), np.asarray(d, dtype=float)
+    ratio = np.asarray(ratio, dtype=float)
+    ratio = np.where(ratio > 0, ratio, np.nan)
+    n2 = ratio * n
+    return _t_power(alpha, n + n2 - 2, d * np.sqrt(n * n2 / (n + n2)), tails, target)
+
+
+@memoize("one_t_power")
+def one_t_power(alpha, n, d, tails=TWO_TAILED, target=None):
+    """Power of the one-sample (or paired, with d = dz) t-test with n observations (noncentral t)."""
+    n, d = np.asarray(n, dtype=float), np.asarray(d, dtype=float)
+    return _t_power(alpha, n - 1, d * np.sqrt(n), tails, target)
+
+
+def _f_power_nc(alpha, nc, df_num, df_denom):
+    """Power of an F test at noncentrality nc."""
+    crit = f_dist.isf(alpha, df_num, df_denom)
+    # ncf.sf is off by one at nc = 0 (scipy gives sf - 1), use the central F there
+    return np.where(np.asarray(nc) > 0, ncf.sf(crit, df_num, df_denom, nc), f_dist.sf(crit, df_num, df_denom))
+
+
+def _chi_power_nc(alpha, nc, df):
+    """Power of a chi-square test at noncentrality nc."""
+    crit = chi2.isf(alpha, df)
+    return ncx2.sf(crit, df, nc)
+
+
+@memoize("oneway_power")
+def oneway_power(alpha, n_total, f_effect, groups):
+    """Power of the one-way ANOVA F test for a total sample size (noncentral F)."""
+    alpha, n_total, f_effect, groups = (np.asarray(v, dtype=float) for v in (alpha, n_total, f_effect, groups))
+    return _f_power_nc(alpha, f_effect ** 2 * n_total, groups - 1, n_total - groups)
+
+
+@memoize("anova_effect_power")
+def anova_effect_power(alpha, n_total, f_effect, df_num, cells):
+    """
+    Power of the F test of one effect in a fixed-effects ANOVA with cells cells (noncentral F).
+
+    lambda = f^2 * N and df_denom = N - cells, as in G*Power's "main effects
+    and interactions" test.
+    """
+    alpha, n_total, f_effect, df_num, cells = (np.asarray(v, dtype=float) for v in (alpha, n_total, f_effect, df_num, cells))
+    return _f_power_nc(alpha, f_effect ** 2 * n_total, df_num, n_total - cells)
+
+
+@memoize("chi_power")
+def chi_power(alpha, n, w, df):
+    """Power of the chi-square test for a total sample size (noncentral chi-square)."""
+    alpha, n, w, df = (np.asarray(v, dtype=float) for v in (alpha, n, w, df))
+    return _chi_power_nc(alpha, w ** 2 * n, df)
+
+
+@memoize("pearson_power")
+def pearson_power(alpha, n, r, tails=TWO_TAILED):
+    """Power of the test of a Pearson correlation via Fisher's z transformation."""
+    alpha, n, r = (np.asarray(v, dtype=float) for v in (alpha, n, r))
+    two_tailed, valid = _two_tailed(tails)
+    alpha = np.where(valid, alpha, np.nan)
+    z_alpha = norm.isf(np.where(two_tailed, alpha / 2, alpha))
+    with np.errstate(invalid="ignore"):
+        shift = np.abs(np.arctanh(np.where(np.abs(r) < 1, r, np.nan))) * np.sqrt(np.where(n > 3, n - 3, np.nan))
+    return norm.cdf(shift - z_alpha) + np.where(two_tailed, norm.cdf(-shift - z_alpha), 0.0)
+
+
+@memoize("linear_reg_power")
+def linear_reg_power(alpha, n, f2, predictors):
+    """Power of the overall F test of a linear regression with n observations (noncentral F, lambda = f2 * n)."""
+    alpha, n, f2, predictors = (np.asarray(v, dtype=float) for v in (alpha, n, f2, predictors))
+    df_denom = np.where(n > predictors + 1, n - predictors - 1, np.nan)
+    return _f_power_nc(alpha, f2 * n, predictors, df_denom)
+
+
+@memoize("logistic_reg_power")
+def logistic_reg_power(alpha, n, odds_ratio, p1, r2_other):
+    """Power of logistic regression with a continuous predictor (inverse of the Hsieh et al., 1998 formula)."""
+    alpha, n, odds_ratio, p1, r2_other = (np.asarray(v, dtype=float) for v in (alpha, n, odds_ratio, p1, r2_other))
+    valid = (odds_ratio > 1) & (p1 > 0) & (p1 < 1) & (r2_other >= 0) & (r2_other < 1) & (n > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shift = np.sqrt(n * p1 * (1 - p1) * (1 - r2_other)) * np.log(odds_ratio)
+    return np.where(valid, norm.cdf(shift - norm.isf(alpha / 2)), np.nan)
+
+
+# --- Sample size functions (mirroring SampleSizeCalculator.calc_*) ---
+
+def _exact_t_sample(power_fn, alpha, power, d, tails, n0, lo, ratio=None):
+    """Shared noncentral-t solve for the t-test sample size functions (ratio: two-group allocation)."""
+    alpha, power, d, tails, n0, r = np.broadcast_arrays(
+        np.asarray(alpha, dtype=float), np.asarray(power, dtype=float), np.abs(np.asarray(d, dtype=float)),
+        np.asarray(tails), n0, np.asarray(1.0 if ratio is None else ratio, dtype=float))
+    shape = alpha.shape
+    alpha, power, d, tails, n0, r = (np.ravel(v) for v in (alpha, power, d, tails, n0, r))
+    valid = np.isfinite(n0) & (d > 0)
+    n = np.full(alpha.shape, np.nan)
+    if valid.any():
+        # target rides along in args so power_fn can skip work that cannot change the decision
+        if ratio is None:
+            fn = lambda n, a, d, t, target, r: power_fn(a, n, d, t, target)  # noqa: E731
+        else:
+            fn = lambda n, a, d, t, target, r: power_fn(a, n, d, t, target, r)  # noqa: E731
+        n[valid] = _refine_integer_n(fn, power[valid], n0[valid], lo,
+                                     (alpha[valid], d[valid], tails[valid], power[valid], r[valid]))
+    return n.reshape(shape)
+
+
+@memoize("indep_t_sample")
+def indep_t_sample(alpha, power, d, tails=TWO_TAILED, ratio=1.0):
+    """
+    Sample size of group 1 for the independent samples t-test (exact noncentral t);
+    group 2 needs second_group_n(n, ratio). With the default ratio of 1 this is n per group.
+    """
+    # Normal approximation with Guenther's (1981) t correction as the warm start;
+    # it is usually exact or one off, so the refinement needs two or three evaluations
+    z_alpha, z_beta = get_z_scores(alpha, power, tails)
+    ratio = np.asarray(ratio, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(ratio > 0, ratio, np.nan)
+        n0 = _ceil_n((1 + 1 / ratio) * ((z_alpha + z_beta) / np.asarray(d, dtype=float)) ** 2
+                     + z_alpha ** 2 / (2 * (1 + ratio)))
+    return _exact_t_sample(indep_t_power, alpha, power, d, tails, n0, 2, ratio)
+
+
+@memoize("paired_t_sample")
+def paired_t_sample(alpha, power, dz, tails=TWO_TAILED):
+    """Number of pairs for the paired samples t-test (exact noncentral t on the differences)."""
+    return one_t_sample(alpha, power, dz, tails)
+
+
+@memoize("one_t_sample")
+def one_t_sample(alpha, power, d, tails=TWO_TAILED):
+    """Sample size for the one-sample t-test (exact noncentral t)."""
+    z_alpha, z_beta = get_z_scores(alpha, power, tails)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n0 = _ceil_n(((z_alpha + z_beta) / np.asarray(d, dtype=float)) ** 2 + z_alpha ** 2 / 2)
+    return _exact_t_sample(one_t_power, alpha, power, d, tails, n0, 2)
+
+
+def _table_or_exact(table_fn, power_fn, alpha, power, effect, designs, valid, lo):
+    """
+    Shared solve for the chi-square / ANOVA sample sizes.
+
+    designs is a tuple of design parameter arrays passed after the effect size.
+    Uses the precomputed noncentrality tables (sample_size.tables) where they
+    exist and cover the inputs; answers near a rounding boundary are
+    confirmed with the exact power, everything else goes to the exact solver.
+    """
+    from sample_size import tables # Imported here, tables builds on this module
+
+    alpha, power, effect, valid, *designs = (np.ravel(v) for v in np.broadcast_arrays(alpha, power, effect, valid, *designs))
+    n = np.full(alpha.shape, np.nan)
+    pending = valid.copy()
+    table = tables.load()
+    if table is not None and pending.any():
+        idx = np.nonzero(pending)[0]
+        n_table, certain, inside = table_fn(table, alpha[idx], power[idx], effect[idx], *(d[idx] for d in designs))
+        n[idx[certain]] = n_table[certain]
+        instrument.count("table_hits", int(np.count_nonzero(inside)))
+        near = idx[inside & ~certain]
+        if near.size:
+            n[near] = _refine_integer_n(lambda m, a, e, *d: power_fn(a, m, e, *d), power[near], n_table[inside & ~certain], lo,
+                                        (alpha[near], effect[near]) + tuple(d[near] for d in designs))
+        pending[idx[inside]] = False
+    if pending.any():
+        idx = np.nonzero(pending)[0]
+        n[idx] = _min_integer_n(lambda m: power_fn(alpha[idx], m, effect[idx], *(d[idx] for d in designs)), power[idx], lo)
+    return n
+
+
+@memoize("oneway_sample")
+def oneway_sample(alpha, power, f_effect, groups):
+    """Sample size per group for the one-way ANOVA (exact noncentral F)."""
+    alpha, power, f_effect, groups = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha, power, f_effect, groups)))
+    valid = (f_effect > 0) & (groups >= 2) & (groups == np.round(groups))
+    # Search over n per group, so the total is always a multiple of the group count
+    n = _table_or_exact(lambda table, *args: table.oneway_sample(*args),
+                        lambda a, m, f, k: oneway_power(a, m * k, f, k),
+                        alpha, power, f_effect, (groups,), valid, 2)
+    return n.reshape(alpha.shape)
+
+
+@memoize("anova_cell_sample")
+def anova_cell_sample(alpha, power, f_effect, df_num, cells):
+    """
+    Sample size per cell for one effect of a balanced fixed-effects ANOVA (exact noncentral F).
+
+    The effect (a main effect or an interaction) has df_num numerator df and the
+    design has cells cells in total; see anova_effect_power. The one-way ANOVA
+    is the case df_num = groups - 1, cells = groups.
+    """
+    alpha, power, f_effect, df_num, cells = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (alpha, power, f_effect, df_num, cells)))
+    valid = (f_effect > 0) & (df_num >= 1) & (df_num == np.round(df_num)) & (cells > df_num) & (cells == np.round(cells))
+    n = _table_or_exact(lambda table, *args: table.anova_cell_sample(*args),
+                        lambda a, m, f, dfn, k: anova_effect_power(a, m * k, f, dfn, k),
+                        alpha, power, f_effect, (df_num, cells), valid, 2)
+    return n.reshape(alpha.shape)
+
+
+@memoize("pearson_sample")
+def pearson_sample(alpha, power, r, tails=TWO_TAILED):
+    """Sample size for a Pearson correlation via Fisher's z transformation."""
+    r = np.asarray(r, dtype=float)
+    z_alpha, z_beta = get_z_scores(alpha, power, tails)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_r = np.arctanh(np.where(np.abs(r) < 1, r, np.nan))
+        n = ((z_alpha + z_beta) / z_r) ** 2 + 3
+    return _ceil_n(n)
+
+
+@memoize("linear_reg_sample")
+def linear_reg_sample(alpha, power, f2, predictors):
+    """Total sample size for multiple linear regression (exact noncentral F, the inverse of linear_reg_power)."""
+    from sample_size import solver # Imported here, solver builds on this module
+    predictors = np.asarray(predictors, dtype=float)
+    predictors = np.where((predictors >= 1) & (predictors == np.round(predictors)), predictors, np.nan)
+    return solver.sample_size("Linear Regression", alpha, power, f2, predictors)
+
+
+@memoize("logistic_reg_sample")
+def logistic_reg_sample(alpha, power, odds_ratio, p1, r2_other):
+    """Sample size for logistic regression with a continuous predictor (Hsieh et al., 1998)."""
+    odds_ratio, p1, r2_other = (np.asarray(v, dtype=float) for v in (odds_ratio, p1, r2_other))
+    z_alpha, z_beta = get_z_scores(alpha, power, TWO_TAILED)
+    valid = (odds_ratio > 1) & (p1 > 0) & (p1 < 1) & (r2_other >= 0) & (r2_other < 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta1 = np.log(odds_ratio) # Log odds ratio
+        n = (z_alpha + z_beta) ** 2 / (p1 * (1 - p1) * beta1 ** 2 * (1 - r2_other))
+    return np.where(valid, _ceil_n(n), np.nan)
+
+
+@memoize("chi_ind_sample")
+def chi_ind_sample(alpha, power, w, df):
+    """Total sample size for a chi-square test (exact noncentral chi-square)."""
+    alpha, power, w, df = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha, power, w, df)))
+    valid = (w > 0) & (df >= 1)
+    n = _table_or_exact(lambda table, *args: table.chi_ind_sample(*args), chi_power,
+                        alpha, power, w, (df,), valid, 1)
+    return n.reshape(alpha.shape)
+
+
+# --- Effect size functions (MDES) ---
+
+@memoize("indep_t_mdes")
+def indep_t_mdes(alpha, power, n, tails=TWO_TAILED, ratio=1.0):
+    """Minimum detectable Cohen's d for the independent t-test with n in group 1 and ratio * n in group 2."""
+    alpha, power, n, ratio = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha, power, n, ratio)))
+    return _solve_increasing(lambda d, a, m, r: indep_t_power(a, m, d, tails, ratio=r), power, 0.0, 1.0,
+                             (alpha, n, ratio), transform=_probit)
+
+
+@memoize("chi_mdes")
+def chi_mdes(alpha, power, n, df):
+    """Minimum detectable Cohen's w for the chi-square test."""
+    alpha, power, n, df = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (alpha, power, n, df)))
+    return _solve_increasing(lambda w, a, m, k: chi_power(a, m, w, k), power, 0.0, 1.0, (alpha, n, df),
+                             transform=_probit)
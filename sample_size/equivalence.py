@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Non-inferiority and equivalence (TOST) designs for means and proportions.
+
+Differences are group 2 (test) minus group 1 (reference), with higher values
+better; alpha is the level of each one-sided test. Non-inferiority tests
+H0: difference <= -margin. Equivalence is shown by two one-sided tests
+(TOST) that reject both difference <= lower and difference >= upper.
+
+Means are in standardized units (Cohen's d; margins in the same units), in
+parallel groups with allocation ratio n2 / n1 or paired (one-sample) when
+paired=True. Non-inferiority is the one-sided t-test shifted by the margin,
+so the engine's noncentral t gives its exact power. TOST power is exact as
+well: with t the critical value, df the degrees of freedom and
+delta1, delta2 the noncentralities against the two margins,
+
+    power = Q(-t, delta2; 0, R) - Q(t, delta1; 0, R),
+    R = (delta1 - delta2) sqrt(df) / (2 t),
+
+where Q is Owen's Q function (Owen 1965), the bivariate noncentral t
+probability written as one integral over the sample SD. owens_q() evaluates
+it for whole arrays at once with a fixed composite Gauss-Legendre rule. The
+nodes cover the part of the chi density that is above 1e-15, so every
+element costs the same few hundred function evaluations, without
+per-point adaptive quadrature.
+
+Proportions use the normal approximation with the unpooled (Wald) variance
+p1 (1 - p1) + p2 (1 - p2) / ratio per subject of group 1.
+
+Invalid inputs (true difference outside the margins, lower >= upper, ...)
+give NaN as in the engine.
+"""
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+QUADRATURE_PANELS = 8   # Composite Gauss-Legendre rule for owens_q(): panels ...
+QUADRATURE_NODES = 16   # ... of this many nodes each
+CHI_WINDOW = 9.0        # The chi density is below 1e-15 further than this from sqrt(df)
+
+
+def _rule():
+    nodes, weights = np.polynomial.legendre.leggauss(QUADRATURE_NODES)
+    starts = np.arange(QUADRATURE_PANELS) / QUADRATURE_PANELS
+    # Nodes and weights on [0, 1]
+    return ((starts[:, None] + (nodes + 1) / (2 * QUADRATURE_PANELS)).ravel(),
+            np.tile(weights, QUADRATURE_PANELS) / (2 * QUADRATURE_PANELS))
+
+
+def owens_q(df, t, delta, a, b):
+    """
+    Owen's Q function Q_df(t, delta; a, b): the integral from a to b of
+    Phi(t x / sqrt(df) - delta) times the chi density with df degrees of
+    freedom. Every argument broadcasts.
+    """
+    from scipy.special import gammaln, ndtr
+    df, t, delta, a, b = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (df, t, delta, a, b)))
+    center = np.sqrt(df)
+    lo = np.maximum(a, np.maximum(center - CHI_WINDOW, 0))
+    width = np.clip(np.minimum(b, center + CHI_WINDOW) - lo, 0, None)
+    nodes, weights = _rule()
+    x = lo[..., None] + width[..., None] * nodes
+    df, t, delta = df[..., None], t[..., None], delta[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_density = (df - 1) * np.log(x) - x ** 2 / 2 - (df / 2 - 1) * np.log(2) - gammaln(df / 2)
+        integrand = ndtr(t * x / np.sqrt(df) - delta) * np.exp(log_density)
+    return np.where(width > 0, integrand @ weights * width, 0.0)
+
+
+def _design(n, ratio, paired):
+    """Degrees of freedom and standard-error factor of the mean difference (in SD units)."""
+    n = np.asarray(n, dtype=float)
+    if paired:
+        return n - 1, 1 / np.sqrt(n)
+    n2 = engine.second_group_n(n, ratio)
+    return n + n2 - 2, np.sqrt(1 / n + 1 / n2)
+
+
+def mean_noninferiority_power(alpha, n, d, margin, ratio=1.0, paired=False):
+    """Power of the one-sided t-test of H0: difference <= -margin (n is group 1, or pairs)."""
+    df, se = _design(n, ratio, paired)
+    margin = np.asarray(margin, dtype=float)
+    nc = (np.asarray(d, dtype=float) + np.where(margin > 0, margin, np.nan)) / se
+    with np.errstate(invalid="ignore"):
+        return engine._t_power(alpha, df, nc, engine.ONE_TAILED)
+
+
+def mean_equivalence_power(alpha, n, d, lower, upper, ratio=1.0, paired=False):
+    """Exact TOST power for the true difference d and equivalence margins (lower, upper)."""
+    from scipy.stats import t as t_dist
+    df, se = _design(n, ratio, paired)
+    d, lower, upper = (np.asarray(v, dtype=float) for v in (d, lower, upper))
+    crit = t_dist.isf(alpha, df)
+    delta1, delta2 = (d - lower) / se, (d - upper) / se
+    with np.errstate(invalid="ignore"):
+        limit = (delta1 - delta2) * np.sqrt(df) / (2 * crit)
+        power = owens_q(df, -crit, delta2, 0, limit) - owens_q(df, crit, delta1, 0, limit)
+    return np.where((lower < upper) & (df >= 1), np.clip(power, 0, 1), np.nan)
+
+
+def _mean_sample(power_fn, alpha, power, d, lower, upper, ratio, paired, valid):
+    alpha, power, d, lower, upper, ratio = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (alpha, power, d, lower, upper, ratio)))
+    shape = alpha.shape
+    valid = np.ravel(valid(d, lower, upper))
+    alpha, power, d, lower, upper, ratio = (np.ravel(v) for v in (alpha, power, d, lower, upper, ratio))
+    n = np.full(alpha.shape, np.nan)
+    if valid.any():
+        idx = np.nonzero(valid)[0]
+        n[idx] = engine._min_integer_n(
+            lambda m: power_fn(alpha[idx], m, d[idx], lower[idx], upper[idx], ratio[idx], paired),
+            power[idx], 2)
+    return n.reshape(shape)
+
+
+@memoize("mean_noninferiority_sample")
+def mean_noninferiority_sample(alpha, power, d, margin, ratio=1.0, paired=False):
+    """Group 1 size (or pairs) for non-inferiority of means; NaN unless d > -margin."""
+    return _mean_sample(lambda a, m, e, lo, _, r, p: mean_noninferiority_power(a, m, e, -lo, r, p),
+                        alpha, power, d, -np.asarray(margin, dtype=float), np.inf, ratio, paired,
+                        lambda d, lower, upper: (lower < 0) & (d > lower))
+
+
+@memoize("mean_equivalence_sample")
+def mean_equivalence_sample(alpha, power, d, lower, upper, ratio=1.0, paired=False):
+    """Group 1 size (or pairs) for TOST equivalence of means; NaN unless lower < d < upper."""
+    return _mean_sample(mean_equivalence_power, alpha, power, d, lower, upper, ratio, paired,
+                        lambda d, lower, upper: (lower < d) & (d < upper))
+
+
+def _prop_variance(p1, p2, ratio):
+    """Variance of the difference in proportions times n1 (NaN outside (0, 1))."""
+    p1, p2, ratio = (np.asarray(v, dtype=float) for v in (p1, p2, ratio))
+    valid = (p1 > 0) & (p1 < 1) & (p2 > 0) & (p2 < 1) & (ratio > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, p1 * (1 - p1) + p2 * (1 - p2) / ratio, np.nan)
+
+
+def prop_noninferiority_power(alpha, n, p1, p2, margin, ratio=1.0):
+    """Power of the one-sided z-test of H0: p2 - p1 <= -margin with n in group 1."""
+    from scipy.stats import norm
+    margin = np.asarray(margin, dtype=float)
+    se = np.sqrt(_prop_variance(p1, p2, ratio) / np.asarray(n, dtype=float))
+    shift = np.asarray(p2, dtype=float) - np.asarray(p1, dtype=float) + np.where(margin > 0, margin, np.nan)
+    return norm.cdf(shift / se - norm.isf(alpha))
+
+
+@memoize("prop_noninferiority_sample")
+def prop_noninferiority_sample(alpha, power, p1, p2, margin, ratio=1.0):
+    """Group 1 size for non-inferiority of proportions: (z_alpha + z_beta)^2 V / (p2 - p1 + margin)^2."""
+    z_alpha, z_beta = engine.get_z_scores(alpha, power, engine.ONE_TAILED)
+    margin = np.asarray(margin, dtype=float)
+    shift = np.asarray(p2, dtype=float) - np.asarray(p1, dtype=float) + np.where(margin > 0, margin, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = np.where(shift > 0, (z_alpha + z_beta) ** 2 * _prop_variance(p1, p2, ratio) / shift ** 2, np.nan)
+    return engine._ceil_n(n)
+
+
+def prop_equivalence_power(alpha, n, p1, p2, lower, upper, ratio=1.0):
+    """TOST power for the difference p2 - p1 and margins (lower, upper) with n in group 1."""
+    from scipy.stats import norm
+    lower, upper = np.asarray(lower, dtype=float), np.asarray(upper, dtype=float)
+    diff = np.asarray(p2, dtype=float) - np.asarray(p1, dtype=float)
+    se = np.sqrt(_prop_variance(p1, p2, ratio) / np.asarray(n, dtype=float))
+    z = norm.isf(alpha)
+    power = norm.cdf((upper - diff) / se - z) + norm.cdf((diff - lower) / se - z) - 1
+    return np.where(lower < upper, np.clip(power, 0, 1), np.nan)
+
+
+@memoize("prop_equivalence_sample")
+def prop_equivalence_sample(alpha, power, p1, p2, lower, upper, ratio=1.0):
+    """Group 1 size for TOST equivalence of proportions; NaN unless lower < p2 - p1 < upper."""
+    alpha, power, p1, p2, lower, upper, ratio = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (alpha, power, p1, p2, lower, upper, ratio)))
+    shape = alpha.shape
+    alpha, power, p1, p2, lower, upper, ratio = (np.ravel(v) for v in (alpha, power, p1, p2, lower, upper, ratio))
+    valid = (lower < p2 - p1) & (p2 - p1 < upper) & np.isfinite(_prop_variance(p1, p2, ratio))
+    n = np.full(alpha.shape, np.nan)
+    if valid.any():
+        idx = np.nonzero(valid)[0]
+        n[idx] = engine._min_integer_n(
+            lambda m: prop_equivalence_power(alpha[idx], m, p1[idx], p2[idx], lower[idx], upper[idx], ratio[idx]),
+            power[idx], 1)
+    return n.reshape(shape)
@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+Exact-test sample sizes for one and two proportions.
+
+The chi-square and normal approximations break down for rare events, so
+here power is computed from the exact distribution of the outcomes:
+
+- the exact binomial test of one proportion against p0 (two-sided p-values
+  by the minimum-likelihood rule of R's binom.test),
+- Fisher's exact test of two proportions (conditional on the total number
+  of events, two-sided by minimum likelihood as in fisher.test),
+- Barnard's unconditional exact test with the pooled z statistic: the
+  rejection region is the largest {z >= c} whose size stays below alpha
+  for every value of the common proportion on a grid (NUISANCE).
+
+Every power evaluation enumerates the outcome space as 2-D arrays of
+probability masses, one row per sample size (binomial), per total number
+of events (Fisher) or per nuisance proportion (Barnard), and rejects whole
+rows at once. Rows only cover the outcomes holding more than TAIL of the
+mass under the null or the alternative; each row starts at its own offset,
+so the arrays stay about 16 standard deviations wide however large N gets.
+All masses come from one table of log-factorials, sized to a power of two
+and shared by every N a search evaluates.
+
+Barnard's critical value is searched from the one found at the nearest N
+already evaluated. The boundaries of {|z| >= c} come from the roots of a
+quadratic in x2, and the bisection over c stops once few outcomes separate
+its two ends: those are then added in order of |z| while the size allows,
+which gives the exact critical value rather than one within a tolerance.
+
+The power of exact tests zig-zags with N, so the reported N is the
+smallest one found to reach the target: all N are scanned for the binomial
+test, and for the two-sample tests the N reached by bisection is followed
+by a check of the SAWTOOTH sizes below it.
+"""
+
+import functools
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+ONE_SAMPLE_TESTS = ("Exact Binomial",)
+TWO_SAMPLE_TESTS = ("Fisher", "Barnard")
+TAIL = 1e-14          # Outcomes beyond this tail mass are left out of the enumeration
+TIE_TOLERANCE = 1e-7  # Relative tolerance for equal probabilities in two-sided p-values (as in R)
+NUISANCE = None       # Common proportions Barnard's size is maximized over, see _nuisance()
+NUISANCE_POINTS = 101
+SAWTOOTH = 5          # Two-sample searches also try this many sizes below the bisection result
+BARNARD_BRACKET = 0.005 # Barnard's critical value is first bracketed this far either side of a neighbouring N's
+BARNARD_CELLS = 1024    # ... and bisected until at most this many outcomes lie between the bracket's regions
+SCAN_ROWS = 512       # Sample sizes evaluated per block in the binomial scan
+MAX_N = 100_000
+
+# n: sample size (group 1 for two samples); n_total: all subjects; power: exact power at n
+# size: attained type I error (Fisher: at the pooled proportion; Barnard: largest over the nuisance grid)
+ExactSampleSize = namedtuple("ExactSampleSize", ["test", "n", "n_total", "power", "size"])
+
+
+@functools.lru_cache(maxsize=4)
+def _log_factorials(size):
+    from scipy.special import gammaln
+    return gammaln(np.arange(size + 1) + 1.0)
+
+
+def _lf(n_max):
+    """Log-factorial table covering 0..n_max (rounded up, so neighbouring N share it)."""
+    return _log_factorials(1 << int(np.ceil(np.log2(n_max + 2))))
+
+
+def _log_binom(lf, n, k, p):
+    """log P(X = k) for X ~ Bin(n, p), -inf for k outside 0..n."""
+    inside = (k >= 0) & (k <= n)
+    k = np.clip(k, 0, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_pmf = lf[n] - lf[k] - lf[n - k] + k * np.log(p) + (n - k) * np.log1p(-p)
+    return np.where(inside, log_pmf, -np.inf)
+
+
+def _span(n, p):
+    """First and last count of Bin(n, p) outside the TAIL of either side."""
+    from scipy.stats import binom
+    return (np.asarray(binom.ppf(TAIL, n, p), dtype=np.int64),
+            np.minimum(np.asarray(binom.isf(TAIL, n, p), dtype=np.int64) + 1, n))
+
+
+def _pvalues(log_null, side):
+    """
+    p-value of every outcome in rows of null log-masses: side 1 upper tail,
+    -1 lower tail, 0 two-sided (sum of the masses no larger than the outcome's).
+    """
+    mass = np.exp(log_null)
+    if side > 0:
+        return np.cumsum(mass[:, ::-1], axis=1)[:, ::-1]
+    if side < 0:
+        return np.cumsum(mass, axis=1)
+    # Sort every row by log-mass and find each outcome's place with one searchsorted: offsetting
+    # the rows keeps them apart (log-masses are floored at -log_floor, far below any that counts)
+    log_floor = 1000.0
+    keys = np.maximum(log_null, -log_floor) + 2 * log_floor * np.arange(len(log_null))[:, None]
+    order = np.argsort(keys, axis=1)
+    sorted_keys = np.take_along_axis(keys, order, axis=1).ravel()
+    cumulative = np.cumsum(np.take_along_axis(mass, order, axis=1), axis=1).ravel()
+    place = np.searchsorted(sorted_keys, (keys + np.log1p(TIE_TOLERANCE)).ravel(), side="right") - 1
+    return cumulative[place].reshape(mass.shape)
+
+
+def _side(tails, upper):
+    """Tail of the one-sided test in the direction of the alternative, 0 for two-sided tests."""
+    if tails == engine.TWO_TAILED:
+        return 0
+    if tails == engine.ONE_TAILED:
+        return 1 if upper else -1
+    raise ValueError(f"tails must be {engine.TWO_TAILED!r} or {engine.ONE_TAILED!r}")
+
+
+def _check_proportions(*proportions):
+    for p in proportions:
+        if not 0 < p < 1:
+            raise ValueError("Proportions must be strictly between 0 and 1")
+
+
+# --- Exact binomial test ---
+
+def _binomial_rows(alpha, n, p0, p1, side):
+    """(power, size) of the exact binomial test for every sample size in the integer array n."""
+    lo0, hi0 = _span(n, p0)
+    lo1, hi1 = _span(n, p1)
+    lo, hi = np.minimum(lo0, lo1), np.maximum(hi0, hi1)
+    k = lo[:, None] + np.arange(int((hi - lo).max()) + 1) # Row i covers counts lo[i], lo[i] + 1, ...
+    lf = _lf(int(n.max()))
+    log_null = _log_binom(lf, n[:, None], k, p0)
+    reject = _pvalues(log_null, side) <= alpha
+    power = np.where(reject, np.exp(_log_binom(lf, n[:, None], k, p1)), 0).sum(axis=1)
+    return power, np.where(reject, np.exp(log_null), 0).sum(axis=1)
+
+
+@memoize("exact_binomial_power")
+def binomial_power(alpha, n, p0, p1, tails=engine.TWO_TAILED):
+    """Power of the exact binomial test of p0 when the true proportion is p1, for every n (int or array)."""
+    _check_proportions(p0, p1)
+    n = np.asarray(n)
+    power, _ = _binomial_rows(alpha, np.atleast_1d(n).astype(np.int64).ravel(), p0, p1, _side(tails, p1 > p0))
+    return power.reshape(n.shape)
+
+
+@memoize("exact_binomial_sample")
+def binomial_sample(alpha, power, p0, p1, tails=engine.TWO_TAILED):
+    """Smallest n whose exact binomial test reaches the power; returns an ExactSampleSize."""
+    _check_proportions(p0, p1)
+    if p0 == p1:
+        return ExactSampleSize(ONE_SAMPLE_TESTS[0], np.nan, np.nan, np.nan, np.nan)
+    side = _side(tails, p1 > p0)
+    z_alpha, z_beta = engine.get_z_scores(alpha, power, tails)
+    approx = ((z_alpha * np.sqrt(p0 * (1 - p0)) + z_beta * np.sqrt(p1 * (1 - p1))) / (p1 - p0)) ** 2
+    start = max(int(approx / 2), 1)
+    while start <= MAX_N: # Scan blocks of consecutive sizes upwards from half the normal approximation
+        n = np.arange(start, min(start + SCAN_ROWS, MAX_N + 1))
+        powers, sizes = _binomial_rows(alpha, n, p0, p1, side)
+        reached = np.flatnonzero(powers >= power)
+        if reached.size:
+            if reached[0] == 0 and start > 1: # Maybe reached earlier: restart further down
+                start = max(start // 2, 1)
+                continue
+            i = reached[0]
+            return ExactSampleSize(ONE_SAMPLE_TESTS[0], float(n[i]), float(n[i]), float(powers[i]), float(sizes[i]))
+        start += SCAN_ROWS
+    return ExactSampleSize(ONE_SAMPLE_TESTS[0], np.nan, np.nan, np.nan, np.nan)
+
+
+# --- Two proportions ---
+
+def _fisher(alpha, n1, n2, p1, p2, side):
+    """(power, size at the pooled proportion) of Fisher's exact test."""
+    n = n1 + n2
+    pooled = (n1 * p1 + n2 * p2) / n
+    lo1, hi1 = _span(n1, p1)
+    lo2, hi2 = _span(n2, p2)
+    lo0, hi0 = _span(n, pooled)
+    # Rows: total number of events t; columns: events in group 1, the row's conditional window
+    t = np.arange(min(lo1 + lo2, lo0), min(max(hi1 + hi2, hi0), n) + 1)
+    # Under the null, x1 given t is hypergeometric: Hoeffding's bound P(|x1 - mean| >= s) <= 2 exp(-2 s^2 / t)
+    # gives its window without scipy's (slow) discrete quantiles
+    mean, spread = t * n1 / n, np.sqrt(t * np.log(2 / TAIL) / 2)
+    lo = np.minimum(np.floor(mean - spread).astype(np.int64), np.maximum(lo1, t - hi2))
+    hi = np.maximum(np.ceil(mean + spread).astype(np.int64), np.minimum(hi1, t - lo2))
+    lo, hi = np.maximum(lo, np.maximum(t - n2, 0)), np.minimum(hi, np.minimum(t, n1))
+    t = t[:, None]
+    x1 = lo[:, None] + np.arange(int(max((hi - lo).max(), 0)) + 1)
+    lf = _lf(n)
+    inside = (x1 <= np.minimum(t, n1))
+    log_null = np.where(inside, _log_binom(lf, n1, x1, 0.5) + _log_binom(lf, n2, t - x1, 0.5)
+                        - _log_binom(lf, n, t, 0.5), -np.inf) # The 0.5 ** n factors cancel
+    reject = _pvalues(log_null, side) <= alpha
+    power = np.where(reject, np.exp(_log_binom(lf, n1, x1, p1) + _log_binom(lf, n2, t - x1, p2)), 0).sum()
+    size = np.where(reject, np.exp(_log_binom(lf, n1, x1, pooled) + _log_binom(lf, n2, t - x1, pooled)), 0).sum()
+    return power, size
+
+
+def _nuisance():
+    """Common proportions Barnard's test is maximized over: logit-spaced, so rare events are covered."""
+    global NUISANCE
+    if NUISANCE is None:
+        from scipy.special import expit
+        NUISANCE = expit(np.linspace(-10, 10, NUISANCE_POINTS))
+    return NUISANCE
+
+
+def _pooled_z(x1, x2, n1, n2):
+    """Pooled two-proportion z statistic (0 where the pooled proportion is 0 or 1)."""
+    pooled = (x1 + x2) / (n1 + n2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (x1 / n1 - x2 / n2) / np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    return np.where(np.isfinite(z), z, 0.0)
+
+
+def _boundaries(c, n1, n2):
+    """
+    For every x1 in 0..n1, the last x2 with z >= c and the first with z <= -c
+    (-1 / n2 + 1 if none). z falls as x2 grows and z = +-c is a quadratic in x2:
+    its roots give each boundary, and bisection settles the rows where rounding
+    puts a root on the wrong side.
+    """
+    x1 = np.arange(n1 + 1)
+    n = n1 + n2
+    # (x1 / n1 - x2 / n2)^2 = c^2 (1 / n1 + 1 / n2) p (1 - p) with p = (x1 + x2) / n
+    k = c ** 2 * (1 / n1 + 1 / n2) / n ** 2
+    a = 1 / n2 ** 2 + k
+    b = -2 * x1 / (n1 * n2) - k * (n - 2 * x1)
+    root = np.sqrt(np.maximum(b ** 2 - 4 * a * ((x1 / n1) ** 2 - k * x1 * (n - x1)), 0))
+    bounds = []
+    for sign, crossing in ((1, np.floor((-b - root) / (2 * a))), (-1, np.ceil((-b + root) / (2 * a)) - 1)):
+        def passes(x2): # x2 and below are in the upper region / x2 is before the lower one
+            z = _pooled_z(x1, np.clip(x2, 0, n2), n1, n2)
+            return z >= c if sign > 0 else z > -c
+        # z(lo) passes, z(hi) fails (outside: by definition); start from the root where that holds
+        lo = np.clip(np.nan_to_num(crossing, nan=-1), -1, n2).astype(np.int64)
+        hi = lo + 1
+        lo = np.where((lo < 0) | passes(lo), lo, -1)
+        hi = np.where((hi > n2) | ~passes(hi), hi, n2 + 1)
+        while True:
+            active = hi - lo > 1
+            if not active.any():
+                break
+            mid = (lo + hi) // 2
+            mid_passes = passes(mid)
+            lo = np.where(active & mid_passes, mid, lo)
+            hi = np.where(active & ~mid_passes, mid, hi)
+        bounds.append(lo if sign > 0 else hi)
+    return bounds
+
+
+def _barnard(alpha, n1, n2, p1, p2, side, start=None):
+    """
+    (power, largest size over the nuisance grid, critical value) of Barnard's exact
+    test (pooled z); start is a nearby critical value (from a neighbouring N) to search from.
+    """
+    if side < 0: # Lower-tailed test: swap the groups
+        n1, n2, p1, p2 = n2, n1, p2, p1
+    lf = _lf(max(n1, n2))
+    pis = _nuisance()[:, None]
+    # Per nuisance proportion, group 1 masses and group 2 tail sums, both windowed
+    lo1, hi1 = _span(n1, pis[:, 0])
+    lo1 = lo1[:, None]
+    x1 = lo1 + np.arange(int((hi1 - lo1[:, 0]).max()) + 1)
+    mass1 = np.exp(_log_binom(lf, n1, x1, pis))
+    x1 = np.minimum(x1, n1)
+    lo2, hi2 = _span(n2, pis[:, 0])
+    lo2 = lo2[:, None]
+    mass2 = np.exp(_log_binom(lf, n2, lo2 + np.arange(int((hi2 - lo2[:, 0]).max()) + 1), pis))
+    zeros = np.zeros((len(pis), 1))
+    cdf2 = np.hstack([zeros, np.cumsum(mass2, axis=1)])              # cdf2[:, j] = P(X2 < lo2 + j)
+    sf2 = np.hstack([np.cumsum(mass2[:, ::-1], axis=1)[:, ::-1], zeros]) # sf2[:, j] = P(X2 >= lo2 + j)
+    width = mass2.shape[1]
+    rows = np.arange(len(pis))[:, None]
+    offsets = rows * (width + 1)
+
+    def region(c):
+        upper, lower = _boundaries(c, n1, n2)
+        if side != 0:
+            lower = np.full_like(lower, n2 + 1)
+        return upper, lower
+
+    def sizes(bounds):
+        """Size of the region under every nuisance proportion."""
+        total = 0
+        for tail_sums, column in ((cdf2, bounds[0].take(x1) + 1), (sf2, bounds[1].take(x1))):
+            column -= lo2
+            np.clip(column, 0, width, out=column)
+            column += offsets # Flat indices: take() is much faster than 2-D fancy indexing
+            total = total + np.einsum("ij,ij->i", mass1, tail_sums.ravel().take(column))
+        return total
+
+    def cell_masses(x1_cells, x2_cells):
+        """Masses of the outcomes under every nuisance proportion (0 outside the windows)."""
+        product = 1.0
+        for mass, lo, x in ((mass1, lo1, x1_cells), (mass2, lo2, x2_cells)):
+            column = x - lo
+            inside = (column >= 0) & (column < mass.shape[1])
+            product = product * np.where(inside, mass[rows, np.where(inside, column, 0)], 0)
+        return product
+
+    def between(low, high):
+        """Outcomes (x1, x2, |z|) rejected at the critical value of low but not at that of high."""
+        x1_cells, x2_cells = [], []
+        for first, last in ((high[0] + 1, low[0]), (low[1], high[1] - 1)):
+            counts = np.maximum(last - first + 1, 0)
+            x1_cells.append(np.repeat(np.arange(n1 + 1), counts))
+            x2_cells.append(np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum()))
+        x1_cells, x2_cells = np.concatenate(x1_cells), np.concatenate(x2_cells)
+        return x1_cells, x2_cells, np.abs(_pooled_z(x1_cells, x2_cells, n1, n2))
+
+    # Smallest critical value whose size is at most alpha (size falls as c grows), bracketed around
+    # start or the normal critical value; size(c_hi) <= alpha throughout, so the test keeps its level
+    if start is None:
+        from scipy.stats import norm
+        start, step = norm.isf(alpha if side else alpha / 2), 1.0
+    else:
+        step = BARNARD_BRACKET
+    c_lo, c_hi = max(start - step, 0.0), start + step
+    low, high = region(c_lo), region(c_hi)
+    size_hi = sizes(high)
+    while size_hi.max() > alpha:
+        step *= 2
+        c_lo, c_hi, low = c_hi, c_hi + step, high
+        high = region(c_hi)
+        size_hi = sizes(high)
+    while c_lo > 0 and sizes(low).max() <= alpha:
+        step *= 2
+        c_lo, c_hi, high, size_hi = max(c_lo - step, 0.0), c_lo, low, sizes(low)
+        low = region(c_lo)
+    # Bisect until few outcomes separate the two regions...
+    while (np.maximum(low[0] - high[0], 0).sum() + np.maximum(high[1] - low[1], 0).sum() > BARNARD_CELLS
+           and c_hi - c_lo > 1e-12):
+        mid = (c_lo + c_hi) / 2
+        bounds = region(mid)
+        mid_size = sizes(bounds)
+        if mid_size.max() <= alpha:
+            c_hi, high, size_hi = mid, bounds, mid_size
+        else:
+            c_lo, low = mid, bounds
+    # ...then add them to the region at c_hi by decreasing |z| while the size stays within alpha
+    x1_cells, x2_cells, z = between(low, high)
+    if z.size:
+        order = np.argsort(-z, kind="stable")
+        x1_cells, x2_cells, z = x1_cells[order], x2_cells[order], z[order]
+        size_at = (size_hi[:, None] + np.cumsum(cell_masses(x1_cells, x2_cells), axis=1)).max(axis=0)
+        ends = np.flatnonzero(np.append(z[1:] != z[:-1], True)) # Equal |z| are rejected together
+        within = ends[size_at[ends] <= alpha]
+        if within.size:
+            c_hi = z[within[-1]]
+            high = region(c_hi)
+            size_hi = sizes(high)
+    upper, lower = high
+    mass_p1 = np.exp(_log_binom(lf, n1, np.arange(n1 + 1), p1))
+    mass_p2 = np.exp(_log_binom(lf, n2, np.arange(n2 + 1), p2))
+    cdf, sf = np.concatenate([[0], np.cumsum(mass_p2)]), np.concatenate([np.cumsum(mass_p2[::-1])[::-1], [0]])
+    return (mass_p1 * (cdf[upper + 1] + sf[lower])).sum(), size_hi.max(), c_hi
+
+
+def _two_sample(test, alpha, n1, p1, p2, tails, ratio, start=None):
+    """(power, size, critical value) of either test; Fisher's has no critical value (NaN)."""
+    if test not in TWO_SAMPLE_TESTS:
+        raise ValueError(f"Unknown test {test!r}, expected one of: {', '.join(TWO_SAMPLE_TESTS)}")
+    n2 = int(engine.second_group_n(n1, ratio))
+    if n1 < 1 or n2 < 1:
+        return np.nan, np.nan, np.nan
+    side = _side(tails, p1 > p2)
+    if test == "Fisher":
+        return (*_fisher(alpha, int(n1), n2, p1, p2, side), np.nan)
+    return _barnard(alpha, int(n1), n2, p1, p2, side, start)
+
+
+@memoize("exact_two_sample_power")
+def two_sample_power(test, alpha, n, p1, p2, tails=engine.TWO_TAILED, ratio=1.0):
+    """Power of Fisher's or Barnard's test with n in group 1 and ratio * n in group 2."""
+    _check_proportions(p1, p2)
+    return float(_two_sample(test, alpha, n, p1, p2, tails, ratio)[0])
+
+
+@memoize("exact_two_sample_sample")
+def two_sample_sample(test, alpha, power, p1, p2, tails=engine.TWO_TAILED, ratio=1.0):
+    """Smallest n (group 1) found to give Fisher's or Barnard's test the power; returns an ExactSampleSize."""
+    _check_proportions(p1, p2)
+    if p1 == p2 or not ratio > 0:
+        return ExactSampleSize(test, np.nan, np.nan, np.nan, np.nan)
+    evaluated = {}
+
+    def at(n):
+        if n not in evaluated:
+            # Barnard: search the critical value from the nearest N evaluated so far
+            nearest = min(evaluated, key=lambda m: abs(m - n), default=None)
+            start = None if nearest is None or np.isnan(evaluated[nearest][2]) else evaluated[nearest][2]
+            evaluated[n] = _two_sample(test, alpha, n, p1, p2, tails, ratio, start)
+        return evaluated[n][0]
+
+    z_alpha, z_beta = engine.get_z_scores(alpha, power, tails)
+    pooled = (p1 + ratio * p2) / (1 + ratio)
+    approx = ((z_alpha * np.sqrt(pooled * (1 - pooled) * (1 + 1 / ratio))
+               + z_beta * np.sqrt(p1 * (1 - p1) + p2 * (1 - p2) / ratio)) / (p1 - p2)) ** 2
+    lo, hi = 0, max(int(approx), 2)
+    while at(hi) < power: # Bracket, then bisect the rising trend of the power
+        if hi >= MAX_N:
+            return ExactSampleSize(test, np.nan, np.nan, np.nan, np.nan)
+        lo, hi = hi, min(2 * hi, MAX_N)
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if at(mid) >= power:
+            hi = mid
+        else:
+            lo = mid
+    for n in range(hi - 1, max(hi - SAWTOOTH, 0) - 1, -1):
+        if at(n) >= power:
+            hi = n
+    power, size, _ = evaluated[hi]
+    return ExactSampleSize(test, float(hi), float(hi + engine.second_group_n(hi, ratio)), float(power), float(size))
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Factorial ANOVA: sample size for every main effect and interaction at once.
+
+A design is given by the number of levels of each factor, e.g. (2, 3, 2).
+effects() lists its 2^k - 1 effects with their numerator df (the product of
+levels - 1 over the factors involved). sample_size() solves all of them in
+one batched call to engine.anova_cell_sample (exact noncentral F, through
+the precomputed tables when they exist) and reports the design-limiting
+effect: the one needing the most observations per cell, which sets the size
+of a balanced design that has the target power for every effect.
+
+Any number of factors works; five factors (31 effects) solve in a few
+milliseconds, fast enough for the GUI to recalculate as the inputs change.
+"""
+
+import itertools
+import string
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+Effect = namedtuple("Effect", ["name", "factors", "df_num"])
+
+# n_per_cell / total_n: balanced design powering every requested effect
+# limiting: the Effect needing the largest n per cell
+# effects, effect_n: every requested Effect and the n per cell it needs on its own
+# effect_power: power of each effect at n_per_cell
+FactorialResult = namedtuple("FactorialResult", ["n_per_cell", "total_n", "cells", "limiting",
+                                                 "effects", "effect_n", "effect_power"])
+
+
+def factor_name(index):
+    """A, B, ..., Z, then F27, F28, ... for very large designs."""
+    return string.ascii_uppercase[index] if index < 26 else f"F{index + 1}"
+
+
+def effects(levels, max_order=None):
+    """Tuple of all main effects and interactions of a design up to max_order factors, lowest order first."""
+    levels = tuple(int(k) for k in levels)
+    if not levels or min(levels) < 2:
+        raise ValueError("Every factor needs at least 2 levels")
+    max_order = len(levels) if max_order is None else min(max_order, len(levels))
+    result = []
+    for order in range(1, max_order + 1):
+        for factors in itertools.combinations(range(len(levels)), order):
+            df_num = int(np.prod([levels[i] - 1 for i in factors]))
+            result.append(Effect("×".join(factor_name(i) for i in factors), factors, df_num))
+    return tuple(result)
+
+
+@memoize("factorial.sample_size")
+def sample_size(alpha, power, f_effect, levels, max_order=None):
+    """
+    Balanced factorial design with the target power for every effect.
+
+    f_effect is Cohen's f, either one value for every effect or a sequence
+    with one value per effect in effects() order. max_order limits the
+    effects that must be powered (1 = main effects only). Returns a
+    FactorialResult; n_per_cell is NaN if some effect cannot reach the power.
+    """
+    design = effects(levels, max_order)
+    cells = int(np.prod(levels))
+    df_num = np.array([effect.df_num for effect in design], dtype=float)
+    f_effect = np.broadcast_to(np.asarray(f_effect, dtype=float), df_num.shape)
+    # Every effect in one vectorized solve
+    effect_n = np.asarray(engine.anova_cell_sample(alpha, power, f_effect, df_num, cells), dtype=float)
+    if np.isnan(effect_n).any():
+        n_per_cell, limiting = np.nan, design[int(np.argmax(np.isnan(effect_n)))]
+        effect_power = np.full(df_num.shape, np.nan)
+    else:
+        worst = int(np.argmax(effect_n)) # First effect with the largest n on ties (lowest order)
+        n_per_cell, limiting = float(effect_n[worst]), design[worst]
+        effect_power = engine.anova_effect_power(alpha, n_per_cell * cells, f_effect, df_num, cells)
+    return FactorialResult(n_per_cell, n_per_cell * cells, cells, limiting, design, effect_n, effect_power)
+
+
+def power(alpha, n_per_cell, f_effect, levels, max_order=None):
+    """Power of every effect of the design with n_per_cell observations per cell, in effects() order."""
+    design = effects(levels, max_order)
+    cells = int(np.prod(levels))
+    df_num = np.array([effect.df_num for effect in design], dtype=float)
+    return engine.anova_effect_power(alpha, np.asarray(n_per_cell, dtype=float) * cells, f_effect, df_num, cells)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Design-space grids: sample size over alpha x power x effect size.
+
+axis() turns a start / stop / step range into axis values. GridExplorer
+fills the alpha x power x effect tensor of sample sizes for one of the
+Advanced tab's test types (see sample_size.solver) with a single vectorized
+solver call, and remembers it. When the ranges change, every cell whose
+alpha, power and effect values were already in the previous grid is copied
+over, and only the new cells are solved: extending the effect range by two
+steps solves two effect slices, changing the design or the test solves
+everything again.
+
+Ranges are given by their step, not a number of points, so that extending
+a range keeps the values already computed.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import solver
+
+MAX_CELLS = 1_000_000 # Largest grid computed in one go
+_DECIMALS = 9         # Axis values are rounded so equal values from different ranges match
+
+# test_type, design: what was solved; alpha, power, effect: the axis values
+# n: sample sizes, shape (len(alpha), len(power), len(effect)), NaN where unreachable
+# computed: cells solved for this grid (the rest came from the previous one)
+GridResult = namedtuple("GridResult", ["test_type", "design", "alpha", "power", "effect", "n",
+                                       "computed", "seconds"])
+
+
+def axis(start, stop, step):
+    """Values start, start + step, ... up to stop (inclusive, allowing for round-off)."""
+    if step <= 0:
+        raise ValueError("The step of a range must be positive")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    if count < 1:
+        raise ValueError("The end of a range must not be below its start")
+    return np.round(start + step * np.arange(count), _DECIMALS)
+
+
+def _positions(new, old):
+    """Index of each new axis value in old, -1 where it is not there."""
+    if old is None or not len(old):
+        return np.full(len(new), -1)
+    order = np.argsort(old)
+    found = np.clip(np.searchsorted(old, new, sorter=order), 0, len(old) - 1)
+    idx = order[found]
+    return np.where(old[idx] == new, idx, -1)
+
+
+class GridExplorer:
+    """Sample size grid that recomputes only the cells a change of ranges adds."""
+
+    def __init__(self):
+        self.last = None
+
+    def compute(self, test_type, alpha, power, effect, design=None):
+        """GridResult for the given axis values (arrays, e.g. from axis())."""
+        start = time.perf_counter()
+        alpha, power, effect = (np.round(np.atleast_1d(np.asarray(v, dtype=float)), _DECIMALS)
+                                for v in (alpha, power, effect))
+        shape = (len(alpha), len(power), len(effect))
+        if np.prod(shape) > MAX_CELLS:
+            raise ValueError(f"The grid has {np.prod(shape):,} cells, more than the {MAX_CELLS:,} allowed")
+        n = np.full(shape, np.nan)
+        known = np.zeros(shape, dtype=bool)
+        last = self.last
+        if last is not None and last.test_type == test_type and last.design == design:
+            positions = [_positions(new, old) for new, old in ((alpha, last.alpha), (power, last.power),
+                                                               (effect, last.effect))]
+            keep = [np.flatnonzero(p >= 0) for p in positions]
+            if all(k.size for k in keep):
+                n[np.ix_(*keep)] = last.n[np.ix_(*(p[k] for p, k in zip(positions, keep)))]
+                known[np.ix_(*keep)] = True
+        ia, ip, ie = np.nonzero(~known)
+        if ia.size: # Every missing cell in one vectorized solve
+            n[ia, ip, ie] = solver.sample_size(test_type, alpha[ia], power[ip], effect[ie], design)
+        result = GridResult(test_type, design, alpha, power, effect, n, int(ia.size), time.perf_counter() - start)
+        self.last = result
+        return result
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation of the calculations: wall time, solver iterations, cache hits.
+
+Nothing is recorded until enable() is called. While disabled, span() hands
+back a shared no-op object and count() returns at once, so the hooks in the
+engine cost one attribute check each.
+
+Once enabled, every memoized calculation (and every GUI job) is a span:
+its start, duration, thread and counters are recorded when it ends. Counters
+are added to the innermost open span of the thread and rolled up into its
+parents, so a GUI job's span shows the solver iterations and cache hits of
+everything it called. Counters used by the package:
+
+    solver_iterations   vectorized power evaluations inside the root finders
+    cache_hits / cache_misses
+    table_hits          designs answered from the precomputed power tables
+    replications        simulated datasets
+
+summary() aggregates the spans by name (the GUI's diagnostics panel shows
+it) and write_chrome_trace() saves them for chrome://tracing or Perfetto.
+Setting SAMPLE_SIZE_TRACE=path enables recording at import and writes the
+trace there at exit.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+
+MAX_EVENTS = 100_000 # Oldest spans are dropped beyond this
+
+enabled = False
+
+# name, start / duration (ns, perf_counter), thread id and name, args (inputs and counters)
+Event = namedtuple("Event", ["name", "start_ns", "duration_ns", "thread_id", "thread_name", "args"])
+
+_events = deque(maxlen=MAX_EVENTS)
+_local = threading.local()
+
+
+class _NullSpan:
+    """What span() returns while recording is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed region; use through span()."""
+    __slots__ = ("name", "args", "counters", "start_ns")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.counters = {}
+
+    def set(self, **args):
+        """Attach more arguments (e.g. a result) to the span."""
+        self.args.update(args)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        stack = _local.stack
+        stack.pop()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        if stack: # Roll the counters up into the enclosing span
+            parent = stack[-1].counters
+            for key, value in self.counters.items():
+                parent[key] = parent.get(key, 0) + value
+        thread = threading.current_thread()
+        _events.append(Event(self.name, self.start_ns, end - self.start_ns, thread.ident, thread.name,
+                             {**self.args, **self.counters}))
+        return False
+
+
+def span(name, **args):
+    """Context manager timing a region under name (a no-op while disabled)."""
+    if not enabled:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def count(name, n=1):
+    """Add n to a counter of the innermost open span on this thread."""
+    if not enabled:
+        return
+    stack = getattr(_local, "stack", None)
+    if stack:
+        counters = stack[-1].counters
+        counters[name] = counters.get(name, 0) + n
+
+
+def counted(fn, name="solver_iterations"):
+    """fn, counting each call under name while recording (fn itself while disabled)."""
+    if not enabled:
+        return fn
+
+    def wrapper(*args, **kwargs):
+        count(name)
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def clear():
+    """Forget all recorded spans."""
+    _events.clear()
+
+
+def events():
+    """The recorded spans, oldest first."""
+    return list(_events)
+
+
+def summary():
+    """
+    Spans aggregated by name: {name: {"calls", "total_s", "mean_s", "max_s", "last_s", counters...}},
+    most total time first.
+    """
+    stats = {}
+    for event in list(_events):
+        entry = stats.get(event.name)
+        if entry is None:
+            entry = stats[event.name] = {"calls": 0, "total_s": 0.0, "max_s": 0.0}
+        seconds = event.duration_ns / 1e9
+        entry["calls"] += 1
+        entry["total_s"] += seconds
+        entry["max_s"] = max(entry["max_s"], seconds)
+        entry["last_s"] = seconds
+        for key, value in event.args.items():
+            if key in _COUNTERS:
+                entry[key] = entry.get(key, 0) + value
+    for entry in stats.values():
+        entry["mean_s"] = entry["total_s"] / entry["calls"]
+    return dict(sorted(stats.items(), key=lambda item: -item[1]["total_s"]))
+
+
+_COUNTERS = ("solver_iterations", "cache_hits", "cache_misses", "table_hits", "replications")
+
+
+def _jsonable(value):
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    try:
+        return float(value) # NumPy scalars and 0-d arrays
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def chrome_trace():
+    """The recorded spans as a Chrome trace (Trace Event Format) dict."""
+    pid = os.getpid()
+    recorded = list(_events)
+    trace = []
+    for thread_id, thread_name in {(e.thread_id, e.thread_name) for e in recorded}:
+        trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                      "args": {"name": thread_name}})
+    for event in recorded:
+        trace.append({"name": event.name, "cat": event.name.split(".")[0], "ph": "X", "pid": pid,
+                      "tid": event.thread_id, "ts": event.start_ns / 1000, "dur": event.duration_ns / 1000,
+                      "args": {key: _jsonable(value) for key, value in event.args.items()}})
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path):
+    """Save the recorded spans for chrome://tracing / Perfetto; returns the number of spans."""
+    trace = chrome_trace()
+    with open(path, "w") as fh:
+        json.dump(trace, fh)
+    return sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+
+
+if os.environ.get("SAMPLE_SIZE_TRACE"):
+    enable()
+    atexit.register(write_chrome_trace, os.environ["SAMPLE_SIZE_TRACE"])
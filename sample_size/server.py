@@ -0,0 +1,566 @@
+# -*- coding: utf-8 -*-
+"""
+Local HTTP/JSON calculation service.
+
+Every calculation behind the GUI is a POST endpoint taking and returning a
+JSON object:
+
+    /sample_size/<test>     any test of the batch mode (indep_t, oneway, chi_ind, ...):
+                            {"alpha", "power", "effect", design columns} -> {"n", "n_total"}
+    /power, /mdes           {"test_type", "alpha", "n", "effect" | "power", "design"} -> {"power"} | {"effect"}
+                            (design: groups, predictors, df, or the t-test's optional allocation ratio)
+    /factorial              {"alpha", "power", "f_effect", "levels", "max_order"}
+    /curve                  {"test_type", "alpha", "x": "n" | "effect", "effect" | "n", "max", "points", "design"}
+                            (at most the GUI's 20,000 points and max of 100,000 N or effect 3)
+    /sequential             {"test_type", "alpha", "power", "effect", "design", "looks", "boundary", "sides"}
+    /simulate/<model>       {"alpha", "n", effect and model inputs, "distribution", "seed"} (linear_reg, logistic_reg)
+    /simulate_n/<model>     the same with "power" instead of "n"
+
+GET /tests lists the tests and GET /stats reports batching and cache
+counters. Bad inputs are answered with 400 and unexpected failures with 500,
+both as {"error": message}. Connections are kept alive (HTTP/1.1). Each connection gets a
+handler thread, but the computing happens on a shared worker pool. Concurrent
+/sample_size, /power and /mdes requests are micro-batched: a collector waits
+up to the batch window for more requests and evaluates everything queued in
+one vectorized call. At most one batch per worker is in flight, so under load
+the queue (and with it the batch size) grows instead of the latency. Results
+go through the shared result cache, so a design that was asked for before is
+answered without touching the queue.
+
+Usage:
+    python sample_size_calculator.py serve --port 8765
+    python -m sample_size.server --load-test --requests 20000 --concurrency 32
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from sample_size import batch, curves, factorial, sequential, simulation, solver
+from sample_size.cache import RESULT_CACHE, cache_info, make_key
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_WINDOW_MS = 1.0 # How long the first request of a batch waits for company
+MAX_BATCH = 4096
+REQUEST_TIMEOUT = 120.0       # Seconds before a request gives up with 504
+CURVE_MAX_POINTS = 20_000     # /curve limits, the same as the GUI's Power Curve tab
+CURVE_MAX_N = 100_000
+CURVE_MAX_EFFECT = 3.0
+
+_MISSING = object()
+
+
+def _jsonable(value):
+    """NumPy values to JSON types, NaN/inf to null."""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, (np.generic,)):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+class RequestError(ValueError):
+    """Bad request (answered with 400)."""
+
+
+def _number(body, name, default=_MISSING):
+    value = body.get(name, default)
+    if value is _MISSING:
+        raise RequestError(f"Missing field {name!r}")
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"Field {name!r} must be a number") from None
+
+
+def _integer(body, name, default=_MISSING, minimum=None, maximum=None):
+    """Integer field (null gives None), optionally within [minimum, maximum]."""
+    value = body.get(name, default)
+    if value is _MISSING:
+        raise RequestError(f"Missing field {name!r}")
+    if value is None:
+        return None
+    if (isinstance(value, bool) or not isinstance(value, (int, float)) or not float(value).is_integer()
+            or (minimum is not None and value < minimum) or (maximum is not None and value > maximum)):
+        if minimum is None:
+            raise RequestError(f"Field {name!r} must be an integer")
+        limits = f">= {minimum}" if maximum is None else f"from {minimum} to {maximum}"
+        raise RequestError(f"Field {name!r} must be an integer {limits}")
+    return int(value)
+
+
+def _design(body, test_type):
+    """The design field of a solver test type (None if it has none); only the t-test's allocation ratio is optional."""
+    design_input = solver.TEST_TYPES[test_type].design_input
+    if design_input is None:
+        return None
+    return _number(body, "design", None if design_input == "ratio" else _MISSING) # Missing ratio: equal groups
+
+
+# --- Micro-batching ---
+
+class MicroBatcher:
+    """Collects concurrent requests of one kind and evaluates them in one vectorized call."""
+
+    def __init__(self, evaluate, executor, workers, window):
+        self._evaluate = evaluate # list of parsed requests -> list of result dicts
+        self._executor = executor
+        self._window = window
+        self._cond = threading.Condition()
+        self._pending = []
+        self._slots = threading.Semaphore(workers) # Batches in flight
+        self.batches = 0
+        self.items = 0
+        threading.Thread(target=self._collect, name="micro-batcher", daemon=True).start()
+
+    def submit(self, request):
+        future = Future()
+        with self._cond:
+            self._pending.append((request, future))
+            if len(self._pending) == 1 or len(self._pending) >= MAX_BATCH:
+                self._cond.notify()
+        return future
+
+    def _collect(self):
+        while True:
+            self._slots.acquire() # Wait for a free worker before taking a batch
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                deadline = time.monotonic() + self._window
+                while len(self._pending) < MAX_BATCH:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                work, self._pending = self._pending[:MAX_BATCH], self._pending[MAX_BATCH:]
+            self.batches += 1
+            self.items += len(work)
+            self._executor.submit(self._run, work)
+
+    def _run(self, work):
+        try:
+            results = self._evaluate([request for request, _ in work])
+            for (_, future), result in zip(work, results):
+                future.set_result(result)
+        except Exception as e: # Never leave a caller waiting
+            for _, future in work:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        return {"batches": self.batches, "requests": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0}
+
+
+def _evaluate_sample_size(requests):
+    """One batch.compute_chunk call for any mix of tests."""
+    names = {name for request in requests for name in request}
+    columns = {}
+    for name in names:
+        text = name in batch.TEXT_COLUMNS
+        columns[name] = np.array([request.get(name, "" if text else np.nan) for request in requests],
+                                 dtype=str if text else float)
+    n, n_total = batch.compute_chunk(columns)
+    return [{"n": float(a), "n_total": float(b)} for a, b in zip(n, n_total)]
+
+
+def _solver_evaluator(func, x_name, result_name):
+    """Evaluate solver.power / solver.mdes once per test type (and per test type without a design)."""
+    def evaluate(requests):
+        results = [None] * len(requests)
+        groups = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(request["test_type"], []).append(i)
+        for test_type, idx in groups.items():
+            rows = [requests[i] for i in idx]
+            arrays = [np.array([row[name] for row in rows]) for name in ("alpha", x_name, "n_or_effect")]
+            design = None
+            if solver.TEST_TYPES[test_type].design_input is not None:
+                design = np.array([row["design"] for row in rows])
+            values = np.atleast_1d(func(test_type, *arrays, design))
+            for i, value in zip(idx, values):
+                results[i] = {result_name: float(value)}
+        return results
+    return evaluate
+
+
+# --- Service ---
+
+class CalculationService:
+    """Request parsing, caching and dispatch; shared by all connections."""
+
+    def __init__(self, workers=None, batch_window_ms=DEFAULT_BATCH_WINDOW_MS):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="calc-worker")
+        window = batch_window_ms / 1000
+        self.batchers = {
+            "sample_size": MicroBatcher(_evaluate_sample_size, self.executor, self.workers, window),
+            "power": MicroBatcher(_solver_evaluator(solver.power, "n", "power"), self.executor, self.workers, window),
+            "mdes": MicroBatcher(_solver_evaluator(solver.mdes, "power", "effect"), self.executor, self.workers, window),
+        }
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def handle(self, path, body):
+        """Result dict for a POST to path, or raise RequestError / KeyError (unknown path)."""
+        with self._lock:
+            self.requests += 1
+        parts = path.strip("/").split("/")
+        kind, arg = parts[0], (parts[1] if len(parts) > 1 else None)
+        if kind == "sample_size":
+            return self._batched("sample_size", *self._parse_sample_size(arg, body))
+        if kind in ("power", "mdes"):
+            return self._batched(kind, *self._parse_solver(kind, body))
+        if kind == "factorial":
+            return self._direct(self._factorial, body)
+        if kind == "curve":
+            return self._direct(self._curve, body)
+        if kind == "sequential":
+            return self._direct(self._sequential, body)
+        if kind in ("simulate", "simulate_n"):
+            return self._direct(self._simulate, kind, arg, body)
+        raise KeyError(path)
+
+    def _batched(self, kind, key, request):
+        cached = RESULT_CACHE.get(key, _MISSING) if key is not None else _MISSING
+        if cached is not _MISSING:
+            return cached
+        result = self.batchers[kind].submit(request).result(REQUEST_TIMEOUT)
+        if key is not None:
+            RESULT_CACHE.put(key, result)
+        return result
+
+    def _direct(self, func, *args):
+        return self.executor.submit(func, *args).result(REQUEST_TIMEOUT)
+
+    @staticmethod
+    def _parse_sample_size(test, body):
+        if test not in batch.TESTS:
+            raise RequestError(f"Unknown test {test!r}, expected one of: {', '.join(batch.TESTS)}")
+        request = {"test": test}
+        for name in ("alpha", "power", "effect"):
+            request[name] = _number(body, name)
+        for name in batch.TESTS[test][1]:
+            if name in batch.TEXT_COLUMNS:
+                value = body.get(name, batch.COLUMN_DEFAULTS.get(name, ""))
+                choices = batch.TEXT_CHOICES.get(name)
+                if choices is not None and value not in choices:
+                    raise RequestError(f"Field {name!r} must be one of: {', '.join(choices)}")
+                request[name] = str(value)
+            else:
+                request[name] = _number(body, name, batch.COLUMN_DEFAULTS.get(name, _MISSING))
+        return make_key("server.sample_size", *request.values()), request
+
+    @staticmethod
+    def _parse_solver(kind, body):
+        test_type = body.get("test_type")
+        if test_type not in solver.TEST_TYPES:
+            raise RequestError(f"Unknown test_type {test_type!r}, expected one of: {', '.join(solver.TEST_TYPES)}")
+        x_name, other = ("n", "effect") if kind == "power" else ("power", "n")
+        request = {"test_type": test_type, "alpha": _number(body, "alpha"), x_name: _number(body, x_name),
+                   "n_or_effect": _number(body, other)}
+        if solver.TEST_TYPES[test_type].design_input is not None:
+            request["design"] = _design(body, test_type)
+        return make_key(f"server.{kind}", *request.values()), request
+
+    @staticmethod
+    def _factorial(body):
+        levels = body.get("levels")
+        if not isinstance(levels, list) or not levels:
+            raise RequestError("Field 'levels' must be a list of factor levels")
+        levels = tuple(_integer({"levels": k}, "levels", minimum=2) for k in levels)
+        result = factorial.sample_size(_number(body, "alpha"), _number(body, "power"), _number(body, "f_effect"),
+                                       levels, _integer(body, "max_order", None, minimum=1))
+        return {"n_per_cell": result.n_per_cell, "total_n": result.total_n, "cells": result.cells,
+                "limiting": result.limiting.name,
+                "effects": [{"name": e.name, "df_num": e.df_num, "n_per_cell": n, "power": p}
+                            for e, n, p in zip(result.effects, result.effect_n, result.effect_power)]}
+
+    @staticmethod
+    def _curve(body):
+        test_type = body.get("test_type")
+        if test_type not in solver.TEST_TYPES:
+            raise RequestError(f"Unknown test_type {test_type!r}")
+        design = _design(body, test_type)
+        points = _integer(body, "points", 200, minimum=2, maximum=CURVE_MAX_POINTS)
+        along_n = body.get("x", "n") == "n"
+        limit = CURVE_MAX_N if along_n else CURVE_MAX_EFFECT
+        x_max = _number(body, "max")
+        if not 0 < x_max <= limit:
+            raise RequestError(f"Field 'max' must be above 0 and at most {limit:g}")
+        if along_n:
+            x, power = curves.power_vs_n(test_type, _number(body, "alpha"), _number(body, "effect"),
+                                         x_max, points, design)
+        else:
+            x, power = curves.power_vs_effect(test_type, _number(body, "alpha"), _number(body, "n"),
+                                              x_max, points, design)
+        return {"x": x, "power": power}
+
+    @staticmethod
+    def _sequential(body):
+        test_type = body.get("test_type")
+        if test_type not in solver.TEST_TYPES:
+            raise RequestError(f"Unknown test_type {test_type!r}")
+        looks = body.get("looks", sequential.DEFAULT_LOOKS)
+        try:
+            result = sequential.sample_size(test_type, _number(body, "alpha"), _number(body, "power"),
+                                            _number(body, "effect"), _design(body, test_type),
+                                            tuple(looks) if isinstance(looks, list) else looks,
+                                            body.get("boundary", sequential.DEFAULT_BOUNDARY), body.get("sides", 2))
+        except (TypeError, ValueError) as e:
+            raise RequestError(str(e)) from None
+        bounds = result.boundaries
+        return {"n_fixed": result.n_fixed, "n_max": result.n_max, "n_looks": result.n_looks,
+                "expected_h0": result.expected_h0, "expected_h1": result.expected_h1,
+                "inflation": bounds.inflation, "fractions": bounds.fractions, "upper": bounds.upper,
+                "nominal": bounds.nominal, "alpha_spent": bounds.alpha_spent, "stop_h1": bounds.stop_h1}
+
+    @staticmethod
+    def _simulate(kind, model, body):
+        options = {"seed": _integer(body, "seed", None, minimum=0)}
+        distribution = body.get("distribution", "Normal")
+        alpha = _number(body, "alpha")
+        target = _number(body, "n" if kind == "simulate" else "power")
+        if model == "linear_reg":
+            args = (alpha, target, _number(body, "f2"), _integer(body, "predictors", minimum=1), distribution)
+            func = simulation.linear_reg_power if kind == "simulate" else simulation.linear_reg_sample
+        elif model == "logistic_reg":
+            args = (alpha, target, _number(body, "odds_ratio"), _number(body, "p1"),
+                    _number(body, "r2_other", 0.0), distribution)
+            func = simulation.logistic_reg_power if kind == "simulate" else simulation.logistic_reg_sample
+        else:
+            raise RequestError(f"Unknown model {model!r}, expected one of: {', '.join(simulation.MODELS)}")
+        result = func(*args, **options)
+        result = result._asdict()
+        result["seed"] = str(result["seed"]) # 128-bit entropy does not fit a JSON number
+        return result
+
+    def stats(self):
+        info = cache_info()
+        return {"requests": self.requests, "workers": self.workers,
+                "batchers": {kind: b.stats() for kind, b in self.batchers.items()},
+                "cache": {"hits": info.hits, "misses": info.misses, "size": info.size}}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256 # Many clients connecting at once (the default backlog is 5)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    disable_nagle_algorithm = True # Headers and body are separate writes; don't wait for the ACK in between
+    service = None                 # Set by make_server
+
+    def _send(self, status, payload):
+        data = json.dumps(_jsonable(payload)).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.service.stats())
+        elif self.path == "/tests":
+            self._send(200, {"sample_size": {test: list(spec[1]) for test, spec in batch.TESTS.items()},
+                             "test_types": list(solver.TEST_TYPES),
+                             "simulation_models": list(simulation.MODELS),
+                             "distributions": list(simulation.DISTRIBUTIONS)})
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise RequestError("Request body must be a JSON object")
+            self._send(200, self.service.handle(self.path, body))
+        except (RequestError, json.JSONDecodeError) as e:
+            self._send(400, {"error": str(e)})
+        except KeyError:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+        except TimeoutError:
+            self._send(504, {"error": "Calculation timed out"})
+        except ValueError as e: # Inputs the calculation itself rejects
+            self._send(400, {"error": str(e)})
+        except Exception as e: # Anything else still gets a JSON answer, and the connection stays usable
+            self._send(500, {"error": f"Internal error: {type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args): # Quiet; a load test would flood stderr
+        pass
+
+
+def make_server(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, batch_window_ms=DEFAULT_BATCH_WINDOW_MS):
+    """ThreadingHTTPServer bound to host:port (port 0 picks a free one); call serve_forever() on it."""
+    handler = type("Handler", (_Handler,), {"service": CalculationService(workers, batch_window_ms)})
+    return _Server((host, port), handler)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, batch_window_ms=DEFAULT_BATCH_WINDOW_MS, ready=None):
+    server = make_server(host, port, workers, batch_window_ms)
+    if ready is not None:
+        ready.put(server.server_address[1])
+    print(f"Serving on http://{host}:{server.server_address[1]}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- Load generator ---
+
+def _request_mix(distinct, rng):
+    """distinct random design requests (path, body) across the batched endpoints."""
+    mix = []
+    for _ in range(distinct):
+        alpha = rng.choice((0.01, 0.05, 0.1))
+        power = round(rng.uniform(0.6, 0.95), 3)
+        kind = rng.random()
+        if kind < 0.5:
+            test = rng.choice(("indep_t", "paired_t", "pearson", "oneway", "chi_ind"))
+            body = {"alpha": alpha, "power": power,
+                    "effect": round(rng.uniform(0.05, 0.2) if test == "pearson" else rng.uniform(0.1, 0.8), 4)}
+            if test == "oneway":
+                body["groups"] = rng.randint(2, 6)
+            elif test == "chi_ind":
+                body["df"] = rng.randint(1, 6)
+            mix.append((f"/sample_size/{test}", body))
+        elif kind < 0.8:
+            mix.append(("/power", {"test_type": "T-Test (Independent)", "alpha": alpha,
+                                   "n": rng.randint(10, 300), "effect": round(rng.uniform(0.1, 0.8), 4)}))
+        else:
+            mix.append(("/mdes", {"test_type": "Chi-Square", "alpha": alpha, "power": power,
+                                  "n": rng.randint(20, 500), "design": rng.randint(1, 5)}))
+    return mix
+
+
+def load_test(host, port, requests=10_000, concurrency=16, distinct=None, seed=0):
+    """
+    Fire requests POSTs at a running server from concurrency keep-alive connections.
+
+    distinct designs are drawn at random (default: all different, so nothing
+    is answered from the cache). Returns a dict with throughput, latency
+    percentiles (ms) and the server's batching and cache counters.
+    """
+    rng = random.Random(seed)
+    mix = _request_mix(distinct or requests, rng)
+    order = [mix[i % len(mix)] for i in range(requests)]
+    rng.shuffle(order)
+    latencies = np.zeros(requests)
+    errors = [0]
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection(host, port)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            path, body = order[i]
+            start = time.perf_counter()
+            conn.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            latencies[i] = time.perf_counter() - start
+            if response.status != 200:
+                errors[0] += 1
+        conn.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - start
+    conn = http.client.HTTPConnection(host, port)
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    ms = latencies * 1000
+    return {"requests": requests, "concurrency": concurrency, "errors": errors[0], "seconds": seconds,
+            "throughput": requests / seconds,
+            "latency_ms": {"p50": float(np.percentile(ms, 50)), "p95": float(np.percentile(ms, 95)),
+                           "p99": float(np.percentile(ms, 99)), "max": float(ms.max())},
+            "server": stats}
+
+
+def _print_report(report):
+    lat = report["latency_ms"]
+    print(f"{report['requests']:,} requests from {report['concurrency']} connections in {report['seconds']:.2f} s "
+          f"({report['throughput']:,.0f} req/s, {report['errors']} errors)")
+    print(f"Latency ms: p50 {lat['p50']:.2f}  p95 {lat['p95']:.2f}  p99 {lat['p99']:.2f}  max {lat['max']:.2f}")
+    for kind, b in report["server"]["batchers"].items():
+        print(f"  {kind}: {b['requests']:,} requests in {b['batches']:,} batches (mean size {b['mean_batch_size']:.1f})")
+    cache = report["server"]["cache"]
+    print(f"  cache: {cache['hits']:,} hits, {cache['misses']:,} misses")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="sample_size_calculator.py serve",
+                                     description="Serve the calculations as a local HTTP/JSON API, or load-test it.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="calculation threads (default: CPU count)")
+    parser.add_argument("--batch-window-ms", type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help="how long a request waits for others to batch with (default %(default)s)")
+    parser.add_argument("--load-test", action="store_true",
+                        help="start a server in a child process (or use --port of a running one with --external) and load it")
+    parser.add_argument("--external", action="store_true", help="load-test the server already running at --host/--port")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=None,
+                        help="number of different designs in the load (default: all different)")
+    args = parser.parse_args(argv)
+
+    if not args.load_test:
+        serve(args.host, args.port, args.workers, args.batch_window_ms)
+        return 0
+
+    process = None
+    port = args.port
+    if not args.external:
+        import multiprocessing
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        process = context.Process(target=serve, args=(args.host, 0, args.workers, args.batch_window_ms, ready),
+                                  daemon=True)
+        process.start()
+        port = ready.get(timeout=60)
+    try:
+        _print_report(load_test(args.host, port, args.requests, args.concurrency, args.distinct))
+    finally:
+        if process is not None:
+            process.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo power for the regression models and the log-rank test.
+
+The closed-form regression formulas (the noncentral F for linear
+regression, Hsieh et al. for logistic regression) assume normal predictors
+and, for logistic regression, large samples. Here power is estimated by simulation instead: generate
+datasets with the planned N and effect, fit the model, test, and count
+rejections. Predictors can be normal, skewed (standardized lognormal) or
+binary. Survival trials (see sample_size.survival) are simulated with
+piecewise-exponential event times, uniform accrual, exponential dropout and
+a log-rank test at the end of follow-up.
+
+Replications run in batches. Every batch is fitted at once with NumPy
+(batched normal equations for OLS, vectorized IRLS for logistic regression),
+and batches are spread over a process pool. Batch i always draws from the
+i-th child of the run's SeedSequence and batches are consumed in order, so
+a given seed gives the same answer whatever the number of workers. The run
+stops as soon as the Wilson confidence interval of the power estimate is
+narrower than the requested half-width.
+
+linear_reg_sample() and logistic_reg_sample() search for the N reaching a
+target simulated power without scanning N: the analytic N is the starting
+point, a probit curve in sqrt(N) is fitted to all simulations so far, and
+each further step of replications goes to the N that most narrows the
+confidence interval of the fitted N.
+"""
+
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.special import expit, logit
+from scipy.stats import norm, f as f_dist
+
+from sample_size import instrument
+
+DISTRIBUTIONS = ("Normal", "Skewed (lognormal)", "Binary")
+
+DEFAULT_BATCH_SIZE = 250       # Replications per task sent to a worker
+DEFAULT_MAX_REPLICATIONS = 10_000
+DEFAULT_CI_HALF_WIDTH = 0.01   # Stop once power is known to +/- this (95% Wilson interval)
+MIN_REPLICATIONS = 500         # Never stop before this many replications
+SEARCH_STEP = 1000             # Replications per N evaluated by the N search
+SEARCH_TOLERANCE = 0.02        # Stop the N search once the 95% CI of N is within +/- 2%
+SEARCH_MAX_SIMULATIONS = 60_000
+SEARCH_MAX_N = 100_000         # The N search gives up (NaN) rather than simulate beyond this
+_BATCH_ELEMENTS = 4_000_000    # Upper limit on replications * n * columns fitted in one go (memory)
+
+SimulationResult = namedtuple("SimulationResult", ["power", "ci_low", "ci_high", "replications",
+                                                   "rejections", "seconds", "seed", "stopped_early"])
+
+# n, n_low, n_high: smallest N whose fitted power reaches the target, and its 95% CI (NaN if not found)
+# power: fitted power at n
+# points: (N, replications, rejections) for every N simulated, in N order
+# simulations: total replications used
+SearchResult = namedtuple("SearchResult", ["n", "n_low", "n_high", "power", "points",
+                                           "simulations", "seconds", "seed"])
+
+
+# --- Data generation and batched fitting (run in the workers) ---
+
+def _predictors(rng, shape, distribution):
+    """Standardized (mean 0, variance 1) predictor values."""
+    if distribution == "Normal":
+        return rng.standard_normal(shape)
+    if distribution == "Skewed (lognormal)":
+        # exp(Z) has mean e^0.5 and variance (e - 1) e; skewness about 6.2
+        return (np.exp(rng.standard_normal(shape)) - math.exp(0.5)) / math.sqrt((math.e - 1) * math.e)
+    if distribution == "Binary":
+        return rng.integers(0, 2, shape) * 2.0 - 1.0
+    raise ValueError(f"Unknown predictor distribution {distribution!r}, expected one of: {', '.join(DISTRIBUTIONS)}")
+
+
+def _linear_rejections(rng, reps, n, alpha, f2, predictors, distribution):
+    """
+    Overall F test of a linear regression with equal standardized slopes.
+
+    With independent unit-variance predictors and unit error variance, slopes
+    of sqrt(f2 / predictors) give a population R^2 of f2 / (1 + f2).
+    """
+    p = int(predictors)
+    slope = math.sqrt(f2 / p)
+    crit = f_dist.isf(alpha, p, n - p - 1)
+    x = _predictors(rng, (reps, n, p), distribution)
+    y = slope * x.sum(axis=2) + rng.standard_normal((reps, n))
+    # Centering removes the intercept, leaving p x p normal equations per replication
+    x -= x.mean(axis=1, keepdims=True)
+    y -= y.mean(axis=1, keepdims=True)
+    xtx = np.matmul(x.transpose(0, 2, 1), x)
+    xty = np.matmul(x.transpose(0, 2, 1), y[:, :, None])
+    beta = np.linalg.solve(xtx, xty)
+    explained = np.matmul(xty.transpose(0, 2, 1), beta)[:, 0, 0] # Regression sum of squares
+    total = (y ** 2).sum(axis=1)
+    f_stat = (explained / p) / ((total - explained) / (n - p - 1))
+    return int((f_stat > crit).sum())
+
+
+def _logistic_rejections(rng, reps, n, alpha, odds_ratio, p1, r2_other, distribution, max_iter=25):
+    """
+    Wald test of X1 in a logistic regression, fitted by vectorized IRLS.
+
+    X1 follows the chosen distribution, the log odds ratio is per unit (SD) of
+    X1 and p1 is the event probability at X1 = 0. With r2_other > 0 a second
+    covariate correlated with X1 (R^2 = r2_other, no effect of its own) is
+    adjusted for, as in Hsieh's variance inflation.
+    """
+    x1 = _predictors(rng, (reps, n), distribution)
+    columns = [np.ones((reps, n)), x1]
+    if r2_other > 0:
+        rho = math.sqrt(r2_other)
+        columns.append(rho * x1 + math.sqrt(1 - r2_other) * rng.standard_normal((reps, n)))
+    x = np.stack(columns, axis=2)
+    y = rng.random((reps, n)) < expit(logit(p1) + math.log(odds_ratio) * x1)
+    k = x.shape[2]
+    beta = np.zeros((reps, k))
+    beta[:, 0] = logit(np.clip(y.mean(axis=1), 0.5 / n, 1 - 0.5 / n))
+    ridge = 1e-10 * np.eye(k)
+    active = np.ones(reps, dtype=bool)
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if not idx.size:
+            break
+        xa = x[idx]
+        mu = expit(np.clip(np.einsum("rnk,rk->rn", xa, beta[idx]), -30, 30))
+        weights = mu * (1 - mu)
+        hessian = np.matmul(xa.transpose(0, 2, 1), xa * weights[:, :, None]) + ridge
+        score = np.einsum("rnk,rn->rk", xa, y[idx] - mu)
+        step = np.linalg.solve(hessian, score[:, :, None])[:, :, 0]
+        beta[idx] += step
+        active[idx] = np.abs(step).max(axis=1) > 1e-8
+    mu = expit(np.clip(np.einsum("rnk,rk->rn", x, beta), -30, 30))
+    hessian = np.matmul(x.transpose(0, 2, 1), x * (mu * (1 - mu))[:, :, None]) + ridge
+    se = np.sqrt(np.linalg.inv(hessian)[:, 1, 1])
+    # Separated samples have huge standard errors and are not counted as rejections,
+    # like a Wald test from a regular fitting routine
+    z = np.abs(beta[:, 1]) / se
+    return int((z > norm.isf(alpha / 2)).sum())
+
+
+def _piecewise_exponential(rng, shape, cuts, hazards):
+    """Event times with hazard hazards[k] from cuts[k - 1] to cuts[k] (cuts start at 0, last piece open)."""
+    starts = np.concatenate([[0.0], cuts])
+    cumulative = np.concatenate([[0.0], np.cumsum(np.diff(starts) * hazards[:-1])]) # Cumulative hazard at starts
+    target = rng.exponential(size=shape)
+    piece = np.searchsorted(cumulative, target, side="right") - 1
+    return starts[piece] + (target - cumulative[piece]) / hazards[piece]
+
+
+def _logrank_rejections(rng, reps, n, alpha, cuts, hazards, hr, accrual, follow_up, dropout, ratio, tails):
+    """
+    Log-rank test of a trial with n subjects in total, n2 / n1 = ratio.
+
+    Group 1 has the piecewise-constant hazards, group 2 those times hr (one
+    ratio, or one per piece). Subjects enter uniformly over the accrual
+    period, are lost at rate dropout and are censored at the analysis, at the
+    end of follow-up after accrual closes.
+    """
+    cuts, hazards = np.asarray(cuts, dtype=float), np.asarray(hazards, dtype=float)
+    n1 = int(round(n / (1 + ratio)))
+    group2 = np.arange(n) >= n1
+    times = np.empty((reps, n))
+    times[:, ~group2] = _piecewise_exponential(rng, (reps, n1), cuts, hazards)
+    times[:, group2] = _piecewise_exponential(rng, (reps, n - n1), cuts, hazards * np.asarray(hr, dtype=float))
+    censor = accrual + follow_up - rng.uniform(0, accrual, (reps, n)) if accrual > 0 else np.full((reps, n), follow_up)
+    if dropout > 0:
+        censor = np.minimum(censor, rng.exponential(1 / dropout, (reps, n)))
+    event = times <= censor
+    order = np.argsort(np.minimum(times, censor), axis=1) # Continuous times: no ties
+    event = np.take_along_axis(event, order, axis=1)
+    in_group2 = group2[order]
+    # Everyone from position i on is still at risk at the i-th time
+    at_risk = n - np.arange(n)
+    at_risk2 = (n - n1) - np.cumsum(in_group2, axis=1) + in_group2
+    share2 = at_risk2 / at_risk
+    observed_minus_expected = np.where(event, in_group2 - share2, 0).sum(axis=1)
+    variance = np.where(event, share2 * (1 - share2), 0).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = observed_minus_expected / np.sqrt(variance)
+    z = np.where(np.isfinite(z), z, 0.0)
+    if tails == "Two-tailed":
+        return int((np.abs(z) > norm.isf(alpha / 2)).sum())
+    # One-tailed in the direction of the effect: fewer group 2 events than expected when hr < 1
+    direction = -1 if np.mean(np.log(hr)) < 0 else 1
+    return int((direction * z > norm.isf(alpha)).sum())
+
+
+MODELS = {
+    "linear_reg": _linear_rejections,
+    "logistic_reg": _logistic_rejections,
+    "logrank": _logrank_rejections,
+}
+
+
+def _run_batch(model, seed, reps, n, params):
+    """Rejections in one batch of replications (the unit of work sent to a worker)."""
+    rng = np.random.default_rng(seed)
+    columns = 3 + (params[-2] if model == "linear_reg" else 0) # Rough width of the design matrix
+    chunk = max(1, min(reps, _BATCH_ELEMENTS // max(n * columns, 1)))
+    rejections = 0
+    for start in range(0, reps, chunk):
+        rejections += MODELS[model](rng, min(chunk, reps - start), n, *params)
+    return rejections
+
+
+# --- Process pool ---
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _executor(workers):
+    """Shared process pool, created on first use and grown if more workers are asked for."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: forking a process that runs Qt and worker threads is not safe
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def shutdown():
+    """Stop the worker processes (also registered to run at exit)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _pool_workers = None, 0
+
+
+# --- Driver ---
+
+def wilson_interval(successes, trials, z=1.959963984540054):
+    """95% Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = successes / trials
+    centre = (p + z * z / (2 * trials)) / (1 + z * z / trials)
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / (1 + z * z / trials)
+    return max(centre - half, 0.0), min(centre + half, 1.0)
+
+
+def simulate_power(model, n, params, seed=None, max_replications=DEFAULT_MAX_REPLICATIONS,
+                   ci_half_width=DEFAULT_CI_HALF_WIDTH, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Estimate the power of a model (a key of MODELS) at sample size n by simulation.
+
+    params are the MODELS function's arguments from alpha on. workers=1 runs
+    in this process; None uses every CPU. ci_half_width=0 always runs
+    max_replications. Returns a SimulationResult; seed is the entropy of the
+    run, pass it back in to reproduce the result exactly.
+    """
+    start = time.perf_counter()
+    workers = (os.cpu_count() or 1) if workers is None else max(int(workers), 1)
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    n_batches = -(-int(max_replications) // batch_size)
+    seeds = sequence.spawn(n_batches)
+    sizes = [min(batch_size, max_replications - i * batch_size) for i in range(n_batches)]
+    n = int(n)
+
+    def finished(reps, rejections):
+        low, high = wilson_interval(rejections, reps)
+        return reps >= MIN_REPLICATIONS and (high - low) / 2 <= ci_half_width
+
+    reps = rejections = 0
+    stopped_early = False
+    if workers == 1:
+        for batch_seed, size in zip(seeds, sizes):
+            rejections += _run_batch(model, batch_seed, size, n, params)
+            reps += size
+            if finished(reps, rejections):
+                stopped_early = reps < max_replications
+                break
+    else:
+        pool = _executor(workers)
+        pending = {} # batch index -> future; results are consumed in batch order
+        next_batch = 0
+        for i in range(n_batches):
+            while next_batch < n_batches and next_batch < i + 2 * workers: # Keep every worker busy
+                pending[next_batch] = pool.submit(_run_batch, model, seeds[next_batch], sizes[next_batch], n, params)
+                next_batch += 1
+            rejections += pending.pop(i).result()
+            reps += sizes[i]
+            if finished(reps, rejections):
+                stopped_early = reps < max_replications
+                break
+        for future in pending.values(): # Speculative batches past the stopping point
+            future.cancel()
+    low, high = wilson_interval(rejections, reps)
+    instrument.count("replications", reps)
+    return SimulationResult(rejections / reps, low, high, reps, rejections,
+                            time.perf_counter() - start, sequence.entropy, stopped_early)
+
+
+def linear_reg_power(alpha, n, f2, predictors, distribution="Normal", **options):
+    """Simulated power of the overall F test of a linear regression with n observations."""
+    if n <= predictors + 1:
+        raise ValueError("Need more observations than predictors + 1")
+    with instrument.span("simulation.linear_reg_power", n=int(n), distribution=distribution):
+        return simulate_power("linear_reg", n, (alpha, f2, int(predictors), distribution), **options)
+
+
+def logistic_reg_power(alpha, n, odds_ratio, p1, r2_other=0.0, distribution="Normal", **options):
+    """Simulated power of the Wald test of X1 in a logistic regression with n observations."""
+    if not (odds_ratio > 0 and 0 < p1 < 1 and 0 <= r2_other < 1):
+        raise ValueError("Need odds ratio > 0, 0 < P(Y=1) < 1 and 0 <= R² < 1")
+    with instrument.span("simulation.logistic_reg_power", n=int(n), distribution=distribution):
+        return simulate_power("logistic_reg", n, (alpha, odds_ratio, p1, r2_other, distribution), **options)
+
+
+# --- N search ---
+
+def _fit_probit(n, reps, rejections, iterations=30):
+    """
+    Binomial maximum likelihood fit of power = Phi(a + b sqrt(N)).
+    Returns a, b and the Fisher information matrix of (a, b).
+    """
+    x = np.column_stack([np.ones(len(n)), np.sqrt(n)])
+    # Start from weighted least squares on the empirical probits
+    z = norm.ppf((rejections + 0.5) / (reps + 1))
+    sw = np.sqrt(reps)
+    coef = np.linalg.lstsq(x * sw[:, None], z * sw, rcond=None)[0]
+    for _ in range(iterations):
+        eta = np.clip(x @ coef, -8, 8)
+        mu = np.clip(norm.cdf(eta), 1e-12, 1 - 1e-12)
+        density = norm.pdf(eta)
+        weights = reps * density ** 2 / (mu * (1 - mu))
+        working = eta + (rejections / reps - mu) / np.maximum(density, 1e-300)
+        info = x.T @ (x * weights[:, None])
+        new = np.linalg.solve(info, x.T @ (weights * working))
+        done = np.abs(new - coef).max() < 1e-10
+        coef = new
+        if done:
+            break
+    eta = np.clip(x @ coef, -8, 8)
+    mu = np.clip(norm.cdf(eta), 1e-12, 1 - 1e-12)
+    info = x.T @ (x * (reps * norm.pdf(eta) ** 2 / (mu * (1 - mu)))[:, None])
+    return coef[0], coef[1], info
+
+
+def _sqrt_n_variance(a, b, info, target_z):
+    """Delta-method variance of sqrt(N*) = (target_z - a) / b."""
+    s = (target_z - a) / b
+    grad = np.array([-1 / b, -s / b])
+    return grad @ np.linalg.solve(info, grad)
+
+
+def search_n(model, target, params, n_prior, min_n=2, seed=None, tolerance=SEARCH_TOLERANCE,
+             max_simulations=SEARCH_MAX_SIMULATIONS, step=SEARCH_STEP, max_n=SEARCH_MAX_N, workers=None):
+    """
+    Smallest N whose simulated power reaches target, starting from the guess n_prior.
+
+    Every evaluated N gets step replications (its own child of the seed). The
+    search brackets the target, then repeatedly fits the probit power curve
+    and simulates at whichever candidate N (the fitted N and its neighbours)
+    most reduces the variance of the fitted N, until the 95% CI of N is within
+    +/- tolerance of it or max_simulations is reached. Returns a SearchResult,
+    with NaN for N if the power curve has not risen towards the target by
+    max_n or within max_simulations.
+    """
+    start = time.perf_counter()
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    target_z = norm.ppf(target)
+    counts = {} # N -> [replications, rejections]
+
+    def simulate(n):
+        n = max(int(round(n)), min_n)
+        result = simulate_power(model, n, params, seed=sequence.spawn(1)[0], max_replications=step,
+                                ci_half_width=0, workers=workers)
+        entry = counts.setdefault(n, [0, 0])
+        entry[0] += result.replications
+        entry[1] += result.rejections
+
+    def arrays():
+        n = np.array(sorted(counts), dtype=float)
+        reps, rejections = np.array([counts[int(k)] for k in n], dtype=float).T
+        return n, reps, rejections
+
+    def simulations():
+        return sum(entry[0] for entry in counts.values())
+
+    def result(n_star, n_low, n_high, power):
+        points = tuple((int(k), int(counts[k][0]), int(counts[k][1])) for k in sorted(counts))
+        return SearchResult(n_star, n_low, n_high, power, points, simulations(), time.perf_counter() - start,
+                            sequence.entropy)
+
+    n_prior = max(float(n_prior), min_n)
+    if not 1.4 * n_prior <= max_n: # Also NaN: the analytic N is already out of reach
+        return result(math.nan, math.nan, math.nan, math.nan)
+    for n in (0.7 * n_prior, n_prior, 1.4 * n_prior):
+        simulate(n)
+    # Widen until the observed powers straddle the target
+    while simulations() < max_simulations:
+        n, reps, rejections = arrays()
+        observed = rejections / reps
+        if observed.max() < target:
+            if 2 * n.max() > max_n:
+                return result(math.nan, math.nan, math.nan, math.nan)
+            simulate(2 * n.max())
+        elif observed.min() > target and n.min() > min_n:
+            simulate(n.min() / 2)
+        else:
+            break
+
+    while True:
+        n, reps, rejections = arrays()
+        a, b, info = _fit_probit(n, reps, rejections)
+        if b <= 0: # Flat or decreasing fit (effect too small to see yet): look further out
+            if simulations() + step > max_simulations or 2 * n.max() > max_n:
+                return result(math.nan, math.nan, math.nan, math.nan)
+            simulate(2 * n.max())
+            continue
+        sqrt_n = max((target_z - a) / b, math.sqrt(min_n))
+        half = 1.959963984540054 * math.sqrt(_sqrt_n_variance(a, b, info, target_z))
+        n_low, n_high = max((sqrt_n - half), math.sqrt(min_n)) ** 2, (sqrt_n + half) ** 2
+        if (n_high - n_low) / 2 <= tolerance * sqrt_n ** 2 or simulations() + step > max_simulations:
+            break
+        # Most informative next N: the candidate whose step of replications shrinks Var(sqrt N*) most
+        best, best_variance = None, np.inf
+        for factor in (0.8, 0.9, 1.0, 1.1, 1.25):
+            candidate = max(round(factor * sqrt_n ** 2), min_n)
+            eta = np.clip(a + b * math.sqrt(candidate), -8, 8)
+            mu = min(max(norm.cdf(eta), 1e-12), 1 - 1e-12)
+            xc = np.array([1.0, math.sqrt(candidate)])
+            added = step * norm.pdf(eta) ** 2 / (mu * (1 - mu)) * np.outer(xc, xc)
+            variance = _sqrt_n_variance(a, b, info + added, target_z)
+            if variance < best_variance:
+                best, best_variance = candidate, variance
+        simulate(best)
+
+    n_star = math.ceil(sqrt_n ** 2 - 1e-9)
+    return result(n_star, math.floor(n_low), math.ceil(n_high), float(norm.cdf(a + b * math.sqrt(n_star))))
+
+
+def linear_reg_sample(alpha, power, f2, predictors, distribution="Normal", **options):
+    """Total N reaching the target simulated power of the overall F test (search_n from the formula N)."""
+    from sample_size import engine
+    prior = float(engine.linear_reg_sample(alpha, power, f2, predictors))
+    with instrument.span("simulation.linear_reg_sample", prior=prior, distribution=distribution):
+        return search_n("linear_reg", power, (alpha, f2, int(predictors), distribution), prior,
+                        min_n=int(predictors) + 2, **options)
+
+
+def logistic_reg_sample(alpha, power, odds_ratio, p1, r2_other=0.0, distribution="Normal", **options):
+    """
+    Total N reaching the target simulated power of the Wald test of X1
+    (search_n from Hsieh's N). Odds ratios below 1 start from the N of the
+    reciprocal odds ratio, which has the same log odds ratio up to sign.
+    """
+    from sample_size import engine
+    if not (odds_ratio > 0 and odds_ratio != 1 and 0 < p1 < 1 and 0 <= r2_other < 1):
+        raise ValueError("Need odds ratio > 0 (not 1), 0 < P(Y=1) < 1 and 0 <= R² < 1")
+    prior = float(engine.logistic_reg_sample(alpha, power, max(odds_ratio, 1 / odds_ratio), p1, r2_other))
+    with instrument.span("simulation.logistic_reg_sample", prior=prior, distribution=distribution):
+        return search_n("logistic_reg", power, (alpha, odds_ratio, p1, r2_other, distribution), prior,
+                        min_n=10, **options)
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+One solver for the three unknowns of a power analysis.
+
+Every test type in the GUI's Advanced tab is described once by a TestType:
+its power function power(alpha, n, effect, design) plus the bounds the
+solvers need. From that, power() evaluates it directly, sample_size() finds
+the smallest integer n reaching a target power, and mdes() finds the
+smallest effect size reaching it. Both inversions are vectorized
+bracketing searches (doubling, then bisection for n and Illinois regula
+falsi for the effect), so every element resolves in a bounded number of
+power evaluations whatever the test. Where the
+engine already has a faster exact sample size solver (warm-started t
+solves, precomputed tables), sample_size() uses it instead.
+
+Sample sizes follow the Advanced tab's conventions: N per group for the
+independent t-test and ANOVA, N pairs for the paired t-test and total N
+otherwise. With an allocation ratio (n2 / n1) as its design input, the
+independent t-test's n is the size of group 1. All-scalar calls are memoized in the shared result cache.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+# power(alpha, n, effect, design): power of the test, broadcasting like the engine functions
+# effect_symbol / n_label: how the GUI labels the effect size and what n counts
+# design_input: name of the extra parameter the test needs (None = two-tailed test without one);
+#     the allocation ratio of the independent t-test is optional (None / NaN = equal groups)
+# min_n(design): smallest sample size the power function is defined for
+# max_effect: effect sizes must stay below this (correlations), np.inf otherwise
+# sample_size(alpha, power, effect, design): exact engine solver, or None to invert power()
+TestType = namedtuple("TestType", ["power", "effect_symbol", "n_label", "design_input",
+                                   "min_n", "max_effect", "sample_size"])
+
+def _ratio(design):
+    """Allocation ratio n2 / n1 of the independent t-test from its design input (equal groups if unset)."""
+    if design is None:
+        return 1.0
+    design = np.asarray(design, dtype=float)
+    return np.where(np.isnan(design), 1.0, design)
+
+
+TEST_TYPES = {
+    "T-Test (Independent)": TestType(
+        lambda alpha, n, effect, design: engine.indep_t_power(alpha, n, effect, ratio=_ratio(design)),
+        "d", "N per group", "ratio", lambda design: 2, np.inf,
+        lambda alpha, power, effect, design: engine.indep_t_sample(alpha, power, effect, ratio=_ratio(design))),
+    "T-Test (Paired)": TestType(
+        lambda alpha, n, effect, design: engine.one_t_power(alpha, n, effect),
+        "dz", "N pairs", None, lambda design: 2, np.inf,
+        lambda alpha, power, effect, design: engine.paired_t_sample(alpha, power, effect)),
+    "ANOVA (One-way)": TestType(
+        lambda alpha, n, effect, design: engine.oneway_power(alpha, n * design, effect, design),
+        "f", "N per group", "groups", lambda design: 2, np.inf,
+        lambda alpha, power, effect, design: engine.oneway_sample(alpha, power, effect, design)),
+    "Correlation (Pearson)": TestType(
+        lambda alpha, n, effect, design: engine.pearson_power(alpha, n, effect),
+        "r", "Total N", None, lambda design: 4, 1.0, None),
+    "Linear Regression": TestType(
+        lambda alpha, n, effect, design: engine.linear_reg_power(alpha, n, effect, design),
+        "f²", "Total N", "predictors", lambda design: np.asarray(design) + 2, np.inf, None),
+    "Chi-Square": TestType(
+        lambda alpha, n, effect, design: engine.chi_power(alpha, n, effect, design),
+        "w", "Total N", "df", lambda design: 1, np.inf,
+        lambda alpha, power, effect, design: engine.chi_ind_sample(alpha, power, effect, design)),
+}
+
+MDES_TOL = 1e-6 # Absolute tolerance on the minimum detectable effect
+
+
+def _test_type(name):
+    try:
+        return TEST_TYPES[name]
+    except KeyError:
+        raise ValueError(f"Unknown test type {name!r}, expected one of: {', '.join(TEST_TYPES)}") from None
+
+
+@memoize("solver.power")
+def power(test_type, alpha, n, effect, design=None):
+    """Power of the test for sample size n and effect size (NaN where undefined)."""
+    spec = _test_type(test_type)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.asarray(spec.power(alpha, np.asarray(n, dtype=float), np.asarray(effect, dtype=float), design),
+                          dtype=float)
+
+
+def _broadcast(spec, alpha, target, x, design):
+    """
+    Broadcast the inputs of a solve and flatten them (the results are reshaped at the end).
+    design stays None for tests without a design input.
+    """
+    alpha, target, x, design_arr = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (alpha, target, x, np.nan if design is None else design)))
+    flat = [np.ravel(v) for v in (alpha, target, x, design_arr)]
+    return alpha.shape, flat[0], flat[1], flat[2], (None if spec.design_input is None else flat[3])
+
+
+def _subset(design, idx):
+    return None if design is None else design[idx]
+
+
+@memoize("solver.sample_size")
+def sample_size(test_type, alpha, power, effect, design=None):
+    """Smallest integer sample size whose power reaches the target (NaN if it cannot)."""
+    spec = _test_type(test_type)
+    if spec.sample_size is not None:
+        return np.asarray(spec.sample_size(alpha, power, effect, design), dtype=float)
+    shape, alpha, target, effect, design = _broadcast(spec, alpha, power, effect, design)
+    min_n = np.broadcast_to(np.asarray(spec.min_n(design), dtype=float), target.shape)
+    valid = (effect != 0) & (np.abs(effect) < spec.max_effect) & (target > alpha) & (target < 1) & np.isfinite(min_n)
+    n = np.full(target.shape, np.nan)
+    idx = np.flatnonzero(valid) # Only search where a solution can exist
+    if valid.any():
+        sub_alpha, sub_effect, sub_design = alpha[idx], effect[idx], _subset(design, idx)
+        lo = min_n[idx].astype(np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            n[idx] = engine._min_integer_n(lambda m: spec.power(sub_alpha, m, sub_effect, sub_design), target[idx], lo)
+    return n.reshape(shape)
+
+
+@memoize("solver.mdes")
+def mdes(test_type, alpha, power, n, design=None):
+    """Minimum detectable effect size for sample size n (NaN if no effect reaches the target power)."""
+    spec = _test_type(test_type)
+    shape, alpha, target, n, design = _broadcast(spec, alpha, power, n, design)
+    valid = (n >= spec.min_n(design)) & (target > alpha) & (target < 1)
+    effect = np.full(target.shape, np.nan)
+    idx = np.flatnonzero(valid)
+    if valid.any():
+        # Start from [0, 1] (just below 1 for correlations); the upper end doubles until it brackets
+        hi = min(1.0, spec.max_effect * (1 - 1e-9))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            args = (alpha[idx], n[idx]) + (() if design is None else (design[idx],))
+            effect[idx] = engine._solve_increasing(lambda e, a, m, *d: spec.power(a, m, e, d[0] if d else None),
+                                                   target[idx], 0.0, hi, args, tol=MDES_TOL,
+                                                   transform=engine._probit)
+    return effect.reshape(shape)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Time-to-event sample sizes for the log-rank test.
+
+The log-rank test's power depends on the number of events, not subjects.
+events() gives the events needed to detect a hazard ratio hr (group 2 vs
+group 1) by Schoenfeld's formula,
+
+    D = (z_alpha + z_beta)^2 / (p1 p2 log(hr)^2),
+
+or Freedman's, D = (z_alpha + z_beta)^2 (1 + r hr)^2 / (r (1 - hr)^2), with
+p1 = 1 / (1 + r) and p2 = r / (1 + r) the shares of the groups for the
+allocation ratio r = n2 / n1. sample_size() turns events into subjects with
+the probability that a subject's event is observed. Subjects enter
+uniformly over the accrual period and are followed until follow_up after
+accrual closes. They have exponential event times (group 1 hazard, times hr
+in group 2) and are lost to follow-up at the exponential dropout rate.
+Everything broadcasts, so a whole range of hazard ratios or designs is one
+call.
+
+simulate_power() checks a design by simulation instead. Event times are
+piecewise exponential (the hazard may change at given times, and the hazard
+ratio may differ per piece). The replications run on the process pool of
+sample_size.simulation, in parallel over the CPUs.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from sample_size import engine
+from sample_size.cache import memoize
+
+METHODS = ("Schoenfeld", "Freedman")
+
+# events: events needed; n1, n2, total_n: subjects; event_probability: share of subjects with an observed event
+SurvivalSampleSize = namedtuple("SurvivalSampleSize", ["events", "n1", "n2", "total_n", "event_probability"])
+
+
+def hazard_from_median(median):
+    """Exponential hazard with the given median survival time."""
+    with np.errstate(divide="ignore"):
+        return np.log(2) / np.asarray(median, dtype=float)
+
+
+def _shares(ratio):
+    ratio = np.asarray(ratio, dtype=float)
+    ratio = np.where(ratio > 0, ratio, np.nan)
+    return 1 / (1 + ratio), ratio / (1 + ratio)
+
+
+@memoize("survival_events")
+def events(alpha, power, hr, method="Schoenfeld", tails=engine.TWO_TAILED, ratio=1.0):
+    """Number of events the log-rank test needs to detect the hazard ratio (NaN for hr = 1 or hr <= 0)."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of: {', '.join(METHODS)}")
+    z_alpha, z_beta = engine.get_z_scores(alpha, power, tails)
+    hr = np.asarray(hr, dtype=float)
+    hr = np.where(hr > 0, hr, np.nan)
+    p1, p2 = _shares(ratio)
+    ratio = p2 / p1 # NaN for ratio <= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "Schoenfeld":
+            d = (z_alpha + z_beta) ** 2 / (p1 * p2 * np.log(hr) ** 2)
+        else:
+            d = (z_alpha + z_beta) ** 2 * (1 + ratio * hr) ** 2 / (ratio * (1 - hr) ** 2)
+    return engine._ceil_n(d)
+
+
+@memoize("survival_power")
+def power(alpha, n_events, hr, method="Schoenfeld", tails=engine.TWO_TAILED, ratio=1.0):
+    """Power of the log-rank test with n_events events (the formulas of events() solved for z_beta)."""
+    from scipy.stats import norm
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of: {', '.join(METHODS)}")
+    z_alpha, _ = engine.get_z_scores(alpha, 0.5, tails)
+    hr, n_events = np.asarray(hr, dtype=float), np.asarray(n_events, dtype=float)
+    hr = np.where(hr > 0, hr, np.nan)
+    p1, p2 = _shares(ratio)
+    ratio = p2 / p1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if method == "Schoenfeld":
+            drift = np.sqrt(n_events * p1 * p2) * np.abs(np.log(hr))
+        else:
+            drift = np.sqrt(n_events * ratio) * np.abs(1 - hr) / (1 + ratio * hr)
+    return norm.cdf(drift - z_alpha)
+
+
+def event_probability(hazard, accrual, follow_up, dropout=0.0):
+    """
+    Probability that a subject's event is observed: uniform entry over
+    accrual, analysis follow_up after accrual closes, exponential dropout.
+    """
+    hazard, accrual, follow_up, dropout = (np.asarray(v, dtype=float) for v in (hazard, accrual, follow_up, dropout))
+    rate = hazard + dropout # Leaving the risk set for either reason
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Mean of exp(-rate * time followed) over entry times, time followed in [follow_up, accrual + follow_up]
+        surviving = np.where(accrual > 0,
+                             (np.exp(-rate * follow_up) - np.exp(-rate * (accrual + follow_up))) / (rate * accrual),
+                             np.exp(-rate * follow_up))
+        probability = hazard / rate * (1 - surviving)
+    valid = (hazard > 0) & (accrual >= 0) & (follow_up >= 0) & (accrual + follow_up > 0) & (dropout >= 0)
+    return np.where(valid, probability, np.nan)
+
+
+@memoize("survival_sample")
+def sample_size(alpha, power, hr, hazard, accrual, follow_up, dropout=0.0, method="Schoenfeld",
+                tails=engine.TWO_TAILED, ratio=1.0):
+    """Events and subjects for the log-rank test; hazard is group 1's. Returns a SurvivalSampleSize."""
+    d = events(alpha, power, hr, method, tails, ratio)
+    p1, p2 = _shares(ratio)
+    probability = (p1 * event_probability(hazard, accrual, follow_up, dropout)
+                   + p2 * event_probability(np.asarray(hazard) * np.asarray(hr), accrual, follow_up, dropout))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n1 = engine._ceil_n(d / probability * p1)
+    n2 = engine.second_group_n(n1, ratio)
+    return SurvivalSampleSize(d, n1, n2, n1 + n2, probability)
+
+
+def simulate_power(alpha, n, hazards, hr, accrual, follow_up, dropout=0.0, cuts=(), ratio=1.0,
+                   tails=engine.TWO_TAILED, **options):
+    """
+    Simulated power of the log-rank test with n subjects in total; returns a
+    simulation.SimulationResult. hazards are group 1's piecewise-constant
+    hazards, changing at the times in cuts (one more hazard than cuts). hr is
+    one hazard ratio or one per piece. options go to simulation.simulate_power
+    (seed, max_replications, ci_half_width, workers).
+    """
+    from sample_size import instrument, simulation
+    hazards = tuple(float(h) for h in np.atleast_1d(hazards))
+    cuts = tuple(float(c) for c in np.atleast_1d(cuts)) if np.size(cuts) else ()
+    hr = tuple(float(h) for h in np.atleast_1d(hr))
+    if len(hazards) != len(cuts) + 1 or any(h <= 0 for h in hazards) or list(cuts) != sorted(set(cuts)) or \
+            any(c <= 0 for c in cuts):
+        raise ValueError("Give one positive hazard per piece, pieces split at increasing positive times")
+    if len(hr) not in (1, len(hazards)) or any(h <= 0 for h in hr):
+        raise ValueError("Give one positive hazard ratio, or one per piece")
+    if accrual < 0 or follow_up < 0 or accrual + follow_up <= 0 or dropout < 0 or not ratio > 0:
+        raise ValueError("Need accrual and follow-up >= 0 (not both 0), dropout >= 0 and an allocation ratio > 0")
+    n1 = int(round(n / (1 + ratio)))
+    if n1 < 1 or n - n1 < 1:
+        raise ValueError("Need at least one subject per group")
+    params = (alpha, cuts, hazards, hr if len(hr) > 1 else hr[0], float(accrual), float(follow_up), float(dropout),
+              float(ratio), tails)
+    with instrument.span("simulation.logrank_power", n=int(n)):
+        return simulation.simulate_power("logrank", n, params, **options)
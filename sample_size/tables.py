@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed noncentrality tables for the chi-square and ANOVA solvers.
+
+The power of both tests only depends on the design through a noncentrality
+parameter lambda (w^2 * N for chi-square, f^2 * N for ANOVA). For every
+(alpha, power, df) grid point the table stores the lambda that gives exactly
+that power, so a sample size is a table lookup plus a division instead of a
+root-find over noncentral CDFs:
+
+    chi-square:  N = ceil(lambda(alpha, power, df) / w^2)
+    ANOVA:       smallest n with f^2 * k * n >= lambda(alpha, power, k - 1, k * n - k)
+
+Lookups interpolate sqrt(lambda) linearly in z_alpha = Phi^-1(1 - alpha) and
+z_beta = Phi^-1(power) (and in 1 / df_denom for ANOVA), where it is close to
+linear. While building, the exact lambda is also solved at every cell centre;
+four times the largest interpolation error found at the centres of a cell
+and its neighbours is stored as that cell's error bound (a single centre can
+sit where the error happens to cross zero). A lookup whose answer could
+change within the bound is passed back for exact confirmation. The bound is
+an estimate from measured errors, not a proven one: 60,000 random
+chi-square, one-way and factorial ANOVA designs gave the same sample sizes
+as the exact solvers, but a larger error between the centres is not ruled
+out.
+
+The tables are saved as .npy files and opened memory-mapped, so loading is
+instant and only the pages a lookup touches are read. Build them once with
+
+    python -m sample_size.tables build [--dir PATH]
+
+Until they exist (or outside the grid) the engine uses the exact solvers.
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.special import ndtri
+from scipy.stats import norm, chi2, ncx2, f as f_dist, ncf
+
+from sample_size import engine
+
+TABLE_VERSION = 1
+TABLE_DIR = os.environ.get("SAMPLE_SIZE_TABLE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "sample_size_calculator", "tables"))
+
+# Grid axes. alpha 0.001-0.5 and power 0.5-0.99 (the GUI ranges) fall inside.
+Z_ALPHA_AXIS = np.linspace(0.0, 3.1, 24)
+Z_BETA_AXIS = np.linspace(0.0, 2.35, 20)
+CHI_DF_MAX = 100
+ANOVA_DFN_MAX = 50
+ANOVA_DFD_NODES = np.array([2, 3, 4, 5, 6, 7, 8, 10, 12, 15, 20, 25, 30, 40, 50, 70, 100,
+                            150, 200, 300, 500, 1000, 3000, np.inf])
+U_AXIS = np.sort(1.0 / ANOVA_DFD_NODES) # Interpolation runs in u = 1 / df_denom (0 = infinite)
+
+ERROR_SAFETY = 4.0 # Multiplier on the measured interpolation error
+
+
+# --- Building ---
+
+def _solve_lambda(power_of_lambda, target):
+    """Exact lambda giving the target power, power_of_lambda increasing in lambda."""
+    return engine._bisect_increasing(power_of_lambda, target, 0.0, 16.0, tol=1e-10)
+
+
+def _chi_lambda_exact(z_alpha, z_beta, df):
+    # The critical value does not depend on lambda, so it is computed once up front
+    crit = chi2.isf(norm.sf(z_alpha), df)
+    return _solve_lambda(lambda lam: ncx2.sf(crit, df, lam), norm.cdf(z_beta))
+
+
+def _anova_lambda_exact(z_alpha, z_beta, df_num, df_denom):
+    crit = f_dist.isf(norm.sf(z_alpha), df_num, df_denom)
+    return _solve_lambda(lambda lam: ncf.sf(crit, df_num, df_denom, lam), norm.cdf(z_beta))
+
+
+def _midpoints(axis):
+    return (axis[:-1] + axis[1:]) / 2
+
+
+def _neighbourhood_max(values, axes):
+    """Max over each cell and its direct neighbours along the given axes (separable max filter)."""
+    for axis in axes:
+        padded = np.pad(values, [(1, 1) if a == axis else (0, 0) for a in range(values.ndim)], mode="edge")
+        shifted = [np.take(padded, np.arange(s, s + values.shape[axis]), axis=axis) for s in range(3)]
+        values = np.maximum(np.maximum(shifted[0], shifted[1]), shifted[2])
+    return values
+
+
+def build(directory=TABLE_DIR, report=print):
+    """Solve all grid points (and cell centres for the error bounds) and save the tables."""
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+
+    za, zb = np.meshgrid(Z_ALPHA_AXIS, Z_BETA_AXIS, indexing="ij")
+    za_mid, zb_mid = np.meshgrid(_midpoints(Z_ALPHA_AXIS), _midpoints(Z_BETA_AXIS), indexing="ij")
+
+    # Chi-square: (df, z_alpha, z_beta)
+    df = np.arange(1, CHI_DF_MAX + 1, dtype=float)[:, None, None]
+    chi = np.sqrt(_chi_lambda_exact(za, zb, df))
+    chi_error = np.zeros((CHI_DF_MAX, len(Z_ALPHA_AXIS) - 1, len(Z_BETA_AXIS) - 1))
+    chi_interp, _ = PowerTables(chi, chi_error, None, None)._chi_lambda(za_mid[None], zb_mid[None], df - 1)
+    chi_error = _neighbourhood_max(np.abs(chi_interp - _chi_lambda_exact(za_mid, zb_mid, df)), (1, 2)) * ERROR_SAFETY
+    report(f"chi-square table: {chi.size:,} points, median cell error {np.median(chi_error):.1e} "
+           f"({time.perf_counter() - start:.1f} s)")
+
+    # ANOVA: (df_num, u, z_alpha, z_beta); u = 0 (infinite df_denom) is the chi-square limit
+    dfn = np.arange(1, ANOVA_DFN_MAX + 1, dtype=float)[:, None, None, None]
+    finite = _anova_lambda_exact(za[None, None], zb[None, None], dfn, 1.0 / U_AXIS[None, 1:, None, None])
+    anova = np.concatenate([chi[:ANOVA_DFN_MAX, None], np.sqrt(finite)], axis=1)
+    u_mid = _midpoints(U_AXIS)[None, :, None, None]
+    anova_error = np.zeros((ANOVA_DFN_MAX, len(U_AXIS) - 1) + chi_error.shape[1:])
+    tables = PowerTables(chi, chi_error, anova, anova_error)
+    ab_position = tables._ab_position(*np.broadcast_arrays(za_mid[None, None], zb_mid[None, None], u_mid, dfn)[:2])
+    anova_interp, _ = tables._anova_lambda(ab_position, (dfn - 1).astype(np.int64), np.broadcast_to(u_mid, ab_position[0].shape))
+    anova_error = np.abs(anova_interp - _anova_lambda_exact(za_mid[None, None], zb_mid[None, None], dfn, 1.0 / u_mid))
+    anova_error = _neighbourhood_max(anova_error, (1, 2, 3)) * ERROR_SAFETY
+    report(f"ANOVA table: {anova.size:,} points, median cell error {np.median(anova_error):.1e} "
+           f"({time.perf_counter() - start:.1f} s)")
+
+    for name, array in (("chi", chi), ("chi_error", chi_error), ("anova", anova), ("anova_error", anova_error)):
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+    with open(os.path.join(directory, "meta.json"), "w") as fh:
+        json.dump({"version": TABLE_VERSION,
+                   "z_alpha_axis": Z_ALPHA_AXIS.tolist(), "z_beta_axis": Z_BETA_AXIS.tolist(),
+                   "anova_dfd_nodes": [float(v) for v in ANOVA_DFD_NODES]}, fh)
+    load.cache_clear()
+
+
+# --- Lookup ---
+
+def _axis_position(axis, values):
+    """Cell index and fractional offset of values on a sorted axis (clipped to the grid)."""
+    idx = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2)
+    frac = (values - axis[idx]) / (axis[idx + 1] - axis[idx])
+    return idx, np.clip(frac, 0.0, 1.0)
+
+
+def _bilinear(corner, ia, fa, ib, fb):
+    """Bilinear interpolation; corner(i, j) gathers one grid corner for every element."""
+    return ((1 - fa) * (1 - fb) * corner(ia, ib) + fa * (1 - fb) * corner(ia + 1, ib)
+            + (1 - fa) * fb * corner(ia, ib + 1) + fa * fb * corner(ia + 1, ib + 1))
+
+
+class PowerTables:
+    """Memory-mapped noncentrality tables with per-cell error bounds."""
+
+    def __init__(self, chi, chi_error, anova, anova_error):
+        self.chi = chi
+        self.chi_error = chi_error
+        self.anova = anova
+        self.anova_error = anova_error
+
+    @staticmethod
+    def _ab_position(z_alpha, z_beta):
+        """Grid cells of (z_alpha, z_beta); computed once per lookup and reused for every df_denom."""
+        return _axis_position(Z_ALPHA_AXIS, z_alpha) + _axis_position(Z_BETA_AXIS, z_beta)
+
+    def _chi_lambda(self, z_alpha, z_beta, df_index):
+        """Interpolated lambda and its error bound."""
+        df_index, z_alpha, z_beta = np.broadcast_arrays(np.asarray(df_index, dtype=np.int64), z_alpha, z_beta)
+        ia, fa, ib, fb = self._ab_position(z_alpha, z_beta)
+        root = _bilinear(lambda i, j: self.chi[df_index, i, j], ia, fa, ib, fb)
+        return root ** 2, self.chi_error[df_index, ia, ib]
+
+    def _anova_lambda(self, ab_position, dfn_index, u):
+        """Interpolated lambda and its error bound; ab_position comes from _ab_position."""
+        ia, fa, ib, fb = ab_position
+        iu, fu = _axis_position(U_AXIS, u)
+        low = _bilinear(lambda i, j: self.anova[dfn_index, iu, i, j], ia, fa, ib, fb)
+        high = _bilinear(lambda i, j: self.anova[dfn_index, iu + 1, i, j], ia, fa, ib, fb)
+        return ((1 - fu) * low + fu * high) ** 2, self.anova_error[dfn_index, iu, ia, ib]
+
+    @staticmethod
+    def _grid_coordinates(alpha, power):
+        z_alpha, z_beta = -ndtri(alpha), ndtri(power) # scipy.special: no per-call distribution overhead
+        inside = ((z_alpha >= Z_ALPHA_AXIS[0]) & (z_alpha <= Z_ALPHA_AXIS[-1])
+                  & (z_beta >= Z_BETA_AXIS[0]) & (z_beta <= Z_BETA_AXIS[-1]))
+        return z_alpha, z_beta, inside
+
+    def chi_ind_sample(self, alpha, power, w, df):
+        """
+        Table answer for engine.chi_ind_sample on 1-D arrays.
+
+        Returns (n, certain, inside): n is the table's answer, certain marks
+        answers that cannot change within the error bound and inside marks
+        points on the grid (the rest need the exact solver).
+        """
+        z_alpha, z_beta, inside = self._grid_coordinates(alpha, power)
+        inside &= (df >= 1) & (df <= CHI_DF_MAX) & (df == np.round(df)) & (w > 0)
+        df_index = np.where(inside, df - 1, 0).astype(np.int64)
+        lam, err = self._chi_lambda(z_alpha, z_beta, df_index)
+        w2 = np.where(inside, w ** 2, 1.0)
+        n = np.maximum(np.ceil(lam / w2), 1)
+        certain = inside & (np.maximum(np.ceil((lam - err) / w2), 1) == np.maximum(np.ceil((lam + err) / w2), 1))
+        return np.where(inside, n, np.nan), certain, inside
+
+    def anova_cell_sample(self, alpha, power, f_effect, df_num, cells):
+        """
+        Table answer for engine.anova_cell_sample (n per cell) on 1-D arrays; see chi_ind_sample.
+
+        The effect has df_num numerator df in a balanced design of cells cells,
+        so df_denom = cells * (n - 1) and lambda = f^2 * cells * n.
+        """
+        z_alpha, z_beta, inside = self._grid_coordinates(alpha, power)
+        inside &= ((df_num >= 1) & (df_num <= ANOVA_DFN_MAX) & (df_num == np.round(df_num))
+                   & (cells > df_num) & (cells == np.round(cells)) & (f_effect > 0))
+        dfn_index = np.where(inside, df_num - 1, 0).astype(np.int64)
+        k = np.where(inside, cells, 2)
+        f2k = np.where(inside, f_effect ** 2 * k, 1.0)
+        ab_position = self._ab_position(z_alpha, z_beta)
+
+        def g(n, sign):
+            # Per-cell n needed at df_denom = k n - k, with lambda shifted by sign * error
+            with np.errstate(divide="ignore"):
+                u = 1.0 / (k * (n - 1))
+            lam, err = self._anova_lambda(ab_position, dfn_index, u)
+            return (lam + sign * err) / f2k
+
+        def solve(sign):
+            # Smallest n with n >= g(n); g decreases with n, so g(infinity) is a lower bracket
+            # and g(lo) an upper one, which is usually within a few units of it
+            lo = np.maximum(np.ceil(g(np.inf, sign)), 2)
+            g_lo = g(lo, sign)
+            hi = np.where(lo >= g_lo, lo, np.maximum(np.ceil(g_lo), lo))
+            while True:
+                active = hi - lo > 1
+                if not active.any():
+                    return hi
+                mid = np.floor((lo + hi) / 2)
+                mid_ok = mid >= g(mid, sign)
+                hi = np.where(active & mid_ok, mid, hi)
+                lo = np.where(active & ~mid_ok, mid, lo)
+
+        n = solve(1)
+        certain = inside & (solve(-1) == n)
+        if not certain[inside].all():
+            n = np.where(certain, n, solve(0))
+        return np.where(inside, n, np.nan), certain, inside
+
+    def oneway_sample(self, alpha, power, f_effect, groups):
+        """Table answer for engine.oneway_sample (n per group): one effect with groups - 1 df over groups cells."""
+        return self.anova_cell_sample(alpha, power, f_effect, groups - 1, groups)
+
+
+@functools.lru_cache(maxsize=None)
+def load(directory=TABLE_DIR):
+    """Open the tables memory-mapped, or return None if they have not been built."""
+    try:
+        with open(os.path.join(directory, "meta.json")) as fh:
+            meta = json.load(fh)
+        if (meta.get("version") != TABLE_VERSION
+                or not np.allclose(meta["z_alpha_axis"], Z_ALPHA_AXIS) or not np.allclose(meta["z_beta_axis"], Z_BETA_AXIS)
+                or not np.array_equal(meta["anova_dfd_nodes"], ANOVA_DFD_NODES)):
+            return None # Built with other axes: rebuild before use
+        # Plain ndarray views of the memory maps avoid the np.memmap indexing overhead
+        arrays = {name: np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+                  for name in ("chi", "chi_error", "anova", "anova_error")}
+    except (OSError, ValueError, KeyError):
+        return None # Missing or damaged tables: the engine falls back to the exact solvers
+    return PowerTables(**arrays)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sample_size.tables",
+                                     description="Build the precomputed chi-square / ANOVA noncentrality tables.")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--dir", default=TABLE_DIR, help="Table directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+    build(args.dir)
+    print(f"Tables written to {args.dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
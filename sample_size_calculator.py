@@ -14,16 +14,270 @@ Description: A PyQt5 GUI application for calculating statistical sample sizes.
 """
 
 import sys
-import math
-import numpy as np
-from scipy.stats import norm # Needed for Z-scores in calculations
+import time
+_STARTUP_T0 = time.perf_counter() # Reference point for --profile-startup
+import threading
+
+# numpy/scipy (via sample_size.engine) are imported lazily inside the calc_* methods
+# and preloaded on a background thread once the window is up, see start_warm_up()
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, QFormLayout,
                             QSpinBox, QDoubleSpinBox, QLabel, QPushButton, QVBoxLayout,
                             QHBoxLayout, QComboBox, QGroupBox, QScrollArea, QLineEdit,
                             QTextEdit, QSizePolicy, QFrame, QGridLayout, QCheckBox)
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QFont, QIcon, QPalette, QColor # QIcon, QPalette, QColor are currently unused
+from PyQt5.QtWidgets import QDockWidget, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QTableView
+from PyQt5.QtCore import Qt, QSize, QTimer, QThreadPool, QRunnable, QObject, QEventLoop, pyqtSignal
+from PyQt5.QtCore import QRectF, QPointF, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFont, QIcon, QPalette, QColor # QIcon, QPalette are currently unused
+from PyQt5.QtGui import QPainter, QPen, QPixmap, QPolygonF
+_PYQT_IMPORTED = time.perf_counter() - _STARTUP_T0
+
+from sample_size import instrument # Standard library only, cheap to import at startup
+
+# Widget-name prefixes of the panels that recalculate as their inputs change
+CALCULATION_PANELS = ("indep_t", "paired_t", "one_t", "oneway", "factorial", "pearson",
+                      "linear_reg", "logistic_reg", "chi_ind", "power_level", "power_effect", "curve", "grid",
+                      "sequential", "allocation", "endpoints", "cluster", "rm",
+                      "exact", "survival", "equiv_mean", "equiv_prop")
+# Panels that only run when their button is pressed (simulations take seconds)
+SIMULATION_PANELS = ("linear_sim", "logistic_sim", "linear_search", "logistic_search", "endpoint_sim",
+                     "logrank_sim")
+PREDICTOR_DISTRIBUTIONS = ("Normal", "Skewed (lognormal)", "Binary") # As in sample_size.simulation.DISTRIBUTIONS
+LIVE_DEBOUNCE_MS = 60 # Quiet time after the last input change before a panel recalculates
+DIAGNOSTICS_REFRESH_MS = 500 # Diagnostics panel update interval while it is open
+FACTORIAL_MAX_FACTORS = 5 # Factor inputs shown in the factorial ANOVA panel (the solver takes any number)
+
+
+class CalculationSignals(QObject):
+    # panel, input generation, result (label text, or whatever _show_<panel>_result expects);
+    # delivered on the GUI thread
+    finished = pyqtSignal(str, int, object)
+
+
+class CalculationTask(QRunnable):
+    """Runs one panel's calculation on the thread pool and reports the result."""
+
+    def __init__(self, panel, generation, job):
+        super().__init__()
+        self.panel = panel
+        self.generation = generation
+        self.job = job
+        self.signals = CalculationSignals() # Owned by the task so it outlives a closed window
+        self.created = time.perf_counter()
+
+    def run(self):
+        queued_ms = (time.perf_counter() - self.created) * 1000
+        try:
+            with instrument.span(f"gui.{self.panel}", generation=self.generation, queued_ms=round(queued_ms, 3)):
+                text = self.job()
+        except Exception as e:
+            text = f"Error: {e}"
+        try:
+            self.signals.finished.emit(self.panel, self.generation, text)
+        except RuntimeError: # The application quit while this was running
+            pass
+
+
+class PowerCurvePlot(QWidget):
+    """
+    Power (0-1) against one input, drawn with QPainter.
+
+    Axes and grid are rendered once into a pixmap and the curve is kept as a
+    polygon in widget coordinates, so moving the marker or the target line
+    only repaints, and a new curve only rebuilds the polygon (filled straight
+    from the NumPy arrays, which keeps 10,000-point curves cheap).
+    """
+    MARGINS = (46, 10, 16, 38) # left, top, right, bottom
+
+    def __init__(self, x_label="", parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(320, 220)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.x_label = x_label
+        self.x_range = (0.0, 1.0)
+        self._points = None     # (x, y) arrays of the curve
+        self._polygon = None    # Curve in widget coordinates, rebuilt lazily
+        self._background = None # Axes pixmap, rebuilt when the range, label or size changes
+        self.marker = None      # (x, power) of the chosen design
+        self.target = None      # Horizontal reference line at the target power
+
+    def set_curve(self, x, y, x_label):
+        finite = (x == x) & (y == y) # Drop NaN points (invalid inputs)
+        self._points = (x[finite], y[finite])
+        x_range = (float(x[0]), float(x[-1]))
+        if x_range != self.x_range or x_label != self.x_label:
+            self.x_range, self.x_label = x_range, x_label
+            self._background = None
+        self._polygon = None
+        self.update()
+
+    def set_marker(self, x, power):
+        self.marker = None if power != power else (x, power)
+        self.update()
+
+    def set_target(self, power):
+        self.target = power
+        self.update()
+
+    def resizeEvent(self, event):
+        self._background = None
+        self._polygon = None
+        super().resizeEvent(event)
+
+    def _plot_rect(self):
+        left, top, right, bottom = self.MARGINS
+        return QRectF(left, top, max(self.width() - left - right, 1), max(self.height() - top - bottom, 1))
+
+    def _to_widget(self, x, y):
+        rect = self._plot_rect()
+        x0, x1 = self.x_range
+        span = (x1 - x0) or 1.0
+        return rect.left() + (x - x0) / span * rect.width(), rect.bottom() - y * rect.height()
+
+    def _render_background(self):
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.white)
+        painter = QPainter(pixmap)
+        rect = self._plot_rect()
+        painter.setFont(QFont("Arial", 8))
+        grid_pen = QPen(QColor("#e5e8eb"))
+        text_pen = QPen(QColor("#555555"))
+        for i in range(6): # Power gridlines at 0, 0.2, ..., 1
+            y = rect.bottom() - i / 5 * rect.height()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+            painter.setPen(text_pen)
+            painter.drawText(QRectF(0, y - 8, rect.left() - 6, 16), Qt.AlignRight | Qt.AlignVCenter, f"{i / 5:.1f}")
+        x0, x1 = self.x_range
+        for i in range(6):
+            value = x0 + i / 5 * (x1 - x0)
+            x = rect.left() + i / 5 * rect.width()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+            painter.setPen(text_pen)
+            label = f"{value:.0f}" if x1 - x0 >= 20 else f"{value:.2f}"
+            painter.drawText(QRectF(x - 30, rect.bottom() + 2, 60, 14), Qt.AlignHCenter | Qt.AlignTop, label)
+        painter.setPen(QPen(QColor("#7f8c8d")))
+        painter.drawRect(rect)
+        painter.setPen(text_pen)
+        painter.drawText(QRectF(rect.left(), rect.bottom() + 18, rect.width(), 16), Qt.AlignCenter, self.x_label)
+        painter.save()
+        painter.translate(10, rect.center().y())
+        painter.rotate(-90)
+        painter.drawText(QRectF(-40, -8, 80, 16), Qt.AlignCenter, "Power")
+        painter.restore()
+        painter.end()
+        return pixmap
+
+    def _build_polygon(self):
+        import numpy as np
+        px, py = self._to_widget(*self._points)
+        if len(px) > 2 * self.width():
+            # More points than pixels: keep the lowest and highest point of every pixel column,
+            # which draws the same picture with at most two vertices per column
+            column = np.floor(px)
+            starts = np.flatnonzero(np.r_[True, column[1:] != column[:-1]])
+            low, high = np.minimum.reduceat(py, starts), np.maximum.reduceat(py, starts)
+            falling = py[np.r_[starts[1:], len(py)] - 1] < py[starts] # Keep the drawing direction within a column
+            px = np.repeat(px[starts], 2)
+            py = np.column_stack([np.where(falling, high, low), np.where(falling, low, high)]).ravel()
+        polygon = QPolygonF(len(px))
+        buffer = polygon.data()
+        buffer.setsize(len(px) * 16) # QPointF is two doubles
+        coords = np.frombuffer(buffer, dtype=np.float64).reshape(len(px), 2)
+        coords[:, 0], coords[:, 1] = px, py
+        return polygon
+
+    def paintEvent(self, event):
+        if self._background is None:
+            self._background = self._render_background()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        rect = self._plot_rect()
+        if self.target is not None:
+            y = rect.bottom() - self.target * rect.height()
+            painter.setPen(QPen(QColor("#e67e22"), 1, Qt.DashLine))
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+        if self._points is None or len(self._points[0]) == 0:
+            return
+        if self._polygon is None:
+            self._polygon = self._build_polygon()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipRect(rect)
+        painter.setPen(QPen(QColor("#2980b9"), 2))
+        painter.drawPolyline(self._polygon)
+        if self.marker is not None:
+            x, y = self._to_widget(*self.marker)
+            painter.setPen(QPen(QColor("#c0392b"), 1, Qt.DotLine))
+            painter.drawLine(QPointF(x, rect.bottom()), QPointF(x, y))
+            painter.setPen(QPen(QColor("#c0392b"), 2))
+            painter.setBrush(QColor("#e74c3c"))
+            painter.drawEllipse(QPointF(x, y), 4, 4)
+
+
+class GridTableModel(QAbstractTableModel):
+    """
+    Read-only heatmap of a 2-D slice of a sample size grid.
+
+    Cells are formatted and coloured only when the view asks for them, so the
+    table stays fast however large the grid (QTableView only requests the
+    visible cells).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._n = None
+        self._shade = None
+        self._row_labels = []
+        self._column_labels = []
+
+    def set_slice(self, n, row_labels, column_labels):
+        import numpy as np
+        self.beginResetModel()
+        self._n = n
+        self._row_labels = row_labels
+        self._column_labels = column_labels
+        # Colour by log N, scaled over the finite cells of the slice
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_n = np.log(n)
+        finite = np.isfinite(log_n)
+        if finite.any():
+            lo, hi = log_n[finite].min(), log_n[finite].max()
+            self._shade = np.where(finite, (log_n - lo) / (hi - lo) if hi > lo else 0.5, np.nan)
+        else:
+            self._shade = log_n
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self._n is None else self._n.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self._n is None else self._n.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._n[index.row(), index.column()]
+        shade = self._shade[index.row(), index.column()]
+        if role == Qt.DisplayRole:
+            return "–" if value != value else f"{value:,.0f}"
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            if shade != shade:
+                return QColor("#f2f2f2")
+            light, dark = (234, 242, 248), (31, 97, 141)
+            return QColor(*(round(a + (b - a) * shade) for a, b in zip(light, dark)))
+        if role == Qt.ForegroundRole:
+            return QColor("white") if shade == shade and shade > 0.55 else QColor("#2c3e50")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        labels = self._column_labels if orientation == Qt.Horizontal else self._row_labels
+        return labels[section] if section < len(labels) else None
+
 
 class SampleSizeCalculator(QMainWindow):
     def __init__(self):
@@ -85,6 +339,12 @@ class SampleSizeCalculator(QMainWindow):
         self.create_basic_tab()
         self.create_intermediate_tab()
         self.create_advanced_tab()
+        self.create_grid_tab()
+        self.create_sequential_tab()
+        self.create_endpoints_tab()
+        self.create_correlated_tab()
+        self.create_survival_tab()
+        self.create_equivalence_tab()
 
         main_layout.addWidget(self.tabs)
 
@@ -97,6 +357,43 @@ class SampleSizeCalculator(QMainWindow):
         footer.setStyleSheet("color: #95a5a6; margin-top: 15px; margin-bottom: 5px;")
         main_layout.addWidget(footer)
 
+        self.setup_live_updates()
+        self.create_diagnostics_panel()
+
+        # Startup milestones (seconds since module import) for --profile-startup
+        self.startup_times = {"window constructed": time.perf_counter() - _STARTUP_T0}
+        self.warm_up_finished = threading.Event()
+        self._warm_up_started = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._warm_up_started:
+            self._warm_up_started = True
+            # Runs once the event loop has painted the window
+            QTimer.singleShot(0, self.start_warm_up)
+
+    def start_warm_up(self):
+        """Preload numpy/scipy and the engine on a worker thread so the first click does not stall."""
+        self.startup_times["window shown"] = time.perf_counter() - _STARTUP_T0
+        threading.Thread(target=self._warm_up, name="numerics-warm-up", daemon=True).start()
+        for panel in CALCULATION_PANELS: # Fill in the results for the default inputs
+            self.schedule_calculation(panel)
+
+    def _warm_up(self):
+        try:
+            from sample_size import engine, tables
+            # One call per solver family loads the scipy distributions they use
+            # (and leaves the default designs in the result cache)
+            engine.indep_t_sample(0.05, 0.80, 0.50)
+            engine.oneway_sample(0.05, 0.80, 0.25, 3)
+            engine.chi_ind_sample(0.05, 0.80, 0.30, 4)
+            tables.load()
+        except Exception as e:
+            print(f"Warm-up failed: {e}", file=sys.stderr) # The slots will import on demand instead
+        finally:
+            self.startup_times["numerics warmed up"] = time.perf_counter() - _STARTUP_T0
+            self.warm_up_finished.set()
+
     def set_application_style(self):
         """Set the global application style"""
         self.setStyleSheet("""
@@ -198,10 +495,13 @@ class SampleSizeCalculator(QMainWindow):
         self.indep_t_alpha = QDoubleSpinBox(decimals=3, value=0.05, minimum=0.001, maximum=0.5, singleStep=0.01)
         self.indep_t_power = QDoubleSpinBox(decimals=2, value=0.80, minimum=0.50, maximum=0.99, singleStep=0.05)
         self.indep_t_effect = QDoubleSpinBox(decimals=2, value=0.50, minimum=0.10, maximum=3.00, singleStep=0.05)
+        self.indep_t_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1,
+                                            toolTip="Allocation ratio n2 / n1")
 
         indep_t_form.addRow("Significance Level (α):", self.indep_t_alpha)
         indep_t_form.addRow("Power (1-β):", self.indep_t_power)
         indep_t_form.addRow("Effect Size (Cohen's d):", self.indep_t_effect)
+        indep_t_form.addRow("Allocation Ratio (n2/n1):", self.indep_t_ratio)
 
         indep_t_calc_btn = QPushButton("Calculate")
         indep_t_calc_btn.clicked.connect(self.calc_indep_t_sample)
@@ -268,6 +568,46 @@ class SampleSizeCalculator(QMainWindow):
         one_t_container.setLayout(one_t_container_layout)
         t_tests_grid.addWidget(one_t_container, 1, 0)
 
+        # Cost-optimal allocation between the two independent groups
+        allocation_container = QGroupBox("Cost-Optimal Allocation")
+        allocation_container_layout = QVBoxLayout()
+        allocation_form = QFormLayout()
+
+        self.allocation_goal = QComboBox()
+        self.allocation_goal.addItems(["Minimize cost for the power", "Maximize power within the budget"])
+        self.allocation_alpha = QDoubleSpinBox(decimals=3, value=0.05, minimum=0.001, maximum=0.5, singleStep=0.01)
+        self.allocation_effect = QDoubleSpinBox(decimals=2, value=0.50, minimum=0.10, maximum=3.00, singleStep=0.05)
+        self.allocation_cost1 = QDoubleSpinBox(decimals=2, minimum=0.01, maximum=1e6, value=1.0, toolTip="Cost per subject in group 1")
+        self.allocation_cost2 = QDoubleSpinBox(decimals=2, minimum=0.01, maximum=1e6, value=1.0, toolTip="Cost per subject in group 2")
+        self.allocation_power = QDoubleSpinBox(decimals=2, value=0.80, minimum=0.50, maximum=0.99, singleStep=0.05)
+        self.allocation_budget = QDoubleSpinBox(decimals=0, minimum=4, maximum=1e9, value=200, singleStep=10,
+                                                toolTip="Total budget, in the units of the costs")
+        self.allocation_budget.setVisible(False)
+
+        allocation_form.addRow("Goal:", self.allocation_goal)
+        allocation_form.addRow("Significance Level (α):", self.allocation_alpha)
+        allocation_form.addRow("Effect Size (Cohen's d):", self.allocation_effect)
+        allocation_form.addRow("Cost per Subject, Group 1:", self.allocation_cost1)
+        allocation_form.addRow("Cost per Subject, Group 2:", self.allocation_cost2)
+        allocation_form.addRow("Power (1-β):", self.allocation_power)
+        allocation_form.addRow("Budget:", self.allocation_budget)
+        allocation_form.labelForField(self.allocation_budget).setVisible(False)
+        self.allocation_goal.currentIndexChanged.connect(self.update_allocation_inputs)
+        self._allocation_form = allocation_form
+
+        allocation_calc_btn = QPushButton("Calculate")
+        allocation_calc_btn.clicked.connect(self.calc_allocation)
+
+        self.allocation_result = QLabel("Allocation: N/A")
+        self.allocation_result.setObjectName("resultLabel")
+        self.allocation_result.setAlignment(Qt.AlignCenter)
+
+        allocation_container_layout.addLayout(allocation_form)
+        allocation_container_layout.addWidget(allocation_calc_btn, 0, Qt.AlignCenter)
+        allocation_container_layout.addWidget(self.allocation_result)
+        allocation_container.setLayout(allocation_container_layout)
+        t_tests_grid.addWidget(allocation_container, 1, 1)
+
         t_test_layout.addLayout(t_tests_grid)
         t_test_group.setLayout(t_test_layout)
         basic_layout.addWidget(t_test_group)
@@ -308,35 +648,41 @@ class SampleSizeCalculator(QMainWindow):
         oneway_container.setLayout(oneway_container_layout)
         anova_grid.addWidget(oneway_container, 0, 0)
 
-        # Factorial ANOVA (Placeholder - more complex)
-        factorial_container = QGroupBox("Factorial ANOVA (Example: 2x2)") # Simplified example
+        # Factorial ANOVA (any number of factors up to FACTORIAL_MAX_FACTORS, all effects)
+        factorial_container = QGroupBox("Factorial ANOVA")
         factorial_container_layout = QVBoxLayout()
         factorial_form = QFormLayout()
 
         self.factorial_alpha = QDoubleSpinBox(decimals=3, value=0.05, minimum=0.001, maximum=0.5, singleStep=0.01)
         self.factorial_power = QDoubleSpinBox(decimals=2, value=0.80, minimum=0.50, maximum=0.99, singleStep=0.05)
-        self.factorial_effect = QDoubleSpinBox(decimals=2, value=0.25, minimum=0.05, maximum=1.50, singleStep=0.05) # Cohen's f
-        # Example: For a 2x2 ANOVA, numerator df for interaction = (2-1)*(2-1) = 1
-        # Numerator df for main effects = (2-1) = 1
-        # Need specific inputs based on which effect size (main/interaction) is targeted.
-        # This is a simplified placeholder.
-        self.factorial_num_df = QSpinBox(value=1, minimum=1, maximum=50, toolTip="Numerator degrees of freedom for the effect of interest")
+        self.factorial_effect = QDoubleSpinBox(decimals=2, value=0.25, minimum=0.05, maximum=1.50, singleStep=0.05, toolTip="Smallest effect of interest, used for every effect") # Cohen's f
+        self.factorial_factors = QSpinBox(value=2, minimum=1, maximum=FACTORIAL_MAX_FACTORS, toolTip="Number of crossed factors")
+        # One levels box per factor; only the first factorial_factors are shown
+        self.factorial_levels = [QSpinBox(value=2, minimum=2, maximum=10) for _ in range(FACTORIAL_MAX_FACTORS)]
+        self.factorial_effects = QComboBox(toolTip="Effects that must reach the target power")
+        self.factorial_effects.addItems(["All effects", "Main effects only", "Main effects and 2-way interactions"])
 
         factorial_form.addRow("Significance Level (α):", self.factorial_alpha)
         factorial_form.addRow("Power (1-β):", self.factorial_power)
         factorial_form.addRow("Effect Size (f):", self.factorial_effect)
-        factorial_form.addRow("Numerator df:", self.factorial_num_df)
+        factorial_form.addRow("Number of Factors:", self.factorial_factors)
+        for i, levels in enumerate(self.factorial_levels):
+            factorial_form.addRow(f"Levels of Factor {'ABCDE'[i]}:", levels)
+        factorial_form.addRow("Powered Effects:", self.factorial_effects)
+        self._factorial_form = factorial_form
+        self.factorial_factors.valueChanged.connect(self.update_factorial_inputs)
+        self.update_factorial_inputs()
 
 
         factorial_calc_btn = QPushButton("Calculate")
-        factorial_calc_btn.clicked.connect(self.calc_factorial_sample) # Placeholder function
+        factorial_calc_btn.clicked.connect(self.calc_factorial_sample)
 
         self.factorial_result = QLabel("Total sample size: N/A")
         self.factorial_result.setObjectName("resultLabel")
         self.factorial_result.setAlignment(Qt.AlignCenter)
+        self.factorial_result.setWordWrap(True)
 
         factorial_container_layout.addLayout(factorial_form)
-        factorial_container_layout.addWidget(QLabel("Note: Factorial ANOVA calculation is complex.\nThis is a simplified interface assuming known numerator df."))
         factorial_container_layout.addWidget(factorial_calc_btn, 0, Qt.AlignCenter)
         factorial_container_layout.addWidget(self.factorial_result)
         factorial_container.setLayout(factorial_container_layout)
@@ -433,9 +779,36 @@ class SampleSizeCalculator(QMainWindow):
         self.linear_reg_result.setObjectName("resultLabel")
         self.linear_reg_result.setAlignment(Qt.AlignCenter)
 
+        # Monte Carlo check of the formula (same inputs, non-normal predictors possible)
+        linear_sim_form = QFormLayout()
+        self.linear_sim_n = QSpinBox(minimum=0, maximum=100000, value=0, specialValueText="Formula N", toolTip="Total sample size to simulate")
+        self.linear_sim_distribution = QComboBox()
+        self.linear_sim_distribution.addItems(PREDICTOR_DISTRIBUTIONS)
+        self.linear_sim_seed = QSpinBox(minimum=0, maximum=2**31 - 1, value=1, specialValueText="Random", toolTip="The same seed always gives the same result")
+        linear_sim_form.addRow("Simulated N:", self.linear_sim_n)
+        linear_sim_form.addRow("Predictor Distribution:", self.linear_sim_distribution)
+        linear_sim_form.addRow("Random Seed:", self.linear_sim_seed)
+
+        linear_sim_btn = QPushButton("Simulate Power")
+        linear_sim_btn.clicked.connect(self.calc_linear_sim_power)
+
+        self.linear_sim_result = QLabel("Simulated power: N/A")
+        self.linear_sim_result.setAlignment(Qt.AlignCenter)
+
+        linear_search_btn = QPushButton("Find N by Simulation")
+        linear_search_btn.clicked.connect(self.calc_linear_search_sample)
+
+        self.linear_search_result = QLabel("Simulated sample size: N/A")
+        self.linear_search_result.setAlignment(Qt.AlignCenter)
+
         linear_reg_container_layout.addLayout(linear_reg_form)
         linear_reg_container_layout.addWidget(linear_reg_calc_btn, 0, Qt.AlignCenter)
         linear_reg_container_layout.addWidget(self.linear_reg_result)
+        linear_reg_container_layout.addLayout(linear_sim_form)
+        linear_reg_container_layout.addWidget(linear_sim_btn, 0, Qt.AlignCenter)
+        linear_reg_container_layout.addWidget(self.linear_sim_result)
+        linear_reg_container_layout.addWidget(linear_search_btn, 0, Qt.AlignCenter)
+        linear_reg_container_layout.addWidget(self.linear_search_result)
         linear_reg_container.setLayout(linear_reg_container_layout)
         reg_grid.addWidget(linear_reg_container, 0, 0)
 
@@ -472,10 +845,36 @@ class SampleSizeCalculator(QMainWindow):
         log_reg_note.setStyleSheet("font-size: 8pt; color: #555;")
 
 
+        logistic_sim_form = QFormLayout()
+        self.logistic_sim_n = QSpinBox(minimum=0, maximum=100000, value=0, specialValueText="Formula N", toolTip="Total sample size to simulate")
+        self.logistic_sim_distribution = QComboBox(toolTip="Distribution of the predictor of interest (standardized)")
+        self.logistic_sim_distribution.addItems(PREDICTOR_DISTRIBUTIONS)
+        self.logistic_sim_seed = QSpinBox(minimum=0, maximum=2**31 - 1, value=1, specialValueText="Random", toolTip="The same seed always gives the same result")
+        logistic_sim_form.addRow("Simulated N:", self.logistic_sim_n)
+        logistic_sim_form.addRow("Predictor Distribution:", self.logistic_sim_distribution)
+        logistic_sim_form.addRow("Random Seed:", self.logistic_sim_seed)
+
+        logistic_sim_btn = QPushButton("Simulate Power")
+        logistic_sim_btn.clicked.connect(self.calc_logistic_sim_power)
+
+        self.logistic_sim_result = QLabel("Simulated power: N/A")
+        self.logistic_sim_result.setAlignment(Qt.AlignCenter)
+
+        logistic_search_btn = QPushButton("Find N by Simulation")
+        logistic_search_btn.clicked.connect(self.calc_logistic_search_sample)
+
+        self.logistic_search_result = QLabel("Simulated sample size: N/A")
+        self.logistic_search_result.setAlignment(Qt.AlignCenter)
+
         logistic_reg_container_layout.addLayout(logistic_reg_form)
         logistic_reg_container_layout.addWidget(log_reg_note)
         logistic_reg_container_layout.addWidget(logistic_reg_calc_btn, 0, Qt.AlignCenter)
         logistic_reg_container_layout.addWidget(self.logistic_reg_result)
+        logistic_reg_container_layout.addLayout(logistic_sim_form)
+        logistic_reg_container_layout.addWidget(logistic_sim_btn, 0, Qt.AlignCenter)
+        logistic_reg_container_layout.addWidget(self.logistic_sim_result)
+        logistic_reg_container_layout.addWidget(logistic_search_btn, 0, Qt.AlignCenter)
+        logistic_reg_container_layout.addWidget(self.logistic_search_result)
         logistic_reg_container.setLayout(logistic_reg_container_layout)
         reg_grid.addWidget(logistic_reg_container, 0, 1)
 
@@ -517,7 +916,41 @@ class SampleSizeCalculator(QMainWindow):
         chi_ind_container.setLayout(chi_ind_container_layout)
         chi_grid.addWidget(chi_ind_container, 0, 0)
 
-        # Add more chi-square related tests here if needed
+        # Exact tests for proportions (small samples and rare events)
+        exact_container = QGroupBox("Exact Tests for Proportions")
+        exact_container_layout = QVBoxLayout()
+        exact_form = QFormLayout()
+
+        self.exact_test = QComboBox()
+        self.exact_test.addItems(["Exact Binomial (One Sample)", "Fisher's Exact (Two Samples)", "Barnard's Exact (Two Samples)"])
+        self.exact_alpha = QDoubleSpinBox(decimals=3, value=0.05, minimum=0.001, maximum=0.5, singleStep=0.01)
+        self.exact_power = QDoubleSpinBox(decimals=2, value=0.80, minimum=0.50, maximum=0.99, singleStep=0.05)
+        self.exact_p1 = QDoubleSpinBox(decimals=4, minimum=0.0001, maximum=0.9999, value=0.01, singleStep=0.005)
+        self.exact_p2 = QDoubleSpinBox(decimals=4, minimum=0.0001, maximum=0.9999, value=0.04, singleStep=0.005)
+        self.exact_tails = QComboBox()
+        self.exact_tails.addItems(["Two-tailed", "One-tailed"])
+
+        exact_form.addRow("Test:", self.exact_test)
+        exact_form.addRow("Significance Level (α):", self.exact_alpha)
+        exact_form.addRow("Power (1-β):", self.exact_power)
+        exact_form.addRow("Null Proportion (p0):", self.exact_p1)
+        exact_form.addRow("True Proportion (p1):", self.exact_p2)
+        exact_form.addRow("Tails:", self.exact_tails)
+        self._exact_form = exact_form
+        self.exact_test.currentIndexChanged.connect(self.update_exact_inputs)
+
+        exact_calc_btn = QPushButton("Calculate")
+        exact_calc_btn.clicked.connect(self.calc_exact_sample)
+
+        self.exact_result = QLabel("Sample size: N/A")
+        self.exact_result.setObjectName("resultLabel")
+        self.exact_result.setAlignment(Qt.AlignCenter)
+
+        exact_container_layout.addLayout(exact_form)
+        exact_container_layout.addWidget(exact_calc_btn, 0, Qt.AlignCenter)
+        exact_container_layout.addWidget(self.exact_result)
+        exact_container.setLayout(exact_container_layout)
+        chi_grid.addWidget(exact_container, 0, 1)
 
         chi_layout.addLayout(chi_grid)
         chi_group.setLayout(chi_layout)
@@ -557,12 +990,21 @@ class SampleSizeCalculator(QMainWindow):
             "Correlation (Pearson)", "Linear Regression", "Chi-Square"
             ])
         self.power_level_alpha = QDoubleSpinBox(decimals=3, value=0.05, minimum=0.001, maximum=0.5, singleStep=0.01)
-        self.power_level_n = QSpinBox(value=100, minimum=10, maximum=10000, singleStep=10, toolTip="Total N for Regression/Chi2/Corr; N per group for T-Ind/ANOVA; N pairs for T-Paired")
+        self.power_level_n = QSpinBox(minimum=10, maximum=10000, value=100, singleStep=10, toolTip="Total N for Regression/Chi2/Corr; N per group for T-Ind/ANOVA; N pairs for T-Paired")
         self.power_level_effect = QDoubleSpinBox(decimals=3, value=0.3, minimum=0.01, maximum=3.0, singleStep=0.01, toolTip="Effect size (d, f, r, f², w)")
         # Add specific inputs needed for certain tests (e.g., df, groups)
         self.power_level_groups = QSpinBox(value=3, minimum=2, maximum=20, toolTip="Num Groups (ANOVA)")
         self.power_level_predictors = QSpinBox(value=3, minimum=1, maximum=50, toolTip="Num Predictors (Regression)")
         self.power_level_df = QSpinBox(value=4, minimum=1, maximum=100, toolTip="df (Chi-Square)")
+        self.power_level_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1,
+                                                toolTip="Allocation ratio n2 / n1 (T-Test Independent; N is group 1)")
+        # Assurance mode: average the power over a normal prior on the effect size (SD 0 = fixed effect)
+        self.power_level_prior_sd = QDoubleSpinBox(decimals=3, value=0.0, minimum=0.0, maximum=3.0, singleStep=0.01,
+                                                   specialValueText="Fixed effect",
+                                                   toolTip="SD of a normal prior centred on the effect size; above 0 the result is the assurance (prior-averaged power)")
+        self.power_level_prior_method = QComboBox()
+        self.power_level_prior_method.addItems(["Gauss-Hermite", "Quasi-Monte Carlo"])
+        self.power_level_prior_method.setToolTip("Quadrature over the prior (quasi-Monte Carlo is steadier for large N with a wide prior)")
         # Initially hide specific inputs
         self.power_level_groups.setVisible(False)
         self.power_level_predictors.setVisible(False)
@@ -576,12 +1018,16 @@ class SampleSizeCalculator(QMainWindow):
         self.power_level_groups_row = power_level_form.addRow("Number of Groups:", self.power_level_groups)
         self.power_level_predictors_row = power_level_form.addRow("Number of Predictors:", self.power_level_predictors)
         self.power_level_df_row = power_level_form.addRow("Degrees of Freedom:", self.power_level_df)
+        power_level_form.addRow("Allocation Ratio (n2/n1):", self.power_level_ratio) # Shown for the default test
+        power_level_form.addRow("Effect Size Prior SD:", self.power_level_prior_sd)
+        power_level_form.addRow("Prior Quadrature:", self.power_level_prior_method)
         # Hide rows initially - PyQt doesn't directly hide rows, hide widgets instead
         power_level_form.labelForField(self.power_level_groups).setVisible(False)
         power_level_form.labelForField(self.power_level_predictors).setVisible(False)
         power_level_form.labelForField(self.power_level_df).setVisible(False)
         # Connect signal to update visibility
         self.power_level_test_type.currentIndexChanged.connect(self.update_power_level_inputs)
+        self._power_level_form = power_level_form
 
 
         power_level_calc_btn = QPushButton("Calculate Power")
@@ -609,11 +1055,13 @@ class SampleSizeCalculator(QMainWindow):
             ])
         self.power_effect_alpha = QDoubleSpinBox(decimals=3, value=0.05, minimum=0.001, maximum=0.5, singleStep=0.01)
         self.power_effect_power = QDoubleSpinBox(decimals=2, value=0.80, minimum=0.50, maximum=0.99, singleStep=0.05)
-        self.power_effect_n = QSpinBox(value=100, minimum=10, maximum=10000, singleStep=10, toolTip="Total N or N per group/pair")
+        self.power_effect_n = QSpinBox(minimum=10, maximum=10000, value=100, singleStep=10, toolTip="Total N or N per group/pair")
         # Add specific inputs needed for certain tests (e.g., df, groups)
         self.power_effect_groups = QSpinBox(value=3, minimum=2, maximum=20, toolTip="Num Groups (ANOVA)")
         self.power_effect_predictors = QSpinBox(value=3, minimum=1, maximum=50, toolTip="Num Predictors (Regression)")
         self.power_effect_df = QSpinBox(value=4, minimum=1, maximum=100, toolTip="df (Chi-Square)")
+        self.power_effect_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1,
+                                                 toolTip="Allocation ratio n2 / n1 (T-Test Independent; N is group 1)")
         # Initially hide specific inputs
         self.power_effect_groups.setVisible(False)
         self.power_effect_predictors.setVisible(False)
@@ -627,12 +1075,14 @@ class SampleSizeCalculator(QMainWindow):
         self.power_effect_groups_row = power_effect_form.addRow("Number of Groups:", self.power_effect_groups)
         self.power_effect_predictors_row = power_effect_form.addRow("Number of Predictors:", self.power_effect_predictors)
         self.power_effect_df_row = power_effect_form.addRow("Degrees of Freedom:", self.power_effect_df)
+        power_effect_form.addRow("Allocation Ratio (n2/n1):", self.power_effect_ratio) # Shown for the default test
         # Hide rows initially
         power_effect_form.labelForField(self.power_effect_groups).setVisible(False)
         power_effect_form.labelForField(self.power_effect_predictors).setVisible(False)
         power_effect_form.labelForField(self.power_effect_df).setVisible(False)
         # Connect signal to update visibility
         self.power_effect_test_type.currentIndexChanged.connect(self.update_power_effect_inputs)
+        self._power_effect_form = power_effect_form
 
 
         power_effect_calc_btn = QPushButton("Calculate MDES")
@@ -653,6 +1103,64 @@ class SampleSizeCalculator(QMainWindow):
         power_group.setLayout(power_layout)
         advanced_layout.addWidget(power_group)
 
+        # --- Power curves section ---
+        curve_group = QGroupBox("Power Curves")
+        curve_layout = QHBoxLayout()
+        curve_form = QFormLayout()
+
+        self.curve_test_type = QComboBox()
+        self.curve_test_type.addItems([
+            "T-Test (Independent)", "T-Test (Paired)", "ANOVA (One-way)",
+            "Correlation (Pearson)", "Linear Regression", "Chi-Square"
+            ])
+        self.curve_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.05, singleStep=0.01)
+        self.curve_n = QSpinBox(minimum=2, maximum=100000, value=100, singleStep=10, toolTip="Total N for Regression/Chi2/Corr; N per group for T-Ind/ANOVA; N pairs for T-Paired")
+        self.curve_effect = QDoubleSpinBox(decimals=3, minimum=0.01, maximum=3.0, value=0.3, singleStep=0.01, toolTip="Effect size (d, f, r, f², w)")
+        self.curve_groups = QSpinBox(minimum=2, maximum=20, value=3, toolTip="Num Groups (ANOVA)")
+        self.curve_predictors = QSpinBox(minimum=1, maximum=50, value=3, toolTip="Num Predictors (Regression)")
+        self.curve_df = QSpinBox(minimum=1, maximum=100, value=4, toolTip="df (Chi-Square)")
+        self.curve_n_max = QSpinBox(minimum=10, maximum=100000, value=300, singleStep=50, toolTip="Right end of the power-vs-N axis")
+        self.curve_effect_max = QDoubleSpinBox(decimals=2, minimum=0.05, maximum=3.0, value=1.0, singleStep=0.05, toolTip="Right end of the power-vs-effect axis")
+        self.curve_points = QSpinBox(minimum=50, maximum=20000, value=1000, singleStep=250, toolTip="Points evaluated per curve")
+        self.curve_target = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05, toolTip="Reference line")
+
+        curve_form.addRow("Statistical Test:", self.curve_test_type)
+        curve_form.addRow("Significance Level (α):", self.curve_alpha)
+        curve_form.addRow("Sample Size (N):", self.curve_n)
+        curve_form.addRow("Effect Size:", self.curve_effect)
+        curve_form.addRow("Number of Groups:", self.curve_groups)
+        curve_form.addRow("Number of Predictors:", self.curve_predictors)
+        curve_form.addRow("Degrees of Freedom:", self.curve_df)
+        curve_form.addRow("Max N on Axis:", self.curve_n_max)
+        curve_form.addRow("Max Effect on Axis:", self.curve_effect_max)
+        curve_form.addRow("Points per Curve:", self.curve_points)
+        curve_form.addRow("Target Power:", self.curve_target)
+        for widget in (self.curve_groups, self.curve_predictors, self.curve_df):
+            widget.setVisible(False)
+            curve_form.labelForField(widget).setVisible(False)
+        self.curve_test_type.currentIndexChanged.connect(self.update_curve_inputs)
+        self._curve_form = curve_form
+
+        self.curve_result = QLabel("Power: N/A")
+        self.curve_result.setObjectName("resultLabel")
+        self.curve_result.setAlignment(Qt.AlignCenter)
+
+        curve_inputs_layout = QVBoxLayout()
+        curve_inputs_layout.addLayout(curve_form)
+        curve_inputs_layout.addWidget(self.curve_result)
+        curve_inputs_layout.addStretch(1)
+        curve_layout.addLayout(curve_inputs_layout)
+
+        # Power vs N at the chosen effect, power vs effect at the chosen N
+        self.curve_n_plot = PowerCurvePlot("Sample size")
+        self.curve_effect_plot = PowerCurvePlot("Effect size")
+        curve_layout.addWidget(self.curve_n_plot, 1)
+        curve_layout.addWidget(self.curve_effect_plot, 1)
+        self._curve_keys = {"n": None, "effect": None} # Inputs of the curves currently drawn
+
+        curve_group.setLayout(curve_layout)
+        advanced_layout.addWidget(curve_group)
+
         # Add other advanced sections here (e.g., Factor Analysis if implemented)
 
         advanced_layout.addStretch(1)
@@ -664,312 +1172,1568 @@ class SampleSizeCalculator(QMainWindow):
         # Add tab
         self.tabs.addTab(scroll, "Advanced / Power")
 
+    def create_grid_tab(self):
+        grid_tab_widget = QWidget()
+        grid_layout = QHBoxLayout(grid_tab_widget)
+        grid_layout.setSpacing(15)
+
+        grid_group = QGroupBox("Design Space")
+        grid_form = QFormLayout()
+        self.grid_test_type = QComboBox()
+        self.grid_test_type.addItems([
+            "T-Test (Independent)", "T-Test (Paired)", "ANOVA (One-way)",
+            "Correlation (Pearson)", "Linear Regression", "Chi-Square"
+            ])
+        self.grid_groups = QSpinBox(minimum=2, maximum=20, value=3, toolTip="Num Groups (ANOVA)")
+        self.grid_predictors = QSpinBox(minimum=1, maximum=50, value=3, toolTip="Num Predictors (Regression)")
+        self.grid_df = QSpinBox(minimum=1, maximum=100, value=4, toolTip="df (Chi-Square)")
+        # Ranges as start / stop / step: extending a range keeps the values already computed
+        self.grid_alpha_start = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.01, singleStep=0.01)
+        self.grid_alpha_stop = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.10, singleStep=0.01)
+        self.grid_alpha_step = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.01, singleStep=0.005)
+        self.grid_power_start = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.70, singleStep=0.05)
+        self.grid_power_stop = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.95, singleStep=0.05)
+        self.grid_power_step = QDoubleSpinBox(decimals=2, minimum=0.01, maximum=0.5, value=0.05, singleStep=0.01)
+        self.grid_effect_start = QDoubleSpinBox(decimals=3, minimum=0.01, maximum=3.0, value=0.10, singleStep=0.05)
+        self.grid_effect_stop = QDoubleSpinBox(decimals=3, minimum=0.01, maximum=3.0, value=1.00, singleStep=0.05)
+        self.grid_effect_step = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=1.0, value=0.05, singleStep=0.01)
+
+        grid_form.addRow("Statistical Test:", self.grid_test_type)
+        grid_form.addRow("Number of Groups:", self.grid_groups)
+        grid_form.addRow("Number of Predictors:", self.grid_predictors)
+        grid_form.addRow("Degrees of Freedom:", self.grid_df)
+        ranges_layout = QGridLayout()
+        for column, part in enumerate(("Start", "Stop", "Step"), start=1):
+            ranges_layout.addWidget(QLabel(part, alignment=Qt.AlignCenter), 0, column)
+        for row, (name, label) in enumerate((("alpha", "α"), ("power", "Power"), ("effect", "Effect Size")), start=1):
+            ranges_layout.addWidget(QLabel(f"{label}:"), row, 0)
+            for column, part in enumerate(("start", "stop", "step"), start=1):
+                ranges_layout.addWidget(getattr(self, f"grid_{name}_{part}"), row, column)
+        for widget in (self.grid_groups, self.grid_predictors, self.grid_df):
+            widget.setVisible(False)
+            grid_form.labelForField(widget).setVisible(False)
+        self.grid_test_type.currentIndexChanged.connect(self.update_grid_inputs)
+        self._grid_form = grid_form
+
+        self.grid_result = QLabel("Grid: N/A")
+        self.grid_result.setObjectName("resultLabel")
+        self.grid_result.setAlignment(Qt.AlignCenter)
+        self.grid_result.setWordWrap(True)
+
+        grid_inputs_layout = QVBoxLayout()
+        grid_inputs_layout.addLayout(grid_form)
+        grid_inputs_layout.addLayout(ranges_layout)
+        grid_inputs_layout.addWidget(self.grid_result)
+        grid_inputs_layout.addStretch(1)
+        grid_group.setLayout(grid_inputs_layout)
+        grid_layout.addWidget(grid_group)
+
+        # Heatmap of one alpha slice: effect sizes down, powers across
+        heatmap_group = QGroupBox("Sample Size Heatmap")
+        heatmap_layout = QVBoxLayout()
+        heatmap_form = QFormLayout()
+        self.heatmap_alpha = QComboBox(toolTip="The α slice shown") # Only changes the view, no recalculation
+        self.heatmap_alpha.currentIndexChanged.connect(self.show_grid_slice)
+        heatmap_form.addRow("Significance Level (α):", self.heatmap_alpha)
+        heatmap_form.addRow(QLabel("Rows: effect size, columns: power"))
+        self.heatmap_model = GridTableModel(self)
+        self.heatmap_view = QTableView()
+        self.heatmap_view.setModel(self.heatmap_model)
+        self.heatmap_view.horizontalHeader().setDefaultSectionSize(60)
+        self.heatmap_view.verticalHeader().setDefaultSectionSize(22)
+        heatmap_layout.addLayout(heatmap_form)
+        heatmap_layout.addWidget(self.heatmap_view)
+        heatmap_group.setLayout(heatmap_layout)
+        grid_layout.addWidget(heatmap_group, 1)
+
+        self._grid_explorer = None # sample_size.grid.GridExplorer, created by the first job
+        self._grid = None          # GridResult shown
+        self.tabs.addTab(grid_tab_widget, "Grid Explorer")
+
+    SEQUENTIAL_COLUMNS = ("Look", "Information", "N", "Z Boundary", "Nominal p", "α Spent", "P(Stop | H1)")
+
+    def create_sequential_tab(self):
+        sequential_tab_widget = QWidget()
+        sequential_layout = QHBoxLayout(sequential_tab_widget)
+        sequential_layout.setSpacing(15)
+
+        sequential_group = QGroupBox("Group-Sequential Design")
+        sequential_form = QFormLayout()
+        self.sequential_test_type = QComboBox()
+        self.sequential_test_type.addItems([
+            "T-Test (Independent)", "T-Test (Paired)", "ANOVA (One-way)",
+            "Correlation (Pearson)", "Linear Regression", "Chi-Square"
+            ])
+        self.sequential_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.05, singleStep=0.01)
+        self.sequential_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.90, singleStep=0.05)
+        self.sequential_effect = QDoubleSpinBox(decimals=3, minimum=0.01, maximum=3.0, value=0.5, singleStep=0.01, toolTip="Effect size (d, f, r, f², w)")
+        self.sequential_groups = QSpinBox(minimum=2, maximum=20, value=3, toolTip="Num Groups (ANOVA)")
+        self.sequential_predictors = QSpinBox(minimum=1, maximum=50, value=3, toolTip="Num Predictors (Regression)")
+        self.sequential_df = QSpinBox(minimum=1, maximum=100, value=4, toolTip="df (Chi-Square)")
+        self.sequential_looks = QSpinBox(minimum=1, maximum=20, value=5, toolTip="Analyses at equally spaced information, the last one included")
+        self.sequential_boundary = QComboBox()
+        self.sequential_boundary.addItems(["O'Brien-Fleming", "Pocock", "Lan-DeMets (O'Brien-Fleming)", "Lan-DeMets (Pocock)"])
+        self.sequential_sides = QComboBox()
+        self.sequential_sides.addItems(["Two-sided", "One-sided"])
+
+        sequential_form.addRow("Statistical Test:", self.sequential_test_type)
+        sequential_form.addRow("Significance Level (α):", self.sequential_alpha)
+        sequential_form.addRow("Desired Power (1-β):", self.sequential_power)
+        sequential_form.addRow("Effect Size:", self.sequential_effect)
+        sequential_form.addRow("Number of Groups:", self.sequential_groups)
+        sequential_form.addRow("Number of Predictors:", self.sequential_predictors)
+        sequential_form.addRow("Degrees of Freedom:", self.sequential_df)
+        sequential_form.addRow("Number of Looks:", self.sequential_looks)
+        sequential_form.addRow("Boundary:", self.sequential_boundary)
+        sequential_form.addRow("Test:", self.sequential_sides)
+        self._sequential_form = sequential_form
+        self.sequential_test_type.currentIndexChanged.connect(self.update_sequential_inputs)
+
+        sequential_calc_btn = QPushButton("Calculate Design")
+        sequential_calc_btn.clicked.connect(self.calc_sequential_sample)
+        self.sequential_result = QLabel("Maximum sample size: N/A")
+        self.sequential_result.setObjectName("resultLabel")
+        self.sequential_result.setAlignment(Qt.AlignCenter)
+        self.sequential_result.setWordWrap(True)
+
+        sequential_inputs_layout = QVBoxLayout()
+        sequential_inputs_layout.addLayout(sequential_form)
+        sequential_inputs_layout.addWidget(sequential_calc_btn, 0, Qt.AlignCenter)
+        sequential_inputs_layout.addWidget(self.sequential_result)
+        sequential_inputs_layout.addStretch(1)
+        sequential_group.setLayout(sequential_inputs_layout)
+        sequential_layout.addWidget(sequential_group)
+
+        # One row per look
+        boundary_group = QGroupBox("Stopping Boundaries")
+        boundary_layout = QVBoxLayout()
+        self.boundary_table = QTableWidget(0, len(self.SEQUENTIAL_COLUMNS))
+        self.boundary_table.setHorizontalHeaderLabels(self.SEQUENTIAL_COLUMNS)
+        self.boundary_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.boundary_table.horizontalHeader().setStretchLastSection(True)
+        self.boundary_table.verticalHeader().setVisible(False)
+        self.boundary_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        boundary_layout.addWidget(self.boundary_table)
+        boundary_group.setLayout(boundary_layout)
+        sequential_layout.addWidget(boundary_group, 1)
+
+        self.update_sequential_inputs()
+        self.tabs.addTab(sequential_tab_widget, "Group Sequential")
+
+    ENDPOINT_COLUMNS = ("Endpoint", "Effect (d)", "Adjusted α", "N (Group 1)", "Power at Study N")
+
+    def create_endpoints_tab(self):
+        endpoints_tab_widget = QWidget()
+        endpoints_layout = QHBoxLayout(endpoints_tab_widget)
+        endpoints_layout.setSpacing(15)
+
+        endpoints_group = QGroupBox("Multiple Endpoints (Independent T-Tests)")
+        endpoints_form = QFormLayout()
+        self.endpoints_effects = QLineEdit("0.5, 0.4, 0.3, 0, 0", toolTip="Cohen's d of every endpoint, separated by commas or spaces (0 = no effect)")
+        self.endpoints_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.05, singleStep=0.01)
+        self.endpoints_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05)
+        self.endpoints_method = QComboBox()
+        self.endpoints_method.addItems(["Bonferroni", "Holm", "Hochberg", "FDR (Benjamini-Hochberg)"])
+        self.endpoints_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1,
+                                              toolTip="Allocation ratio n2 / n1")
+
+        endpoints_form.addRow("Effect Sizes (d):", self.endpoints_effects)
+        endpoints_form.addRow("Overall α (FWER or FDR):", self.endpoints_alpha)
+        endpoints_form.addRow("Power per Endpoint (1-β):", self.endpoints_power)
+        endpoints_form.addRow("Correction:", self.endpoints_method)
+        endpoints_form.addRow("Allocation Ratio (n2/n1):", self.endpoints_ratio)
+
+        endpoints_calc_btn = QPushButton("Calculate")
+        endpoints_calc_btn.clicked.connect(self.calc_endpoints_sample)
+        self.endpoints_result = QLabel("Sample size: N/A")
+        self.endpoints_result.setObjectName("resultLabel")
+        self.endpoints_result.setAlignment(Qt.AlignCenter)
+        self.endpoints_result.setWordWrap(True)
+
+        # Study-level power needs the correlation of the endpoints: simulated on demand
+        endpoint_sim_form = QFormLayout()
+        self.endpoint_sim_corr = QDoubleSpinBox(decimals=2, minimum=-0.99, maximum=0.99, value=0.3, singleStep=0.05,
+                                                toolTip="Correlation between the test statistics of every pair of endpoints")
+        self.endpoint_sim_goal = QComboBox()
+        self.endpoint_sim_goal.addItems(["Disjunctive", "Conjunctive"])
+        self.endpoint_sim_goal.setToolTip("Disjunctive: at least one endpoint with an effect rejected; conjunctive: all of them")
+        self.endpoint_sim_simulations = QSpinBox(minimum=1000, maximum=200000, value=10000, singleStep=1000)
+        self.endpoint_sim_seed = QSpinBox(minimum=0, maximum=2**31 - 1, value=1, specialValueText="Random", toolTip="The same seed always gives the same result")
+        endpoint_sim_form.addRow("Endpoint Correlation:", self.endpoint_sim_corr)
+        endpoint_sim_form.addRow("Study Power Goal:", self.endpoint_sim_goal)
+        endpoint_sim_form.addRow("Simulations:", self.endpoint_sim_simulations)
+        endpoint_sim_form.addRow("Seed:", self.endpoint_sim_seed)
+
+        endpoint_sim_btn = QPushButton("Simulate Study N")
+        endpoint_sim_btn.clicked.connect(self.calc_endpoint_sim_sample)
+        self.endpoint_sim_result = QLabel("Study sample size: N/A")
+        self.endpoint_sim_result.setObjectName("resultLabel")
+        self.endpoint_sim_result.setAlignment(Qt.AlignCenter)
+        self.endpoint_sim_result.setWordWrap(True)
+
+        endpoints_inputs_layout = QVBoxLayout()
+        endpoints_inputs_layout.addLayout(endpoints_form)
+        endpoints_inputs_layout.addWidget(endpoints_calc_btn, 0, Qt.AlignCenter)
+        endpoints_inputs_layout.addWidget(self.endpoints_result)
+        endpoints_inputs_layout.addLayout(endpoint_sim_form)
+        endpoints_inputs_layout.addWidget(endpoint_sim_btn, 0, Qt.AlignCenter)
+        endpoints_inputs_layout.addWidget(self.endpoint_sim_result)
+        endpoints_inputs_layout.addStretch(1)
+        endpoints_group.setLayout(endpoints_inputs_layout)
+        endpoints_layout.addWidget(endpoints_group)
+
+        # One row per endpoint
+        endpoint_table_group = QGroupBox("Endpoints")
+        endpoint_table_layout = QVBoxLayout()
+        self.endpoint_table = QTableWidget(0, len(self.ENDPOINT_COLUMNS))
+        self.endpoint_table.setHorizontalHeaderLabels(self.ENDPOINT_COLUMNS)
+        self.endpoint_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.endpoint_table.horizontalHeader().setStretchLastSection(True)
+        self.endpoint_table.verticalHeader().setVisible(False)
+        self.endpoint_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        endpoint_table_layout.addWidget(self.endpoint_table)
+        endpoint_table_group.setLayout(endpoint_table_layout)
+        endpoints_layout.addWidget(endpoint_table_group, 1)
+
+        self.tabs.addTab(endpoints_tab_widget, "Multiple Endpoints")
+
+    CLUSTER_ICCS = (0.0, 0.01, 0.02, 0.05, 0.1, 0.2)  # Rows of the comparison table
+    CLUSTER_SIZES = (5, 10, 20, 30, 50, 100)          # ... and its columns
+
+    def create_correlated_tab(self):
+        correlated_tab_widget = QWidget()
+        correlated_layout = QHBoxLayout(correlated_tab_widget)
+        correlated_layout.setSpacing(15)
+
+        # Cluster-randomized trial
+        cluster_group = QGroupBox("Cluster-Randomized Trial")
+        cluster_form = QFormLayout()
+        self.cluster_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.05, singleStep=0.01)
+        self.cluster_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05)
+        self.cluster_groups = QSpinBox(minimum=2, maximum=20, value=2, toolTip="2 arms: t-test with Cohen's d; more: one-way ANOVA with Cohen's f")
+        self.cluster_effect = QDoubleSpinBox(decimals=2, minimum=0.05, maximum=3.00, value=0.50, singleStep=0.05)
+        self.cluster_icc = QDoubleSpinBox(decimals=3, minimum=0.0, maximum=0.99, value=0.05, singleStep=0.01, toolTip="Intraclass correlation")
+        self.cluster_size = QDoubleSpinBox(decimals=1, minimum=1.0, maximum=10000.0, value=20.0, singleStep=1.0, toolTip="Mean subjects per cluster")
+        self.cluster_cv = QDoubleSpinBox(decimals=2, minimum=0.0, maximum=3.0, value=0.0, singleStep=0.05, toolTip="Coefficient of variation of the cluster sizes (0 = equal clusters)")
+
+        cluster_form.addRow("Significance Level (α):", self.cluster_alpha)
+        cluster_form.addRow("Power (1-β):", self.cluster_power)
+        cluster_form.addRow("Number of Arms:", self.cluster_groups)
+        cluster_form.addRow("Effect Size (Cohen's d):", self.cluster_effect)
+        cluster_form.addRow("ICC:", self.cluster_icc)
+        cluster_form.addRow("Mean Cluster Size:", self.cluster_size)
+        cluster_form.addRow("Cluster Size CV:", self.cluster_cv)
+        self._cluster_form = cluster_form
+        self.cluster_groups.valueChanged.connect(self.update_cluster_inputs)
+
+        cluster_calc_btn = QPushButton("Calculate")
+        cluster_calc_btn.clicked.connect(self.calc_cluster_sample)
+        self.cluster_result = QLabel("Clusters per arm: N/A")
+        self.cluster_result.setObjectName("resultLabel")
+        self.cluster_result.setAlignment(Qt.AlignCenter)
+        self.cluster_result.setWordWrap(True)
+
+        # Clusters per arm for other ICCs and cluster sizes at the same effect
+        self.cluster_table = QTableWidget(len(self.CLUSTER_ICCS), len(self.CLUSTER_SIZES))
+        self.cluster_table.setHorizontalHeaderLabels([f"m = {m}" for m in self.CLUSTER_SIZES])
+        self.cluster_table.setVerticalHeaderLabels([f"ICC {icc:g}" for icc in self.CLUSTER_ICCS])
+        self.cluster_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.cluster_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.cluster_table.setToolTip("Clusters per arm by ICC (rows) and mean cluster size (columns)")
+
+        cluster_layout = QVBoxLayout()
+        cluster_layout.addLayout(cluster_form)
+        cluster_layout.addWidget(cluster_calc_btn, 0, Qt.AlignCenter)
+        cluster_layout.addWidget(self.cluster_result)
+        cluster_layout.addWidget(self.cluster_table, 1)
+        cluster_group.setLayout(cluster_layout)
+        correlated_layout.addWidget(cluster_group, 1)
+
+        # Repeated-measures ANOVA
+        rm_group = QGroupBox("Repeated-Measures ANOVA")
+        rm_form = QFormLayout()
+        self.rm_test = QComboBox()
+        self.rm_test.addItems(["Within", "Between", "Interaction"])
+        self.rm_test.setToolTip("Within: change over the measurements; Between: groups; Interaction: group x measurement")
+        self.rm_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.05, singleStep=0.01)
+        self.rm_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05)
+        self.rm_effect = QDoubleSpinBox(decimals=2, minimum=0.05, maximum=3.00, value=0.25, singleStep=0.05)
+        self.rm_groups = QSpinBox(minimum=1, maximum=20, value=1)
+        self.rm_measures = QSpinBox(minimum=2, maximum=50, value=4)
+        self.rm_corr = QDoubleSpinBox(decimals=2, minimum=-0.5, maximum=0.99, value=0.5, singleStep=0.05, toolTip="Correlation among repeated measures")
+        self.rm_epsilon = QDoubleSpinBox(decimals=3, minimum=0.02, maximum=1.0, value=1.0, singleStep=0.05,
+                                         toolTip="Greenhouse-Geisser ε (1 = sphericity, at least 1 / (measures - 1))")
+
+        rm_form.addRow("Effect Tested:", self.rm_test)
+        rm_form.addRow("Significance Level (α):", self.rm_alpha)
+        rm_form.addRow("Power (1-β):", self.rm_power)
+        rm_form.addRow("Effect Size (Cohen's f):", self.rm_effect)
+        rm_form.addRow("Number of Groups:", self.rm_groups)
+        rm_form.addRow("Number of Measurements:", self.rm_measures)
+        rm_form.addRow("Correlation Among Measures:", self.rm_corr)
+        rm_form.addRow("Sphericity Correction (ε):", self.rm_epsilon)
+
+        rm_calc_btn = QPushButton("Calculate")
+        rm_calc_btn.clicked.connect(self.calc_rm_sample)
+        self.rm_result = QLabel("Total sample size: N/A")
+        self.rm_result.setObjectName("resultLabel")
+        self.rm_result.setAlignment(Qt.AlignCenter)
+        self.rm_result.setWordWrap(True)
+
+        rm_layout = QVBoxLayout()
+        rm_layout.addLayout(rm_form)
+        rm_layout.addWidget(rm_calc_btn, 0, Qt.AlignCenter)
+        rm_layout.addWidget(self.rm_result)
+        rm_layout.addStretch(1)
+        rm_group.setLayout(rm_layout)
+        correlated_layout.addWidget(rm_group, 1)
+
+        self.tabs.addTab(correlated_tab_widget, "Clustered & Repeated")
+
+    def create_survival_tab(self):
+        survival_tab_widget = QWidget()
+        survival_layout = QHBoxLayout(survival_tab_widget)
+        survival_layout.setSpacing(15)
+
+        survival_group = QGroupBox("Log-Rank Test (Time to Event)")
+        survival_form = QFormLayout()
+        self.survival_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.05, singleStep=0.01)
+        self.survival_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05)
+        self.survival_hr = QDoubleSpinBox(decimals=3, minimum=0.05, maximum=20.0, value=0.70, singleStep=0.05, toolTip="Hazard ratio, group 2 vs group 1")
+        self.survival_method = QComboBox()
+        self.survival_method.addItems(["Schoenfeld", "Freedman"])
+        self.survival_median = QDoubleSpinBox(decimals=1, minimum=0.1, maximum=1000.0, value=12.0, singleStep=1.0, toolTip="Median survival time in group 1 (exponential)")
+        self.survival_accrual = QDoubleSpinBox(decimals=1, minimum=0.0, maximum=1000.0, value=24.0, singleStep=1.0, toolTip="Subjects enter uniformly over this period")
+        self.survival_follow_up = QDoubleSpinBox(decimals=1, minimum=0.0, maximum=1000.0, value=12.0, singleStep=1.0, toolTip="Follow-up after accrual closes, until the analysis")
+        self.survival_dropout = QDoubleSpinBox(decimals=2, minimum=0.0, maximum=50.0, value=1.0, singleStep=0.5, toolTip="Percentage lost to follow-up per time unit (exponential)")
+        self.survival_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1, toolTip="Allocation ratio n2 / n1")
+        self.survival_tails = QComboBox()
+        self.survival_tails.addItems(["Two-tailed", "One-tailed"])
+
+        survival_form.addRow("Significance Level (α):", self.survival_alpha)
+        survival_form.addRow("Power (1-β):", self.survival_power)
+        survival_form.addRow("Hazard Ratio:", self.survival_hr)
+        survival_form.addRow("Method:", self.survival_method)
+        survival_form.addRow("Median Survival, Group 1:", self.survival_median)
+        survival_form.addRow("Accrual Period:", self.survival_accrual)
+        survival_form.addRow("Follow-up After Accrual:", self.survival_follow_up)
+        survival_form.addRow("Dropout per Time Unit (%):", self.survival_dropout)
+        survival_form.addRow("Allocation Ratio (n2/n1):", self.survival_ratio)
+        survival_form.addRow("Tails:", self.survival_tails)
+
+        survival_calc_btn = QPushButton("Calculate")
+        survival_calc_btn.clicked.connect(self.calc_survival_sample)
+        self.survival_result = QLabel("Sample size: N/A")
+        self.survival_result.setObjectName("resultLabel")
+        self.survival_result.setAlignment(Qt.AlignCenter)
+        self.survival_result.setWordWrap(True)
+
+        survival_layout_inner = QVBoxLayout()
+        survival_layout_inner.addLayout(survival_form)
+        survival_layout_inner.addWidget(survival_calc_btn, 0, Qt.AlignCenter)
+        survival_layout_inner.addWidget(self.survival_result)
+        survival_layout_inner.addStretch(1)
+        survival_group.setLayout(survival_layout_inner)
+        survival_layout.addWidget(survival_group, 1)
+
+        # Simulated check of the design, optionally with hazards that change over time
+        logrank_sim_group = QGroupBox("Simulated Log-Rank Power")
+        logrank_sim_form = QFormLayout()
+        self.logrank_sim_n = QSpinBox(minimum=0, maximum=100000, value=0, specialValueText="Formula N", toolTip="Total subjects to simulate (Formula N = the calculated sample size)")
+        self.logrank_sim_cuts = QLineEdit("", toolTip="Times at which the hazard changes, separated by commas (empty = constant hazard)")
+        self.logrank_sim_hazards = QLineEdit("", toolTip="Group 1 hazard per piece, one more than change times (empty = from the median)")
+        self.logrank_sim_seed = QSpinBox(minimum=0, maximum=2**31 - 1, value=1, specialValueText="Random", toolTip="The same seed always gives the same result")
+        logrank_sim_form.addRow("Total Subjects:", self.logrank_sim_n)
+        logrank_sim_form.addRow("Hazard Change Times:", self.logrank_sim_cuts)
+        logrank_sim_form.addRow("Group 1 Hazards:", self.logrank_sim_hazards)
+        logrank_sim_form.addRow("Seed:", self.logrank_sim_seed)
+
+        logrank_sim_btn = QPushButton("Simulate Power")
+        logrank_sim_btn.clicked.connect(self.calc_logrank_sim_power)
+        self.logrank_sim_result = QLabel("Simulated power: N/A")
+        self.logrank_sim_result.setObjectName("resultLabel")
+        self.logrank_sim_result.setAlignment(Qt.AlignCenter)
+        self.logrank_sim_result.setWordWrap(True)
+
+        logrank_sim_layout = QVBoxLayout()
+        logrank_sim_layout.addLayout(logrank_sim_form)
+        logrank_sim_layout.addWidget(logrank_sim_btn, 0, Qt.AlignCenter)
+        logrank_sim_layout.addWidget(self.logrank_sim_result)
+        logrank_sim_layout.addStretch(1)
+        logrank_sim_group.setLayout(logrank_sim_layout)
+        survival_layout.addWidget(logrank_sim_group, 1)
+
+        self.tabs.addTab(survival_tab_widget, "Survival")
+
+    def create_equivalence_tab(self):
+        equivalence_tab_widget = QWidget()
+        equivalence_layout = QHBoxLayout(equivalence_tab_widget)
+        equivalence_layout.setSpacing(15)
+
+        # Means (standardized), parallel groups or paired
+        equiv_mean_group = QGroupBox("Means (Cohen's d)")
+        equiv_mean_form = QFormLayout()
+        self.equiv_mean_goal = QComboBox()
+        self.equiv_mean_goal.addItems(["Non-inferiority", "Equivalence (TOST)"])
+        self.equiv_mean_design = QComboBox()
+        self.equiv_mean_design.addItems(["Parallel Groups", "Paired / One Sample"])
+        self.equiv_mean_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.025, singleStep=0.005, toolTip="Level of each one-sided test")
+        self.equiv_mean_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05)
+        self.equiv_mean_diff = QDoubleSpinBox(decimals=2, minimum=-3.0, maximum=3.0, value=0.0, singleStep=0.05, toolTip="Expected difference, test minus reference, in SD units")
+        self.equiv_mean_margin = QDoubleSpinBox(decimals=2, minimum=0.01, maximum=3.0, value=0.50, singleStep=0.05, toolTip="Margin in SD units (equivalence: ± margin)")
+        self.equiv_mean_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1, toolTip="Allocation ratio n2 / n1")
+
+        equiv_mean_form.addRow("Hypothesis:", self.equiv_mean_goal)
+        equiv_mean_form.addRow("Design:", self.equiv_mean_design)
+        equiv_mean_form.addRow("Significance Level (α):", self.equiv_mean_alpha)
+        equiv_mean_form.addRow("Power (1-β):", self.equiv_mean_power)
+        equiv_mean_form.addRow("Expected Difference (d):", self.equiv_mean_diff)
+        equiv_mean_form.addRow("Margin (d):", self.equiv_mean_margin)
+        equiv_mean_form.addRow("Allocation Ratio (n2/n1):", self.equiv_mean_ratio)
+        self._equiv_mean_form = equiv_mean_form
+        self.equiv_mean_design.currentIndexChanged.connect(self.update_equiv_mean_inputs)
+
+        equiv_mean_calc_btn = QPushButton("Calculate")
+        equiv_mean_calc_btn.clicked.connect(self.calc_equiv_mean_sample)
+        self.equiv_mean_result = QLabel("Sample size: N/A")
+        self.equiv_mean_result.setObjectName("resultLabel")
+        self.equiv_mean_result.setAlignment(Qt.AlignCenter)
+        self.equiv_mean_result.setWordWrap(True)
+
+        equiv_mean_layout = QVBoxLayout()
+        equiv_mean_layout.addLayout(equiv_mean_form)
+        equiv_mean_layout.addWidget(equiv_mean_calc_btn, 0, Qt.AlignCenter)
+        equiv_mean_layout.addWidget(self.equiv_mean_result)
+        equiv_mean_layout.addStretch(1)
+        equiv_mean_group.setLayout(equiv_mean_layout)
+        equivalence_layout.addWidget(equiv_mean_group, 1)
+
+        # Two proportions
+        equiv_prop_group = QGroupBox("Proportions")
+        equiv_prop_form = QFormLayout()
+        self.equiv_prop_goal = QComboBox()
+        self.equiv_prop_goal.addItems(["Non-inferiority", "Equivalence (TOST)"])
+        self.equiv_prop_alpha = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.025, singleStep=0.005, toolTip="Level of each one-sided test")
+        self.equiv_prop_power = QDoubleSpinBox(decimals=2, minimum=0.50, maximum=0.99, value=0.80, singleStep=0.05)
+        self.equiv_prop_p1 = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.999, value=0.80, singleStep=0.01)
+        self.equiv_prop_p2 = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.999, value=0.80, singleStep=0.01)
+        self.equiv_prop_margin = QDoubleSpinBox(decimals=3, minimum=0.001, maximum=0.5, value=0.10, singleStep=0.01, toolTip="Margin for the difference p2 - p1 (equivalence: ± margin)")
+        self.equiv_prop_ratio = QDoubleSpinBox(decimals=2, minimum=0.1, maximum=10.0, value=1.0, singleStep=0.1, toolTip="Allocation ratio n2 / n1")
+
+        equiv_prop_form.addRow("Hypothesis:", self.equiv_prop_goal)
+        equiv_prop_form.addRow("Significance Level (α):", self.equiv_prop_alpha)
+        equiv_prop_form.addRow("Power (1-β):", self.equiv_prop_power)
+        equiv_prop_form.addRow("Reference Proportion (p1):", self.equiv_prop_p1)
+        equiv_prop_form.addRow("Test Proportion (p2):", self.equiv_prop_p2)
+        equiv_prop_form.addRow("Margin:", self.equiv_prop_margin)
+        equiv_prop_form.addRow("Allocation Ratio (n2/n1):", self.equiv_prop_ratio)
+
+        equiv_prop_calc_btn = QPushButton("Calculate")
+        equiv_prop_calc_btn.clicked.connect(self.calc_equiv_prop_sample)
+        self.equiv_prop_result = QLabel("Sample size: N/A")
+        self.equiv_prop_result.setObjectName("resultLabel")
+        self.equiv_prop_result.setAlignment(Qt.AlignCenter)
+        self.equiv_prop_result.setWordWrap(True)
+
+        equiv_prop_layout = QVBoxLayout()
+        equiv_prop_layout.addLayout(equiv_prop_form)
+        equiv_prop_layout.addWidget(equiv_prop_calc_btn, 0, Qt.AlignCenter)
+        equiv_prop_layout.addWidget(self.equiv_prop_result)
+        equiv_prop_layout.addStretch(1)
+        equiv_prop_group.setLayout(equiv_prop_layout)
+        equivalence_layout.addWidget(equiv_prop_group, 1)
+
+        self.tabs.addTab(equivalence_tab_widget, "Equivalence")
+
     # --- Helper methods to show/hide relevant inputs for Power Tab ---
     def update_power_level_inputs(self):
         test_type = self.power_level_test_type.currentText()
+        is_indep = test_type == "T-Test (Independent)"
         is_anova = "ANOVA" in test_type
         is_regr = "Regression" in test_type
         is_chi = "Chi-Square" in test_type
 
         self.power_level_groups.setVisible(is_anova)
-        self.sender().parent().layout().labelForField(self.power_level_groups).setVisible(is_anova) # Show/Hide label too
+        self._power_level_form.labelForField(self.power_level_groups).setVisible(is_anova) # Show/Hide label too
         self.power_level_predictors.setVisible(is_regr)
-        self.sender().parent().layout().labelForField(self.power_level_predictors).setVisible(is_regr)
+        self._power_level_form.labelForField(self.power_level_predictors).setVisible(is_regr)
         self.power_level_df.setVisible(is_chi)
-        self.sender().parent().layout().labelForField(self.power_level_df).setVisible(is_chi)
+        self._power_level_form.labelForField(self.power_level_df).setVisible(is_chi)
+        self.power_level_ratio.setVisible(is_indep)
+        self._power_level_form.labelForField(self.power_level_ratio).setVisible(is_indep)
 
     def update_power_effect_inputs(self):
         test_type = self.power_effect_test_type.currentText()
+        is_indep = test_type == "T-Test (Independent)"
         is_anova = "ANOVA" in test_type
         is_regr = "Regression" in test_type
         is_chi = "Chi-Square" in test_type
 
         self.power_effect_groups.setVisible(is_anova)
-        self.sender().parent().layout().labelForField(self.power_effect_groups).setVisible(is_anova)
+        self._power_effect_form.labelForField(self.power_effect_groups).setVisible(is_anova)
         self.power_effect_predictors.setVisible(is_regr)
-        self.sender().parent().layout().labelForField(self.power_effect_predictors).setVisible(is_regr)
+        self._power_effect_form.labelForField(self.power_effect_predictors).setVisible(is_regr)
         self.power_effect_df.setVisible(is_chi)
-        self.sender().parent().layout().labelForField(self.power_effect_df).setVisible(is_chi)
-
-
-    # --- Placeholder Calculation Methods ---
-    # You need to replace the logic within these methods with actual formulas.
-    # Consider using libraries like statsmodels.stats.power
+        self._power_effect_form.labelForField(self.power_effect_df).setVisible(is_chi)
+        self.power_effect_ratio.setVisible(is_indep)
+        self._power_effect_form.labelForField(self.power_effect_ratio).setVisible(is_indep)
+
+    def update_factorial_inputs(self):
+        factors = self.factorial_factors.value()
+        for i, levels in enumerate(self.factorial_levels):
+            levels.setVisible(i < factors)
+            self._factorial_form.labelForField(levels).setVisible(i < factors)
+
+    def update_grid_inputs(self):
+        test_type = self.grid_test_type.currentText()
+        layout = self._grid_form
+        for widget, visible in ((self.grid_groups, "ANOVA" in test_type),
+                                (self.grid_predictors, "Regression" in test_type),
+                                (self.grid_df, "Chi-Square" in test_type)):
+            widget.setVisible(visible)
+            layout.labelForField(widget).setVisible(visible)
+
+    def update_sequential_inputs(self):
+        test_type = self.sequential_test_type.currentText()
+        layout = self._sequential_form
+        for widget, visible in ((self.sequential_groups, "ANOVA" in test_type),
+                                (self.sequential_predictors, "Regression" in test_type),
+                                (self.sequential_df, "Chi-Square" in test_type)):
+            widget.setVisible(visible)
+            layout.labelForField(widget).setVisible(visible)
+
+    def update_curve_inputs(self):
+        test_type = self.curve_test_type.currentText()
+        layout = self._curve_form
+        for widget, visible in ((self.curve_groups, "ANOVA" in test_type),
+                                (self.curve_predictors, "Regression" in test_type),
+                                (self.curve_df, "Chi-Square" in test_type)):
+            widget.setVisible(visible)
+            layout.labelForField(widget).setVisible(visible)
+
+
+    # --- Live recalculation ---
+    # Every panel is identified by the prefix of its widgets (indep_t_alpha,
+    # indep_t_result, ...). Changing any of its inputs restarts a short debounce
+    # timer; when it fires, _<panel>_job() reads the inputs on the GUI thread and
+    # returns a function that is run on the thread pool. Only one job per panel
+    # runs at a time, newer inputs replace a job still waiting, and results that
+    # arrive after the inputs changed again are dropped.
+
+    def setup_live_updates(self):
+        self.thread_pool = QThreadPool.globalInstance()
+        self._generation = {}  # panel -> number of the latest input set
+        self._running = set()  # panels with a job on the thread pool
+        self._waiting = {}     # panel -> (generation, job) queued behind the running one
+        self._debounce = {}
+        for panel in CALCULATION_PANELS + SIMULATION_PANELS:
+            self._generation[panel] = 0
+            timer = QTimer(self, singleShot=True, interval=LIVE_DEBOUNCE_MS)
+            timer.timeout.connect(lambda panel=panel: self.run_calculation(panel))
+            self._debounce[panel] = timer
+            if panel in SIMULATION_PANELS:
+                continue # Button only
+            for name, value in vars(self).items():
+                if not name.startswith(panel + "_"):
+                    continue
+                for widget in (value if isinstance(value, list) else [value]): # e.g. factorial_levels
+                    if isinstance(widget, (QSpinBox, QDoubleSpinBox)):
+                        widget.valueChanged.connect(lambda _value, panel=panel: self.schedule_calculation(panel))
+                    elif isinstance(widget, QComboBox):
+                        widget.currentIndexChanged.connect(lambda _index, panel=panel: self.schedule_calculation(panel))
+                    elif isinstance(widget, QLineEdit):
+                        widget.textChanged.connect(lambda _text, panel=panel: self.schedule_calculation(panel))
+
+    def schedule_calculation(self, panel):
+        """Input changed: invalidate results in flight and (re)start the debounce timer."""
+        self._generation[panel] += 1
+        self._debounce[panel].start()
+
+    def run_calculation(self, panel):
+        """Dispatch the panel's calculation now (also used by the Calculate buttons)."""
+        self._debounce[panel].stop()
+        generation = self._generation[panel]
+        job = getattr(self, f"_{panel}_job")()
+        if panel in self._running:
+            self._waiting[panel] = (generation, job) # Replaces any older waiting job
+        else:
+            self._start_job(panel, generation, job)
+
+    def _start_job(self, panel, generation, job):
+        self._running.add(panel)
+        task = CalculationTask(panel, generation, job)
+        task.signals.finished.connect(self._show_calculation_result)
+        self.thread_pool.start(task)
+
+    def _show_calculation_result(self, panel, generation, result):
+        self._running.discard(panel)
+        if panel in self._waiting:
+            self._start_job(panel, *self._waiting.pop(panel))
+        if generation != self._generation[panel]: # The inputs changed meanwhile
+            return
+        with instrument.span(f"gui.show.{panel}"): # GUI thread: slow here means a frozen window
+            if isinstance(result, str):
+                getattr(self, f"{panel}_result").setText(result)
+            else:
+                getattr(self, f"_show_{panel}_result")(result)
+
+    def wait_for_calculations(self, timeout_ms=10000):
+        """Block until every dispatched calculation has been shown (for scripts and --profile-startup)."""
+        deadline = time.perf_counter() + timeout_ms / 1000
+        while (self._running or any(t.isActive() for t in self._debounce.values())) and time.perf_counter() < deadline:
+            QApplication.processEvents(QEventLoop.AllEvents, 10)
+            self.thread_pool.waitForDone(5)
+        QApplication.processEvents()
+
+    # --- Diagnostics ---
+    # View > Diagnostics (Ctrl+Shift+D) opens a dock listing every calculation
+    # span recorded by sample_size.instrument: calls, wall time, solver
+    # iterations and cache hits. Recording is only on while the dock is open
+    # (or when started with --trace), so it costs nothing otherwise.
+
+    DIAGNOSTICS_COLUMNS = ("Calculation", "Calls", "Mean ms", "Max ms", "Last ms",
+                           "Solver iterations", "Cache hits", "Cache misses", "Table hits")
+
+    def create_diagnostics_panel(self):
+        self.diagnostics_dock = QDockWidget("Diagnostics", self)
+        self.diagnostics_dock.setObjectName("diagnosticsDock")
+        panel = QWidget()
+        layout = QVBoxLayout(panel)
+        self.diagnostics_table = QTableWidget(0, len(self.DIAGNOSTICS_COLUMNS))
+        self.diagnostics_table.setHorizontalHeaderLabels(self.DIAGNOSTICS_COLUMNS)
+        self.diagnostics_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.diagnostics_table.verticalHeader().setVisible(False)
+        self.diagnostics_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.diagnostics_summary = QLabel("Recording starts when this panel opens.")
+        buttons = QHBoxLayout()
+        save_btn = QPushButton("Save Chrome Trace…")
+        save_btn.clicked.connect(self.save_trace)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear_diagnostics)
+        buttons.addWidget(save_btn)
+        buttons.addWidget(clear_btn)
+        buttons.addStretch()
+        layout.addWidget(self.diagnostics_table)
+        layout.addWidget(self.diagnostics_summary)
+        layout.addLayout(buttons)
+        self.diagnostics_dock.setWidget(panel)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.diagnostics_dock)
+        self.diagnostics_dock.hide()
+
+        toggle = self.diagnostics_dock.toggleViewAction()
+        toggle.setShortcut("Ctrl+Shift+D")
+        self.menuBar().addMenu("&View").addAction(toggle)
+        self.diagnostics_dock.visibilityChanged.connect(self._diagnostics_visibility_changed)
+        self._diagnostics_timer = QTimer(self, interval=DIAGNOSTICS_REFRESH_MS)
+        self._diagnostics_timer.timeout.connect(self.refresh_diagnostics)
+        self.trace_path = None # Set by --trace: keep recording whether or not the panel is open
+
+    def _diagnostics_visibility_changed(self, visible):
+        if visible:
+            instrument.enable()
+            self.refresh_diagnostics()
+            self._diagnostics_timer.start()
+        else:
+            self._diagnostics_timer.stop()
+            if self.trace_path is None:
+                instrument.disable()
+
+    def refresh_diagnostics(self):
+        stats = instrument.summary()
+        table = self.diagnostics_table
+        table.setRowCount(len(stats))
+        for row, (name, entry) in enumerate(stats.items()):
+            values = (name, entry["calls"], entry["mean_s"] * 1000, entry["max_s"] * 1000, entry["last_s"] * 1000,
+                      entry.get("solver_iterations", 0), entry.get("cache_hits", 0), entry.get("cache_misses", 0),
+                      entry.get("table_hits", 0))
+            for column, value in enumerate(values):
+                text = f"{value:.2f}" if isinstance(value, float) else str(value)
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+        spans = sum(entry["calls"] for entry in stats.values())
+        self.diagnostics_summary.setText(f"{spans:,} spans recorded" + ("" if instrument.enabled else " (recording off)"))
+
+    def clear_diagnostics(self):
+        instrument.clear()
+        self.refresh_diagnostics()
+
+    def save_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Chrome Trace", "sample_size_trace.json", "JSON (*.json)")
+        if path:
+            spans = instrument.write_chrome_trace(path)
+            self.diagnostics_summary.setText(f"Saved {spans:,} spans to {path} (open in chrome://tracing or Perfetto)")
+
+    # --- Calculation Methods ---
+    # The calc_* slots only dispatch; each _<panel>_job() reads the inputs on the
+    # GUI thread and returns a function computing the result text on a worker
+    # thread. The formulas live in sample_size.engine so they can be used without
+    # a QApplication. The engine is imported inside the jobs so numpy/scipy are
+    # not loaded before the window opens (start_warm_up() preloads them in the
+    # background).
 
     def _get_z_scores(self, alpha, power, tails="Two-tailed"):
         """Helper to get Z scores for alpha and beta."""
-        alpha_adjusted = alpha / 2 if tails == "Two-tailed" else alpha
-        z_alpha = norm.ppf(1 - alpha_adjusted)
-        z_beta = norm.ppf(power)
-        return z_alpha, z_beta
+        from sample_size import engine
+        z_alpha, z_beta = engine.get_z_scores(alpha, power, tails)
+        return float(z_alpha), float(z_beta)
 
     def calc_indep_t_sample(self):
-        try:
-            alpha = self.indep_t_alpha.value()
-            power = self.indep_t_power.value()
-            d = self.indep_t_effect.value()
-            tails = "Two-tailed" # Assuming two-tailed for t-tests unless specified
-
-            if d == 0:
-                self.indep_t_result.setText("Effect size cannot be zero.")
-                return
+        self.run_calculation("indep_t")
 
-            z_alpha, z_beta = self._get_z_scores(alpha, power, tails)
-            n = 2 * ((z_alpha + z_beta) / d) ** 2
-            n_rounded = math.ceil(n) # Round up to nearest integer
+    def _indep_t_job(self):
+        alpha = self.indep_t_alpha.value()
+        power = self.indep_t_power.value()
+        d = self.indep_t_effect.value()
+        ratio = self.indep_t_ratio.value()
+        tails = "Two-tailed" # Assuming two-tailed for t-tests unless specified
 
-            self.indep_t_result.setText(f"Sample size per group: {n_rounded} (Total N = {n_rounded * 2})")
-        except Exception as e:
-            self.indep_t_result.setText(f"Error: {e}")
+        def compute():
+            from sample_size import engine
+            if d == 0:
+                return "Effect size cannot be zero."
+            n_rounded = int(engine.indep_t_sample(alpha, power, d, tails, ratio))
+            if ratio == 1:
+                return f"Sample size per group: {n_rounded} (Total N = {n_rounded * 2})"
+            n2 = int(engine.second_group_n(n_rounded, ratio))
+            return f"Group 1: {n_rounded}, Group 2: {n2} (Total N = {n_rounded + n2})"
+        return compute
+
+    def update_allocation_inputs(self):
+        by_budget = self.allocation_goal.currentIndex() == 1
+        self.allocation_power.setVisible(not by_budget)
+        self._allocation_form.labelForField(self.allocation_power).setVisible(not by_budget)
+        self.allocation_budget.setVisible(by_budget)
+        self._allocation_form.labelForField(self.allocation_budget).setVisible(by_budget)
+
+    def calc_allocation(self):
+        self.run_calculation("allocation")
+
+    def _allocation_job(self):
+        by_budget = self.allocation_goal.currentIndex() == 1
+        alpha = self.allocation_alpha.value()
+        d = self.allocation_effect.value()
+        cost1 = self.allocation_cost1.value()
+        cost2 = self.allocation_cost2.value()
+        power = self.allocation_power.value()
+        budget = self.allocation_budget.value()
+
+        def compute():
+            from sample_size import allocation
+            if by_budget:
+                best = allocation.max_power(alpha, budget, d, cost1, cost2)
+            else:
+                best = allocation.min_cost(alpha, power, d, cost1, cost2)
+            if best.n1 != best.n1:
+                return "The budget cannot buy 2 subjects per group" if by_budget else "Power not reachable"
+            return (f"Group 1: {int(best.n1)}, Group 2: {int(best.n2)} (ratio {float(best.ratio):.2f})\n"
+                    f"Cost: {float(best.cost):g}, Power: {float(best.power):.3f}")
+        return compute
 
     def calc_paired_t_sample(self):
-        try:
-            alpha = self.paired_t_alpha.value()
-            power = self.paired_t_power.value()
-            dz = self.paired_t_effect.value()
-            tails = "Two-tailed"
+        self.run_calculation("paired_t")
 
-            if dz == 0:
-                self.paired_t_result.setText("Effect size cannot be zero.")
-                return
+    def _paired_t_job(self):
+        alpha = self.paired_t_alpha.value()
+        power = self.paired_t_power.value()
+        dz = self.paired_t_effect.value()
+        tails = "Two-tailed"
 
-            z_alpha, z_beta = self._get_z_scores(alpha, power, tails)
-            n = ((z_alpha + z_beta) / dz) ** 2
-            n_rounded = math.ceil(n) + 1 # Common adjustment for t-distribution approximation
-
-            self.paired_t_result.setText(f"Number of pairs: {n_rounded}")
-        except Exception as e:
-            self.paired_t_result.setText(f"Error: {e}")
+        def compute():
+            from sample_size import engine
+            if dz == 0:
+                return "Effect size cannot be zero."
+            n_rounded = int(engine.paired_t_sample(alpha, power, dz, tails))
+            return f"Number of pairs: {n_rounded}"
+        return compute
 
     def calc_one_t_sample(self):
-        try:
-            alpha = self.one_t_alpha.value()
-            power = self.one_t_power.value()
-            d = self.one_t_effect.value()
-            tails = "Two-tailed"
+        self.run_calculation("one_t")
+
+    def _one_t_job(self):
+        alpha = self.one_t_alpha.value()
+        power = self.one_t_power.value()
+        d = self.one_t_effect.value()
+        tails = "Two-tailed"
 
+        def compute():
+            from sample_size import engine
             if d == 0:
-                self.one_t_result.setText("Effect size cannot be zero.")
-                return
+                return "Effect size cannot be zero."
+            n_rounded = int(engine.one_t_sample(alpha, power, d, tails))
+            return f"Sample size: {n_rounded}"
+        return compute
 
-            z_alpha, z_beta = self._get_z_scores(alpha, power, tails)
-            n = ((z_alpha + z_beta) / d) ** 2
-            n_rounded = math.ceil(n) + 1 # Common adjustment
+    def calc_oneway_sample(self):
+        self.run_calculation("oneway")
 
-            self.one_t_result.setText(f"Sample size: {n_rounded}")
-        except Exception as e:
-            self.one_t_result.setText(f"Error: {e}")
+    def _oneway_job(self):
+        alpha = self.oneway_alpha.value()
+        power = self.oneway_power.value()
+        f_effect = self.oneway_effect.value()
+        groups = self.oneway_groups.value()
 
-    def calc_oneway_sample(self):
-        # Placeholder: ANOVA calculation is more complex, often uses non-central F distribution
-        # Consider using statsmodels.stats.power.FTestAnovaPower().solve_power
-        try:
-            alpha = self.oneway_alpha.value()
-            power = self.oneway_power.value()
-            f_effect = self.oneway_effect.value()
-            groups = self.oneway_groups.value()
-            # This is a very rough approximation, replace with proper calculation
-            from statsmodels.stats.power import FTestAnovaPower
-            power_analyzer = FTestAnovaPower()
-            n_per_group = power_analyzer.solve_power(effect_size=f_effect, nobs=None, alpha=alpha, power=power, k_groups=groups)
-            n_rounded = math.ceil(n_per_group)
-            self.oneway_result.setText(f"Sample size per group: {n_rounded} (Total N = {n_rounded * groups})")
-            # self.oneway_result.setText("Calculation pending (use statsmodels)")
-        except Exception as e:
-            self.oneway_result.setText(f"Error: {e} (Requires statsmodels)")
+        def compute():
+            from sample_size import engine
+            n_rounded = int(engine.oneway_sample(alpha, power, f_effect, groups))
+            return f"Sample size per group: {n_rounded} (Total N = {n_rounded * groups})"
+        return compute
 
 
     def calc_factorial_sample(self):
-        # Placeholder: Factorial ANOVA is complex. Requires specific effect (main/interaction), df.
-        try:
-            alpha = self.factorial_alpha.value()
-            power = self.factorial_power.value()
-            f_effect = self.factorial_effect.value()
-            num_df = self.factorial_num_df.value()
-             # Need denominator df (depends on total N and design) - calculation is iterative or uses library
-            self.factorial_result.setText("Complex calc - Total N: Pending")
-        except Exception as e:
-            self.factorial_result.setText(f"Error: {e}")
+        self.run_calculation("factorial")
+
+    def _factorial_job(self):
+        alpha = self.factorial_alpha.value()
+        power = self.factorial_power.value()
+        f_effect = self.factorial_effect.value()
+        levels = tuple(box.value() for box in self.factorial_levels[:self.factorial_factors.value()])
+        max_order = {0: None, 1: 1, 2: 2}[self.factorial_effects.currentIndex()]
+
+        def compute():
+            from sample_size import factorial
+            result = factorial.sample_size(alpha, power, f_effect, levels, max_order)
+            if result.n_per_cell != result.n_per_cell:
+                return f"Effect {result.limiting.name} cannot reach the target power."
+            n_per_cell = int(result.n_per_cell)
+            design = "×".join(str(k) for k in levels)
+            count = len(result.effects)
+            return (f"Total sample size: {int(result.total_n)} ({n_per_cell} per cell, {design} design)\n"
+                    f"Limited by {result.limiting.name} (df = {result.limiting.df_num}), "
+                    f"{count} effect{'s' if count > 1 else ''} powered")
+        return compute
 
     def calc_pearson_sample(self):
-        try:
-            alpha = self.pearson_alpha.value()
-            power = self.pearson_power.value()
-            r = self.pearson_effect.value()
-            tails = self.pearson_tails.currentText()
-
-            if abs(r) >= 1:
-                self.pearson_result.setText("Correlation must be between -1 and 1.")
-                return
-
-            z_alpha, z_beta = self._get_z_scores(alpha, power, tails)
+        self.run_calculation("pearson")
 
-            # Fisher's Z transformation
-            z_r = 0.5 * math.log((1 + r) / (1 - r))
-            if z_r == 0:
-                 self.pearson_result.setText("Effect size (r) leads to zero z_r.")
-                 return
-                 
-            n = ((z_alpha + z_beta) / z_r) ** 2 + 3
-            n_rounded = math.ceil(n)
+    def _pearson_job(self):
+        alpha = self.pearson_alpha.value()
+        power = self.pearson_power.value()
+        r = self.pearson_effect.value()
+        tails = self.pearson_tails.currentText()
 
-            self.pearson_result.setText(f"Sample size: {n_rounded}")
-        except Exception as e:
-            self.pearson_result.setText(f"Error: {e}")
+        def compute():
+            from sample_size import engine
+            if abs(r) >= 1:
+                return "Correlation must be between -1 and 1."
+            if r == 0:
+                return "Effect size (r) leads to zero z_r."
+            n_rounded = int(engine.pearson_sample(alpha, power, r, tails))
+            return f"Sample size: {n_rounded}"
+        return compute
 
     def calc_linear_reg_sample(self):
-        # Placeholder: Uses non-central F distribution.
-        # Consider statsmodels.stats.power.FTestPower().solve_power for R² test
-        try:
-            alpha = self.linear_reg_alpha.value()
-            power = self.linear_reg_power.value()
-            f2 = self.linear_reg_effect.value()
-            predictors = self.linear_reg_predictors.value() # u (numerator df)
-
-            # This requires iteration or specialized function (like G*Power or statsmodels)
-            # Rough estimate using formula L = (z_alpha + z_beta)^2 / f2 (noncentrality param)
-            # N approx = L + u + 1
-            
-            # Using statsmodels (simpler for R^2 test)
-            # Need to relate f^2 to R^2: R^2 = f^2 / (1 + f^2)
-            r2 = f2 / (1.0 + f2)
-            
-            # We need to calculate for the *increase* in R2 due to predictors of interest
-            # Assuming f2 represents the effect for *all* predictors vs intercept-only model.
-            # This assumes test of R2 = 0, num_df (u) = predictors
-            
-            # Placeholder using simplified approach (less accurate)
-            z_alpha, z_beta = self._get_z_scores(alpha, power, "Two-tailed") # F-test is one-tailed on R2, but ppf uses cumulative prob
-            L = ((z_alpha + z_beta)**2) / f2 # Approximate non-centrality parameter lambda
-            n = L + predictors + 1
-            n_rounded = math.ceil(n)
-
-            self.linear_reg_result.setText(f"Total sample size (approx): {n_rounded}")
-            # self.linear_reg_result.setText("Calc pending (use statsmodels FTestPower)")
+        self.run_calculation("linear_reg")
 
-        except Exception as e:
-            self.linear_reg_result.setText(f"Error: {e}")
+    def _linear_reg_job(self):
+        # Exact noncentral F with lambda = f2 * N, as in the power analyses
+        alpha = self.linear_reg_alpha.value()
+        power = self.linear_reg_power.value()
+        f2 = self.linear_reg_effect.value()
+        predictors = self.linear_reg_predictors.value() # u (numerator df)
 
-    def calc_logistic_reg_sample(self):
-        # Placeholder: Various formulas exist (e.g., Hsieh et al., 1998). Very complex.
-        try:
-            alpha = self.logistic_reg_alpha.value()
-            power = self.logistic_reg_power.value()
-            odds_ratio = self.logistic_reg_odds_ratio.value()
-            p1 = self.logistic_reg_p1.value()
-            r2_other = self.logistic_reg_r2_other.value()
+        def compute():
+            from sample_size import engine
+            n_rounded = int(engine.linear_reg_sample(alpha, power, f2, predictors))
+            return f"Total sample size: {n_rounded}"
+        return compute
 
+    def calc_logistic_reg_sample(self):
+        self.run_calculation("logistic_reg")
+
+    def _logistic_reg_job(self):
+        # Hsieh et al. (1998) formula for a continuous predictor X1 ~ Normal(0,1)
+        alpha = self.logistic_reg_alpha.value()
+        power = self.logistic_reg_power.value()
+        odds_ratio = self.logistic_reg_odds_ratio.value()
+        p1 = self.logistic_reg_p1.value()
+        r2_other = self.logistic_reg_r2_other.value()
+
+        def compute():
+            from sample_size import engine
             if odds_ratio <= 1.0:
-                 self.logistic_reg_result.setText("Odds Ratio must be > 1.")
-                 return
+                return "Odds Ratio must be > 1."
             if not (0 < p1 < 1):
-                 self.logistic_reg_result.setText("P(Y=1) must be between 0 and 1.")
-                 return
+                return "P(Y=1) must be between 0 and 1."
             if not (0 <= r2_other < 1):
-                 self.logistic_reg_result.setText("R² must be between 0 and < 1.")
-                 return
+                return "R² must be between 0 and < 1."
+            n_rounded = int(engine.logistic_reg_sample(alpha, power, odds_ratio, p1, r2_other))
+            return f"Sample size (approx): {n_rounded}"
+        return compute
+
+    def calc_linear_sim_power(self):
+        self.run_calculation("linear_sim")
+
+    def _linear_sim_job(self):
+        alpha = self.linear_reg_alpha.value()
+        power = self.linear_reg_power.value()
+        f2 = self.linear_reg_effect.value()
+        predictors = self.linear_reg_predictors.value()
+        n = self.linear_sim_n.value()
+        distribution = self.linear_sim_distribution.currentText()
+        seed = self.linear_sim_seed.value() or None
+
+        def compute():
+            from sample_size import engine, simulation
+            n_sim = n or int(engine.linear_reg_sample(alpha, power, f2, predictors))
+            try:
+                result = simulation.linear_reg_power(alpha, n_sim, f2, predictors, distribution, seed=seed)
+            except ValueError as e:
+                return str(e)
+            return self._simulation_text(n_sim, result)
+        return compute
+
+    def calc_logistic_sim_power(self):
+        self.run_calculation("logistic_sim")
+
+    def _logistic_sim_job(self):
+        alpha = self.logistic_reg_alpha.value()
+        power = self.logistic_reg_power.value()
+        odds_ratio = self.logistic_reg_odds_ratio.value()
+        p1 = self.logistic_reg_p1.value()
+        r2_other = self.logistic_reg_r2_other.value()
+        n = self.logistic_sim_n.value()
+        distribution = self.logistic_sim_distribution.currentText()
+        seed = self.logistic_sim_seed.value() or None
+
+        def compute():
+            from sample_size import engine, simulation
+            n_sim = n or int(engine.logistic_reg_sample(alpha, power, odds_ratio, p1, r2_other))
+            try:
+                result = simulation.logistic_reg_power(alpha, n_sim, odds_ratio, p1, r2_other, distribution, seed=seed)
+            except ValueError as e:
+                return str(e)
+            return self._simulation_text(n_sim, result)
+        return compute
+
+    def calc_linear_search_sample(self):
+        self.run_calculation("linear_search")
+
+    def _linear_search_job(self):
+        alpha = self.linear_reg_alpha.value()
+        power = self.linear_reg_power.value()
+        f2 = self.linear_reg_effect.value()
+        predictors = self.linear_reg_predictors.value()
+        distribution = self.linear_sim_distribution.currentText()
+        seed = self.linear_sim_seed.value() or None
+
+        def compute():
+            from sample_size import simulation
+            result = simulation.linear_reg_sample(alpha, power, f2, predictors, distribution, seed=seed)
+            return self._search_text(result)
+        return compute
+
+    def calc_logistic_search_sample(self):
+        self.run_calculation("logistic_search")
+
+    def _logistic_search_job(self):
+        alpha = self.logistic_reg_alpha.value()
+        power = self.logistic_reg_power.value()
+        odds_ratio = self.logistic_reg_odds_ratio.value()
+        p1 = self.logistic_reg_p1.value()
+        r2_other = self.logistic_reg_r2_other.value()
+        distribution = self.logistic_sim_distribution.currentText()
+        seed = self.logistic_sim_seed.value() or None
+
+        def compute():
+            from sample_size import simulation
+            try:
+                result = simulation.logistic_reg_sample(alpha, power, odds_ratio, p1, r2_other, distribution, seed=seed)
+            except ValueError as e:
+                return str(e)
+            return self._search_text(result)
+        return compute
+
+    @staticmethod
+    def _search_text(result):
+        found = (f"Simulated sample size: {result.n} (95% CI {result.n_low}–{result.n_high})"
+                 if result.n == result.n else "Simulated power does not reach the target (N out of reach)")
+        return (f"{found}\n"
+                f"{result.simulations:,} simulations at {len(result.points)} N values in {result.seconds:.2f} s")
+
+    @staticmethod
+    def _simulation_text(n, result):
+        return (f"Simulated power at N = {n}: {result.power:.3f} (95% CI {result.ci_low:.3f}–{result.ci_high:.3f})\n"
+                f"{result.replications:,} replications in {result.seconds:.2f} s")
 
-            # Example using Hsieh formula for continuous predictor X1
-            # Assumes X1 ~ Normal(0,1)
-            z_alpha, z_beta = self._get_z_scores(alpha, power, "Two-tailed")
-            beta1 = math.log(odds_ratio) # Log odds ratio
-            n = ((z_alpha + z_beta)**2) / (p1 * (1 - p1) * beta1**2 * (1 - r2_other))
-            n_rounded = math.ceil(n)
+    def calc_chi_ind_sample(self):
+        self.run_calculation("chi_ind")
 
-            self.logistic_reg_result.setText(f"Sample size (approx): {n_rounded}")
-        except Exception as e:
-            self.logistic_reg_result.setText(f"Error: {e}")
+    def _chi_ind_job(self):
+        alpha = self.chi_ind_alpha.value()
+        power = self.chi_ind_power.value()
+        w = self.chi_ind_effect.value() # Cohen's w
+        df = self.chi_ind_df.value()
 
-    def calc_chi_ind_sample(self):
-        # Placeholder: Uses non-central Chi-square distribution.
-        # Consider statsmodels.stats.power.ChiSquarePower().solve_power
-        try:
-            alpha = self.chi_ind_alpha.value()
-            power = self.chi_ind_power.value()
-            w = self.chi_ind_effect.value() # Cohen's w
-            df = self.chi_ind_df.value()
-
-            from statsmodels.stats.power import ChisqTestPower
-            power_analyzer = ChisqTestPower()
-            n = power_analyzer.solve_power(effect_size=w, nobs=None, alpha=alpha, power=power, ddf=df)
-            n_rounded = math.ceil(n)
-
-            self.chi_ind_result.setText(f"Total sample size: {n_rounded}")
-            # self.chi_ind_result.setText("Calculation pending (use statsmodels)")
-        except Exception as e:
-            self.chi_ind_result.setText(f"Error: {e} (Requires statsmodels)")
+        def compute():
+            from sample_size import engine
+            n_rounded = int(engine.chi_ind_sample(alpha, power, w, df))
+            return f"Total sample size: {n_rounded}"
+        return compute
 
     def calc_achieved_power(self):
-        # Placeholder: Reverse calculation using statsmodels or similar
-        try:
-            test_type = self.power_level_test_type.currentText()
-            alpha = self.power_level_alpha.value()
-            n = self.power_level_n.value()
-            effect = self.power_level_effect.value()
-            # Get specific inputs based on test type
-            groups = self.power_level_groups.value()
-            predictors = self.power_level_predictors.value()
-            df = self.power_level_df.value()
-
-            # Call appropriate statsmodels function based on test_type
-            # Example for Chi-Square:
-            if "Chi-Square" in test_type:
-                 from statsmodels.stats.power import ChisqTestPower
-                 power_analyzer = ChisqTestPower()
-                 achieved_power = power_analyzer.solve_power(effect_size=effect, nobs=n, alpha=alpha, power=None, ddf=df)
-                 self.power_level_result.setText(f"Achieved Power (1-β): {achieved_power:.3f}")
-            elif "T-Test (Independent)" in test_type:
-                 from statsmodels.stats.power import TTestIndPower
-                 power_analyzer = TTestIndPower()
-                 # Note: nobs1 is sample size in *one* group
-                 achieved_power = power_analyzer.solve_power(effect_size=effect, nobs1=n, alpha=alpha, power=None, ratio=1.0, alternative='two-sided')
-                 self.power_level_result.setText(f"Achieved Power (1-β): {achieved_power:.3f}")
-            # Add other cases for T-Paired, ANOVA, Corr, Regression
-            else:
-                self.power_level_result.setText("Power calc pending for this test type")
-
-        except Exception as e:
-            self.power_level_result.setText(f"Error: {e} (Requires statsmodels)")
+        self.run_calculation("power_level")
+
+    def _selected_design(self, test_type, groups, predictors, df, ratio=None):
+        """Value of the design input the test type needs (the one update_*_inputs shows), else None."""
+        if test_type == "T-Test (Independent)" and ratio is not None:
+            return ratio.value()
+        if "ANOVA" in test_type:
+            return groups.value()
+        if "Regression" in test_type:
+            return predictors.value()
+        if "Chi-Square" in test_type:
+            return df.value()
+        return None
+
+    def _power_level_job(self):
+        test_type = self.power_level_test_type.currentText()
+        alpha = self.power_level_alpha.value()
+        n = self.power_level_n.value() # Total N, N per group or N pairs (see tooltip)
+        effect = self.power_level_effect.value()
+        design = self._selected_design(test_type, self.power_level_groups, self.power_level_predictors,
+                                       self.power_level_df, self.power_level_ratio)
+        prior_sd = self.power_level_prior_sd.value()
+        method = self.power_level_prior_method.currentText()
+
+        def compute():
+            from sample_size import assurance, solver
+            if prior_sd > 0:
+                result = assurance.assurance(test_type, alpha, n, effect, prior_sd, design, method)
+                if result.assurance != result.assurance:
+                    return "Assurance not defined for these inputs"
+                return (f"Assurance (prior-averaged power): {float(result.assurance):.3f}\n"
+                        f"Power at the prior mean: {float(result.power):.3f}")
+            achieved_power = float(solver.power(test_type, alpha, n, effect, design))
+            if achieved_power != achieved_power:
+                return "Power not defined for these inputs"
+            return f"Achieved Power (1-β): {achieved_power:.3f}"
+        return compute
 
     def calc_mdes(self):
-        # Placeholder: Reverse calculation using statsmodels or similar
+        self.run_calculation("power_effect")
+
+    def _power_effect_job(self):
+        test_type = self.power_effect_test_type.currentText()
+        alpha = self.power_effect_alpha.value()
+        power = self.power_effect_power.value()
+        n = self.power_effect_n.value()
+        design = self._selected_design(test_type, self.power_effect_groups, self.power_effect_predictors,
+                                       self.power_effect_df, self.power_effect_ratio)
+
+        def compute():
+            from sample_size import solver
+            mdes = float(solver.mdes(test_type, alpha, power, n, design))
+            symbol = solver.TEST_TYPES[test_type].effect_symbol
+            if mdes != mdes:
+                return f"No detectable effect ({symbol}) for these inputs"
+            return f"Min Detectable Effect ({symbol}): {mdes:.3f}"
+        return compute
+
+    def calc_power_curves(self):
+        self.run_calculation("curve")
+
+    def _curve_job(self):
+        test_type = self.curve_test_type.currentText()
+        alpha = self.curve_alpha.value()
+        n = self.curve_n.value()
+        effect = self.curve_effect.value()
+        design = self._selected_design(test_type, self.curve_groups, self.curve_predictors, self.curve_df)
+        n_max = self.curve_n_max.value()
+        effect_max = self.curve_effect_max.value()
+        points = self.curve_points.value()
+        target = self.curve_target.value()
+        # Only the curves whose inputs changed are recomputed: a new N just moves
+        # the marker on the power-vs-N curve, a new effect the one on the other plot
+        n_key = (test_type, alpha, effect, design, n_max, points)
+        effect_key = (test_type, alpha, n, design, effect_max, points)
+        shown = dict(self._curve_keys)
+
+        def compute():
+            from sample_size import curves
+            result = {"n": None, "effect": None, "n_key": n_key, "effect_key": effect_key,
+                      "test_type": test_type, "point": (n, effect), "target": target}
+            if n_key != shown["n"]:
+                result["n"] = curves.power_vs_n(test_type, alpha, effect, n_max, points, design)
+            if effect_key != shown["effect"]:
+                result["effect"] = curves.power_vs_effect(test_type, alpha, n, effect_max, points, design)
+            result["power"] = float(curves.power(test_type, alpha, n, effect, design))
+            return result
+        return compute
+
+    def calc_grid(self):
+        self.run_calculation("grid")
+
+    def _grid_job(self):
+        test_type = self.grid_test_type.currentText()
+        design = self._selected_design(test_type, self.grid_groups, self.grid_predictors, self.grid_df)
+        ranges = {name: tuple(getattr(self, f"grid_{name}_{part}").value() for part in ("start", "stop", "step"))
+                  for name in ("alpha", "power", "effect")}
+        if self._grid_explorer is None:
+            from sample_size.grid import GridExplorer
+            self._grid_explorer = GridExplorer()
+        explorer = self._grid_explorer # Used by one job at a time (one job per panel)
+
+        def compute():
+            from sample_size import grid
+            try:
+                axes = {name: grid.axis(*spec) for name, spec in ranges.items()}
+                return explorer.compute(test_type, axes["alpha"], axes["power"], axes["effect"], design)
+            except ValueError as e:
+                return str(e)
+        return compute
+
+    def _show_grid_result(self, result):
+        from sample_size import solver
+        self._grid = result
+        spec = solver.TEST_TYPES[result.test_type]
+        cells = result.n.size
+        self.grid_result.setText(f"{spec.n_label} for {cells:,} designs "
+                                 f"({result.computed:,} new, the rest reused) in {result.seconds * 1000:.0f} ms")
+        shown = self.heatmap_alpha.currentText()
+        labels = [f"{a:g}" for a in result.alpha]
+        self.heatmap_alpha.blockSignals(True)
+        self.heatmap_alpha.clear()
+        self.heatmap_alpha.addItems(labels)
+        self.heatmap_alpha.setCurrentIndex(labels.index(shown) if shown in labels else 0)
+        self.heatmap_alpha.blockSignals(False)
+        self.show_grid_slice()
+
+    def show_grid_slice(self):
+        """Show the heatmap for the selected alpha (no recalculation)."""
+        result = self._grid
+        index = self.heatmap_alpha.currentIndex()
+        if result is None or index < 0:
+            return
+        from sample_size import solver
+        symbol = solver.TEST_TYPES[result.test_type].effect_symbol
+        self.heatmap_model.set_slice(result.n[index].T, [f"{symbol} = {e:g}" for e in result.effect],
+                                     [f"{p:g}" for p in result.power])
+
+    def calc_sequential_sample(self):
+        self.run_calculation("sequential")
+
+    def _sequential_job(self):
+        test_type = self.sequential_test_type.currentText()
+        alpha = self.sequential_alpha.value()
+        power = self.sequential_power.value()
+        effect = self.sequential_effect.value()
+        design = self._selected_design(test_type, self.sequential_groups, self.sequential_predictors,
+                                       self.sequential_df)
+        looks = self.sequential_looks.value()
+        boundary = self.sequential_boundary.currentText()
+        sides = 1 if self.sequential_sides.currentText() == "One-sided" else 2
+
+        def compute():
+            from sample_size import sequential
+            try:
+                result = sequential.sample_size(test_type, alpha, power, effect, design, looks, boundary, sides)
+            except ValueError as e:
+                return str(e)
+            if result.n_max != result.n_max:
+                return "Sample size not defined for these inputs"
+            return test_type, result
+        return compute
+
+    def _show_sequential_result(self, result):
+        from sample_size import solver
+        test_type, result = result
+        label = solver.TEST_TYPES[test_type].n_label
+        bounds = result.boundaries
+        self.sequential_result.setText(
+            f"Maximum {label}: {result.n_max:.0f} (fixed design {result.n_fixed:.0f}, "
+            f"inflation {float(bounds.inflation):.3f})\n"
+            f"Expected {label}: {result.expected_h1:.1f} with the effect, {result.expected_h0:.1f} without")
+        rows = zip(range(1, len(bounds.fractions) + 1), bounds.fractions, result.n_looks, bounds.upper,
+                   bounds.nominal, bounds.alpha_spent, bounds.stop_h1)
+        self.boundary_table.setRowCount(len(bounds.fractions))
+        for row, values in enumerate(rows):
+            look, fraction, n, upper, nominal, spent, stop = values
+            cells = (f"{look}", f"{fraction:.3f}", f"{n:.0f}", f"{upper:.3f}", f"{nominal:.5f}", f"{spent:.5f}",
+                     f"{stop:.3f}")
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.boundary_table.setItem(row, column, item)
+
+    def _endpoint_effects(self):
+        """Effect sizes typed into the endpoints field, as a tuple (ValueError if they do not parse)."""
+        text = self.endpoints_effects.text().replace(",", " ").split()
+        try:
+            effects = tuple(float(value) for value in text)
+        except ValueError:
+            raise ValueError("Effect sizes must be numbers separated by commas") from None
+        if not any(effects):
+            raise ValueError("Enter at least one nonzero effect size")
+        return effects
+
+    def calc_endpoints_sample(self):
+        self.run_calculation("endpoints")
+
+    def _endpoints_job(self):
+        alpha = self.endpoints_alpha.value()
+        power = self.endpoints_power.value()
+        method = self.endpoints_method.currentText()
+        ratio = self.endpoints_ratio.value()
         try:
-            test_type = self.power_effect_test_type.currentText()
-            alpha = self.power_effect_alpha.value()
-            power = self.power_effect_power.value()
-            n = self.power_effect_n.value()
-            # Get specific inputs
-            groups = self.power_effect_groups.value()
-            predictors = self.power_effect_predictors.value()
-            df = self.power_effect_df.value()
-
-            # Call appropriate statsmodels function
-            # Example for Chi-Square:
-            if "Chi-Square" in test_type:
-                 from statsmodels.stats.power import ChisqTestPower
-                 power_analyzer = ChisqTestPower()
-                 mdes = power_analyzer.solve_power(effect_size=None, nobs=n, alpha=alpha, power=power, ddf=df)
-                 self.power_effect_result.setText(f"Min Detectable Effect (w): {mdes:.3f}")
-            elif "T-Test (Independent)" in test_type:
-                 from statsmodels.stats.power import TTestIndPower
-                 power_analyzer = TTestIndPower()
-                 # Note: nobs1 is sample size in *one* group
-                 mdes = power_analyzer.solve_power(effect_size=None, nobs1=n, alpha=alpha, power=power, ratio=1.0, alternative='two-sided')
-                 self.power_effect_result.setText(f"Min Detectable Effect (d): {mdes:.3f}")
-             # Add other cases
+            effects = self._endpoint_effects()
+        except ValueError as e:
+            return lambda message=str(e): message
+
+        def compute():
+            from sample_size import endpoints
+            return effects, endpoints.sample_size(alpha, power, effects, method, ratio)
+        return compute
+
+    def _show_endpoints_result(self, result):
+        effects, result = result
+        self.endpoints_result.setText(
+            f"{len(effects)} endpoints at α = {float(result.adjusted_alpha):.5f} each: "
+            f"N = {result.n_max:.0f} (group 1) powers every endpoint on its own")
+        self.endpoint_table.setRowCount(len(effects))
+        for row, (effect, n) in enumerate(zip(effects, result.n)):
+            cells = (f"{row + 1}", f"{effect:g}", f"{float(result.adjusted_alpha):.5f}",
+                     "–" if n != n else f"{n:.0f}", "")
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignCenter)
+                self.endpoint_table.setItem(row, column, item)
+
+    def calc_endpoint_sim_sample(self):
+        self.run_calculation("endpoint_sim")
+
+    def _endpoint_sim_job(self):
+        alpha = self.endpoints_alpha.value()
+        power = self.endpoints_power.value()
+        method = self.endpoints_method.currentText()
+        ratio = self.endpoints_ratio.value()
+        corr = self.endpoint_sim_corr.value()
+        goal = self.endpoint_sim_goal.currentText()
+        simulations = self.endpoint_sim_simulations.value()
+        seed = self.endpoint_sim_seed.value() or None
+        try:
+            effects = self._endpoint_effects()
+        except ValueError as e:
+            return lambda message=str(e): message
+
+        def compute():
+            from sample_size import endpoints
+            try:
+                return endpoints.study_sample_size(alpha, power, effects, corr, method, goal, ratio,
+                                                   simulations=simulations, seed=seed)
+            except ValueError as e:
+                return str(e)
+        return compute
+
+    def _show_endpoint_sim_result(self, result):
+        study = result.power
+        if result.n != result.n:
+            self.endpoint_sim_result.setText(f"{result.goal} power not reachable")
+            return
+        self.endpoint_sim_result.setText(
+            f"Study N (group 1): {result.n} for {result.goal.lower()} power {getattr(study, result.goal.lower()):.3f}\n"
+            f"Any: {study.disjunctive:.3f}, all: {study.conjunctive:.3f}, "
+            f"P(false positive): {study.false_positive:.3f} ({study.simulations:,} simulations)")
+        for row, marginal in enumerate(study.marginal[:self.endpoint_table.rowCount()]):
+            item = QTableWidgetItem(f"{marginal:.3f}")
+            item.setTextAlignment(Qt.AlignCenter)
+            self.endpoint_table.setItem(row, len(self.ENDPOINT_COLUMNS) - 1, item)
+
+    def update_exact_inputs(self):
+        one_sample = self.exact_test.currentIndex() == 0
+        self._exact_form.labelForField(self.exact_p1).setText("Null Proportion (p0):" if one_sample else "Proportion, Group 1 (p1):")
+        self._exact_form.labelForField(self.exact_p2).setText("True Proportion (p1):" if one_sample else "Proportion, Group 2 (p2):")
+
+    def calc_exact_sample(self):
+        self.run_calculation("exact")
+
+    def _exact_job(self):
+        test = ("Exact Binomial", "Fisher", "Barnard")[self.exact_test.currentIndex()] # Names used by sample_size.exact
+        alpha = self.exact_alpha.value()
+        power = self.exact_power.value()
+        p1 = self.exact_p1.value()
+        p2 = self.exact_p2.value()
+        tails = self.exact_tails.currentText()
+
+        def compute():
+            from sample_size import exact
+            if p1 == p2:
+                return "The proportions must differ"
+            if test == "Exact Binomial":
+                result = exact.binomial_sample(alpha, power, p1, p2, tails)
             else:
-                 self.power_effect_result.setText("MDES calc pending for this test type")
-
-        except Exception as e:
-            self.power_effect_result.setText(f"Error: {e} (Requires statsmodels)")
+                result = exact.two_sample_sample(test, alpha, power, p1, p2, tails)
+            if result.n != result.n:
+                return "Sample size not reachable"
+            label = "Sample size" if test == "Exact Binomial" else "Sample size per group"
+            total = "" if test == "Exact Binomial" else f" (Total N = {result.n_total:.0f})"
+            return (f"{label}: {result.n:.0f}{total}\n"
+                    f"Exact power {result.power:.3f}, actual α {result.size:.4f}")
+        return compute
+
+    def update_cluster_inputs(self):
+        symbol = "Cohen's d" if self.cluster_groups.value() == 2 else "Cohen's f"
+        self._cluster_form.labelForField(self.cluster_effect).setText(f"Effect Size ({symbol}):")
+
+    def calc_cluster_sample(self):
+        self.run_calculation("cluster")
+
+    def _cluster_job(self):
+        alpha = self.cluster_alpha.value()
+        power = self.cluster_power.value()
+        groups = self.cluster_groups.value()
+        effect = self.cluster_effect.value()
+        icc = self.cluster_icc.value()
+        size = self.cluster_size.value()
+        cv = self.cluster_cv.value()
+        iccs, sizes = self.CLUSTER_ICCS, self.CLUSTER_SIZES
+
+        def compute():
+            from sample_size import correlated
+            if groups == 2:
+                result = correlated.cluster_t_sample(alpha, power, effect, icc, size, cv)
+            else:
+                result = correlated.cluster_anova_sample(alpha, power, effect, groups, icc, size, cv)
+            return result, correlated.table(alpha, power, effect, iccs, sizes, cv, groups).clusters[:, :, 0]
+        return compute
+
+    def _show_cluster_result(self, result):
+        result, clusters = result
+        if result.clusters != result.clusters:
+            self.cluster_result.setText("Sample size not defined for these inputs")
+        else:
+            self.cluster_result.setText(
+                f"Clusters per arm: {result.clusters:.0f} ({result.subjects:.0f} subjects per arm)\n"
+                f"Design effect: {float(result.design_effect):.3f}")
+        for row, values in enumerate(clusters):
+            for column, k in enumerate(values):
+                item = QTableWidgetItem("–" if k != k else f"{k:.0f}")
+                item.setTextAlignment(Qt.AlignCenter)
+                self.cluster_table.setItem(row, column, item)
+
+    def calc_rm_sample(self):
+        self.run_calculation("rm")
+
+    def _rm_job(self):
+        test = self.rm_test.currentText()
+        alpha = self.rm_alpha.value()
+        power = self.rm_power.value()
+        f_effect = self.rm_effect.value()
+        groups = self.rm_groups.value()
+        measures = self.rm_measures.value()
+        corr = self.rm_corr.value()
+        epsilon = self.rm_epsilon.value()
+
+        def compute():
+            from sample_size import correlated
+            if test != "Within" and groups < 2:
+                return f"The {test.lower()} effect needs at least 2 groups"
+            if epsilon < 1 / (measures - 1) - 1e-9:
+                return f"ε must be at least 1 / (measurements - 1) = {1 / (measures - 1):.3f}"
+            n = float(correlated.rm_anova_sample(alpha, power, f_effect, groups, measures, corr, epsilon, test))
+            if n != n:
+                return "Sample size not defined for these inputs"
+            return f"Total sample size: {n:.0f} ({n * measures:.0f} observations)"
+        return compute
+
+    def _survival_design(self):
+        """Inputs shared by the survival panels; dropout as an exponential rate."""
+        import math
+        return dict(alpha=self.survival_alpha.value(), hr=self.survival_hr.value(),
+                    accrual=self.survival_accrual.value(), follow_up=self.survival_follow_up.value(),
+                    dropout=-math.log(1 - self.survival_dropout.value() / 100), ratio=self.survival_ratio.value(),
+                    tails=self.survival_tails.currentText())
+
+    def calc_survival_sample(self):
+        self.run_calculation("survival")
+
+    def _survival_job(self):
+        design = self._survival_design()
+        power = self.survival_power.value()
+        method = self.survival_method.currentText()
+        median = self.survival_median.value()
+
+        def compute():
+            from sample_size import survival
+            if design["hr"] == 1:
+                return "The hazard ratio must differ from 1"
+            result = survival.sample_size(design["alpha"], power, design["hr"], survival.hazard_from_median(median),
+                                          design["accrual"], design["follow_up"], design["dropout"], method,
+                                          design["tails"], design["ratio"])
+            if result.total_n != result.total_n:
+                return "Sample size not defined for these inputs"
+            groups = (f"Group 1: {result.n1:.0f}, Group 2: {result.n2:.0f} (Total N = {result.total_n:.0f})"
+                      if design["ratio"] != 1 else f"Sample size per group: {result.n1:.0f} (Total N = {result.total_n:.0f})")
+            return (f"Events needed: {result.events:.0f}\n{groups}\n"
+                    f"Probability of an observed event: {float(result.event_probability):.3f}")
+        return compute
+
+    def calc_logrank_sim_power(self):
+        self.run_calculation("logrank_sim")
+
+    def _logrank_sim_job(self):
+        design = self._survival_design()
+        power = self.survival_power.value()
+        method = self.survival_method.currentText()
+        median = self.survival_median.value()
+        n = self.logrank_sim_n.value()
+        seed = self.logrank_sim_seed.value() or None
+        try:
+            cuts, hazards = (tuple(float(value) for value in field.text().replace(",", " ").split())
+                             for field in (self.logrank_sim_cuts, self.logrank_sim_hazards))
+        except ValueError:
+            return lambda: "Change times and hazards must be numbers separated by commas"
+
+        def compute():
+            from sample_size import survival
+            if design["hr"] == 1:
+                return "The hazard ratio must differ from 1"
+            n_sim = n or int(survival.sample_size(design["alpha"], power, design["hr"],
+                                                  survival.hazard_from_median(median), design["accrual"],
+                                                  design["follow_up"], design["dropout"], method, design["tails"],
+                                                  design["ratio"]).total_n)
+            try:
+                result = survival.simulate_power(
+                    design["alpha"], n_sim, hazards or float(survival.hazard_from_median(median)), design["hr"],
+                    design["accrual"], design["follow_up"], design["dropout"], cuts, design["ratio"], design["tails"],
+                    seed=seed)
+            except ValueError as e:
+                return str(e)
+            return self._simulation_text(n_sim, result)
+        return compute
+
+    def update_equiv_mean_inputs(self):
+        parallel = self.equiv_mean_design.currentIndex() == 0
+        self.equiv_mean_ratio.setVisible(parallel)
+        self._equiv_mean_form.labelForField(self.equiv_mean_ratio).setVisible(parallel)
+
+    @staticmethod
+    def _equivalence_text(n1, ratio, paired, power):
+        """Result text of the equivalence panels; n1 is group 1 (or pairs), NaN if not reachable."""
+        from sample_size import engine
+        if n1 != n1:
+            return "Sample size not defined: the expected difference must lie inside the margin(s)"
+        if paired:
+            groups = f"Number of pairs: {n1:.0f}"
+        elif ratio == 1:
+            groups = f"Sample size per group: {n1:.0f} (Total N = {2 * n1:.0f})"
+        else:
+            n2 = float(engine.second_group_n(n1, ratio))
+            groups = f"Group 1: {n1:.0f}, Group 2: {n2:.0f} (Total N = {n1 + n2:.0f})"
+        return f"{groups}\nPower: {float(power):.3f}"
+
+    def calc_equiv_mean_sample(self):
+        self.run_calculation("equiv_mean")
+
+    def _equiv_mean_job(self):
+        equivalence = self.equiv_mean_goal.currentIndex() == 1
+        paired = self.equiv_mean_design.currentIndex() == 1
+        alpha = self.equiv_mean_alpha.value()
+        power = self.equiv_mean_power.value()
+        d = self.equiv_mean_diff.value()
+        margin = self.equiv_mean_margin.value()
+        ratio = 1.0 if paired else self.equiv_mean_ratio.value()
+
+        def compute():
+            from sample_size import equivalence as eq
+            if equivalence:
+                n = float(eq.mean_equivalence_sample(alpha, power, d, -margin, margin, ratio, paired))
+                achieved = eq.mean_equivalence_power(alpha, n, d, -margin, margin, ratio, paired)
+            else:
+                n = float(eq.mean_noninferiority_sample(alpha, power, d, margin, ratio, paired))
+                achieved = eq.mean_noninferiority_power(alpha, n, d, margin, ratio, paired)
+            return self._equivalence_text(n, ratio, paired, achieved)
+        return compute
+
+    def calc_equiv_prop_sample(self):
+        self.run_calculation("equiv_prop")
+
+    def _equiv_prop_job(self):
+        equivalence = self.equiv_prop_goal.currentIndex() == 1
+        alpha = self.equiv_prop_alpha.value()
+        power = self.equiv_prop_power.value()
+        p1 = self.equiv_prop_p1.value()
+        p2 = self.equiv_prop_p2.value()
+        margin = self.equiv_prop_margin.value()
+        ratio = self.equiv_prop_ratio.value()
+
+        def compute():
+            from sample_size import equivalence as eq
+            if equivalence:
+                n = float(eq.prop_equivalence_sample(alpha, power, p1, p2, -margin, margin, ratio))
+                achieved = eq.prop_equivalence_power(alpha, n, p1, p2, -margin, margin, ratio)
+            else:
+                n = float(eq.prop_noninferiority_sample(alpha, power, p1, p2, margin, ratio))
+                achieved = eq.prop_noninferiority_power(alpha, n, p1, p2, margin, ratio)
+            return self._equivalence_text(n, ratio, False, achieved)
+        return compute
+
+    def _show_curve_result(self, result):
+        from sample_size import curves
+        spec = curves.TEST_TYPES[result["test_type"]]
+        symbol, n_label = spec.effect_symbol, spec.n_label
+        if result["n"] is not None:
+            self.curve_n_plot.set_curve(*result["n"], f"Sample size ({n_label})")
+            self._curve_keys["n"] = result["n_key"]
+        if result["effect"] is not None:
+            self.curve_effect_plot.set_curve(*result["effect"], f"Effect size ({symbol})")
+            self._curve_keys["effect"] = result["effect_key"]
+        n, effect = result["point"]
+        power = result["power"]
+        self.curve_n_plot.set_marker(n, power)
+        self.curve_effect_plot.set_marker(effect, power)
+        self.curve_n_plot.set_target(result["target"])
+        self.curve_effect_plot.set_target(result["target"])
+        power_text = "N/A" if power != power else f"{power:.3f}"
+        self.curve_result.setText(f"Power at {n_label} = {n}, {symbol} = {effect:g}: {power_text}")
+
+
+STARTUP_BUDGET_S = 1.0 # Target time from import to a visible window
+
+
+def report_startup_profile(calculator, app):
+    """Print the startup milestones once warm-up is done, then quit (used by --profile-startup)."""
+    if not calculator.warm_up_finished.is_set():
+        QTimer.singleShot(10, lambda: report_startup_profile(calculator, app))
+        return
+    calculator.wait_for_calculations() # Don't quit with jobs still on the thread pool
+    print("Startup profile (seconds since import):", file=sys.stderr)
+    for name, seconds in sorted(calculator.startup_times.items(), key=lambda item: item[1]):
+        print(f"  {name:<22} {seconds:7.3f}", file=sys.stderr)
+    shown = calculator.startup_times["window shown"]
+    within = shown <= STARTUP_BUDGET_S
+    print(f"Window shown in {shown:.3f} s: {'within' if within else 'OVER'} the {STARTUP_BUDGET_S:.1f} s budget",
+          file=sys.stderr)
+    app.exit(0 if within else 1)
 
 
 # --- Main Execution Block ---
 if __name__ == "__main__":
+    # Headless batch mode: python sample_size_calculator.py batch input.csv output.csv
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from sample_size import batch
+        sys.exit(batch.main(sys.argv[2:]))
+    # Local HTTP/JSON service: python sample_size_calculator.py serve --port 8765
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from sample_size import server
+        sys.exit(server.main(sys.argv[2:]))
+
+    profile_startup = "--profile-startup" in sys.argv
+    # --trace PATH: record every calculation from the start and save a Chrome trace on exit
+    trace_path = sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv[:-1] else None
+    if trace_path:
+        instrument.enable()
     app = QApplication(sys.argv)
     # Optional: Apply a fusion style for more modern look across platforms
     # app.setStyle('Fusion')
     
     calculator = SampleSizeCalculator()
+    calculator.startup_times["PyQt5 imported"] = _PYQT_IMPORTED
+    if trace_path:
+        calculator.trace_path = trace_path
+        app.aboutToQuit.connect(lambda: instrument.write_chrome_trace(trace_path))
     calculator.show()
+    if profile_startup:
+        QTimer.singleShot(0, lambda: report_startup_profile(calculator, app))
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Cost-optimal allocation: the equal-cost and square-root rules, and brute-force searches over n1."""
+
+import numpy as np
+
+from sample_size import allocation, engine
+
+
+def _smallest_n2(n1, power=0.8, d=0.5):
+    lo, hi = 1, 2000
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if engine.indep_t_power(0.05, n1, d, ratio=mid / n1) >= power:
+            hi = mid
+        else:
+            lo = mid
+    return hi
+
+
+def test_optimal_ratio():
+    np.testing.assert_allclose(allocation.optimal_ratio([1, 4, 9, 1], [1, 1, 1, 4]), [1, 2, 3, 0.5])
+    assert np.isnan(allocation.optimal_ratio([0, -1], 1)).all()
+
+
+def test_equal_costs_give_equal_groups():
+    result = allocation.min_cost(0.05, 0.8, 0.5, 1, 1)
+    assert result.n1 == result.n2 == engine.indep_t_sample(0.05, 0.8, 0.5)
+    result = allocation.max_power(0.05, 128, 0.5, 1, 1)
+    assert result.n1 == result.n2 == 64
+    assert abs(float(result.power) - float(engine.indep_t_power(0.05, 64, 0.5))) < 1e-12
+
+
+def test_min_cost_matches_brute_force():
+    result = allocation.min_cost(0.05, 0.8, 0.5, 4, 1)
+    cheapest = min(4 * n1 + _smallest_n2(n1) for n1 in range(20, 80))
+    assert result.cost == cheapest == 287
+    assert result.power >= 0.8 and 1.5 < result.ratio < 2.5 # sqrt(4 / 1) = 2
+
+
+def test_max_power_matches_brute_force():
+    result = allocation.max_power(0.05, 300, 0.5, 4, 1)
+    best = max(float(engine.indep_t_power(0.05, n1, 0.5, ratio=(300 - 4 * n1) / n1)) for n1 in range(2, 75))
+    assert abs(float(result.power) - best) < 1e-12
+    assert (result.n1, result.n2) == (50, 100) and result.cost <= 300
+
+
+def test_cost_table_broadcasts():
+    cost1 = np.array([1.0, 4.0, 9.0])
+    result = allocation.min_cost(0.05, 0.8, 0.5, cost1[:, None], np.array([1.0, 2.0]))
+    assert result.n1.shape == (3, 2)
+    for i, c1 in enumerate(cost1):
+        for j, c2 in enumerate((1.0, 2.0)):
+            assert result.cost[i, j] == allocation.min_cost(0.05, 0.8, 0.5, c1, c2).cost
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Assurance: the quadrature agrees with plain Monte Carlo over the prior."""
+
+import numpy as np
+
+from sample_size import assurance, solver
+
+
+def _monte_carlo(test_type, alpha, n, prior_mean, prior_sd, design=None, draws=200_000):
+    effect = np.random.default_rng(1).normal(prior_mean, prior_sd, draws)
+    lo, hi = assurance._effect_range(test_type)
+    power = solver.power(test_type, alpha, n, np.clip(effect, lo, hi), design)
+    return power.mean(), power.std() / np.sqrt(draws)
+
+
+def test_quadrature_matches_monte_carlo():
+    for test_type, n, prior_mean, prior_sd, design in (("T-Test (Independent)", 64, 0.5, 0.2, None),
+                                                       ("Correlation (Pearson)", 85, 0.3, 0.15, None),
+                                                       ("Linear Regression", 77, 0.1, 0.1, 3)): # Mass at f2 = 0
+        expected, se = _monte_carlo(test_type, 0.05, n, prior_mean, prior_sd, design)
+        for method in assurance.METHODS:
+            value = assurance.assurance(test_type, 0.05, n, prior_mean, prior_sd, design, method).assurance
+            assert abs(value - expected) < 4 * se + 1e-3, (test_type, method, value, expected)
+
+
+def test_point_prior_is_power():
+    result = assurance.assurance("T-Test (Independent)", 0.05, 64, 0.5, 0.0)
+    assert abs(result.assurance - result.power) < 1e-12
+    assert abs(result.power - 0.8015) < 1e-4
+
+
+def test_sample_size():
+    result = assurance.sample_size("T-Test (Paired)", 0.05, 0.7, 0.5, 0.1)
+    assert isinstance(result.n, float) and isinstance(result.assurance.assurance, float)
+    assert result.assurance.assurance >= 0.7
+    assert assurance.assurance("T-Test (Paired)", 0.05, result.n - 1, 0.5, 0.1).assurance < 0.7
+    # Prior mass at f2 = 0 keeps assurance below 1 - 0.31 * 0.95 = 0.71 however large N is
+    n = assurance.sample_size("Linear Regression", 0.05, [0.6, 0.8], 0.05, 0.1, 3).n
+    assert np.isfinite(n[0]) and np.isnan(n[1])
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Batch mode: every row gets the engine's result, bad rows get NaN without touching the others."""
+
+import csv
+
+import numpy as np
+import pytest
+
+from sample_size import batch, engine
+
+
+def _write(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _results(path):
+    with open(path, newline="") as fh:
+        return list(csv.DictReader(fh))
+
+
+def test_valid_rows(tmp_path):
+    _write(tmp_path / "in.csv", ["test,alpha,power,effect,groups",
+                                 "indep_t,0.05,0.8,0.5,",
+                                 "oneway,0.05,0.8,0.25,3"])
+    rows, _ = batch.run_batch(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    out = _results(tmp_path / "out.csv")
+    n_t, n_anova = engine.indep_t_sample(0.05, 0.8, 0.5), engine.oneway_sample(0.05, 0.8, 0.25, 3)
+    assert rows == 2
+    assert [float(r["n"]) for r in out] == [n_t, n_anova]
+    assert [float(r["n_total"]) for r in out] == [2 * n_t, 3 * n_anova]
+
+
+def test_ragged_row_only_affects_itself(tmp_path):
+    _write(tmp_path / "in.csv", ["test,alpha,power,effect,groups",
+                                 "oneway,0.05,0.8,0.25,3",
+                                 "oneway,0.05,0.8",            # Short: effect and groups missing
+                                 "oneway,0.05,0.8,0.25,3,extra",
+                                 "oneway,0.05,0.8,0.25,3"])
+    batch.run_batch(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    n = [float(r["n"]) for r in _results(tmp_path / "out.csv")]
+    expected = engine.oneway_sample(0.05, 0.8, 0.25, 3)
+    assert n[0] == expected and n[2] == expected and n[3] == expected
+    assert np.isnan(n[1])
+
+
+def test_non_numeric_cell_gives_nan(tmp_path):
+    _write(tmp_path / "in.csv", ["test,alpha,power,effect,tails",
+                                 "indep_t,0.05,0.8,0.5,",
+                                 "indep_t,abc,0.8,0.5,",
+                                 "indep_t,0.05,0.8,0.5,",
+                                 "indep_t,0.05,0.8,0.5,two-sided",  # Not a tails value: NaN, not a one-tailed N
+                                 "pearson,0.05,0.8,0.3,2-sided",
+                                 "indep_t,0.05,0.8,0.5,One-tailed"])
+    rows, _ = batch.run_batch(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"), chunk_size=2)
+    n = [float(r["n"]) for r in _results(tmp_path / "out.csv")]
+    assert rows == 6
+    assert n[0] == 64 and n[2] == 64 and n[5] == 51
+    assert np.isnan(n[1]) and np.isnan(n[3]) and np.isnan(n[4])
+
+
+def test_empty_input(tmp_path):
+    (tmp_path / "in.csv").write_text("")
+    with pytest.raises(ValueError, match="empty"):
+        batch.run_batch(str(tmp_path / "in.csv"), str(tmp_path / "out.csv"))
+    assert not (tmp_path / "out.csv").exists()
+    with pytest.raises(SystemExit) as exit_info:
+        batch.main([str(tmp_path / "in.csv"), str(tmp_path / "out.csv")])
+    assert exit_info.value.code == 1
+
+
+def test_compute_chunk_defaults_and_unknown_tests():
+    columns = {"test": np.array(["indep_t", "indep_t", "nope"]),
+               "alpha": np.array(["0.05", "0.05", "0.05"]),
+               "power": np.array(["0.8", "0.8", "0.8"]),
+               "effect": np.array(["0.5", "0.5", "0.5"]),
+               "tails": np.array(["", engine.ONE_TAILED, ""]),
+               "ratio": np.array(["", "2", ""])}
+    n, n_total = batch.compute_chunk(columns)
+    assert n[0] == engine.indep_t_sample(0.05, 0.8, 0.5) and n_total[0] == 2 * n[0] # Blank tails and ratio
+    assert n[1] == engine.indep_t_sample(0.05, 0.8, 0.5, engine.ONE_TAILED, ratio=2.0)
+    assert n_total[1] == n[1] + 2 * n[1]
+    assert np.isnan(n[2]) and np.isnan(n_total[2])
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Cluster designs and repeated-measures ANOVA against G*Power and the tests they reduce to."""
+
+import numpy as np
+
+from sample_size import correlated, engine
+
+
+def test_design_effect():
+    np.testing.assert_allclose(correlated.design_effect(0.05, [1, 20, 100]), [1.0, 1.95, 5.95])
+    # Eldridge et al. (2006): unequal clusters, cv = 0.5
+    assert abs(correlated.design_effect(0.05, 20, 0.5) - 2.2) < 1e-12
+    assert np.isnan(correlated.design_effect([-0.1, 1.0], 20)).all()
+
+
+def test_cluster_t_sample():
+    # Without an ICC a cluster mean of m subjects is one observation with effect d * sqrt(m)
+    result = correlated.cluster_t_sample(0.05, 0.8, 0.3, 0.0, 10)
+    assert result.clusters == engine.indep_t_sample(0.05, 0.8, 0.3 * np.sqrt(10)) and result.design_effect == 1
+    # Clustering costs about the design effect in subjects (a few more for the cluster-level df)
+    clustered = correlated.cluster_t_sample(0.05, 0.8, 0.3, 0.05, 20)
+    individual = engine.indep_t_sample(0.05, 0.8, 0.3)
+    assert individual * 1.95 <= clustered.subjects <= individual * 1.95 + 2 * 20
+    assert correlated.cluster_t_power(0.05, clustered.clusters, 0.3, 0.05, 20) >= 0.8
+
+
+def test_cluster_table_matches_calls():
+    result = correlated.table(0.05, 0.8, [0.2, 0.4], [0.01, 0.1], [5, 30])
+    assert result.clusters.shape == (2, 2, 2)
+    for i, icc in enumerate((0.01, 0.1)):
+        for j, m in enumerate((5, 30)):
+            for k, d in enumerate((0.2, 0.4)):
+                assert result.clusters[i, j, k] == correlated.cluster_t_sample(0.05, 0.8, d, icc, m).clusters
+
+
+def test_rm_anova_gpower():
+    # G*Power, within factors: f = 0.25, 1 group, 3 measurements, r = 0.5, alpha = 0.05, power 0.8 -> N = 28
+    assert correlated.rm_anova_sample(0.05, 0.8, 0.25, 1, 3, 0.5) == 28
+    powers = correlated.rm_anova_power(0.05, [27, 28], 0.25, 1, 3, 0.5)
+    assert powers[0] < 0.8 <= powers[1]
+    # Nonsphericity needs more subjects
+    assert correlated.rm_anova_sample(0.05, 0.8, 0.25, 1, 3, 0.5, 0.6) > 28
+
+
+def test_two_measures_are_a_paired_t_test():
+    for corr in (0.2, 0.5, 0.8):
+        dz = 2 * 0.25 / np.sqrt(2 * (1 - corr))
+        assert correlated.rm_anova_sample(0.05, 0.8, 0.25, 1, 2, corr) == engine.paired_t_sample(0.05, 0.8, dz)
+
+
+def test_between_effect_is_a_oneway_anova_of_subject_means():
+    for corr in (0.0, 0.5):
+        f_means = 0.25 * np.sqrt(3 / (1 + 2 * corr))
+        np.testing.assert_allclose(correlated.rm_anova_power(0.05, 90, 0.25, 3, 3, corr, effect="Between"),
+                                   engine.oneway_power(0.05, 90, f_means, 3), rtol=1e-12)
+    assert np.isnan(correlated.rm_anova_sample(0.05, 0.8, 0.25, 1, 3, 0.5, effect="Between"))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Multiplicity corrections: per-endpoint alphas, the decisions of every method
+on fixed p-values (as statsmodels' multipletests makes them) and simulated
+study power under independence against its closed form.
+"""
+
+import numpy as np
+from scipy.stats import norm, t
+
+from sample_size import endpoints, engine
+
+# p-values and which of them Bonferroni, Holm, Hochberg and Benjamini-Hochberg reject at alpha = 0.05
+DECISIONS = (
+    ([0.001, 0.02, 0.021, 0.024, 0.3], ([1, 0, 0, 0, 0], [1, 0, 0, 0, 0], [1, 1, 1, 1, 0], [1, 1, 1, 1, 0])),
+    ([0.001, 0.011, 0.016, 0.03, 0.3], ([1, 0, 0, 0, 0], [1, 1, 1, 0, 0], [1, 1, 1, 0, 0], [1, 1, 1, 1, 0])),
+    ([0.3, 0.039, 0.001, 0.011, 0.02], ([0, 0, 1, 0, 0], [0, 0, 1, 1, 0], [0, 0, 1, 1, 0], [0, 1, 1, 1, 1])),
+)
+
+
+def test_adjusted_alpha():
+    effects = [0.5, 0.5, 0, 0, 0]
+    for method in ("Bonferroni", "Holm", "Hochberg"):
+        assert endpoints.adjusted_alpha(method, 0.05, 0.8, effects) == 0.01
+    # Jung (2005): m = 4000 genes, 40 with an effect, FDR 1%, 60% of them found: alpha* = 6.12e-5
+    effects = np.r_[np.ones(40), np.zeros(3960)]
+    assert abs(endpoints.adjusted_alpha("FDR (Benjamini-Hochberg)", 0.01, 0.6, effects) - 6.12e-5) < 1e-7
+    assert endpoints.adjusted_alpha("FDR (Benjamini-Hochberg)", 0.05, 0.8, [0.5, 0.4]) == 0.05 # No nulls
+
+
+def test_decisions():
+    df = 10 ** 6
+    for p, expected in DECISIONS:
+        statistics = t.isf(np.array(p) / 2, df)[None]
+        for method, rejected in zip(endpoints.METHODS, expected):
+            critical = endpoints._critical_values(method, 0.05, len(p), df, engine.TWO_TAILED)
+            np.testing.assert_array_equal(endpoints._rejections(method, statistics, critical)[0], rejected,
+                                          err_msg=f"{method} on {p}")
+
+
+def test_sample_size():
+    result = endpoints.sample_size(0.05, 0.8, [0.5, 0.4, 0, 0, 0])
+    np.testing.assert_array_equal(result.n[:2], engine.indep_t_sample(0.01, 0.8, [0.5, 0.4]))
+    assert np.isnan(result.n[2:]).all() and result.n_max == result.n[1]
+
+
+def test_simulated_power_under_independence():
+    effects = np.array([0.3, 0.4, 0.0])
+    result = endpoints.simulate_power(60, effects, 0.0, 0.05, "Bonferroni", simulations=200_000, seed=1)
+    critical = t.isf(0.05 / 3 / 2, 118)
+    drift = effects * np.sqrt(30)
+    marginal = norm.sf(critical - drift) + norm.cdf(-critical - drift)
+    np.testing.assert_allclose(result.marginal, marginal, atol=4e-3)
+    assert abs(result.disjunctive - (1 - (1 - marginal[0]) * (1 - marginal[1]))) < 4e-3
+    assert abs(result.conjunctive - marginal[0] * marginal[1]) < 4e-3
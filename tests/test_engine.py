@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Engine sample sizes and power against published reference values (Cohen 1988, G*Power)."""
+
+import numpy as np
+import pytest
+
+from sample_size import engine
+
+
+def test_indep_t_sample():
+    assert engine.indep_t_sample(0.05, 0.8, 0.5) == 64
+    np.testing.assert_array_equal(engine.indep_t_sample(0.05, 0.8, [0.2, 0.5, 0.8]), [394, 64, 26])
+    assert engine.indep_t_sample(0.05, 0.8, 0.5, engine.ONE_TAILED) == 51
+    assert engine.indep_t_sample(0.05, 0.8, 0.5, ratio=2.0) == 48
+
+
+def test_paired_and_one_sample_t():
+    assert engine.paired_t_sample(0.05, 0.8, 0.5) == 34
+    assert engine.one_t_sample(0.05, 0.8, 0.5) == 34
+
+
+def test_indep_t_power():
+    assert abs(float(engine.indep_t_power(0.05, 64, 0.5)) - 0.8015) < 1e-4
+
+
+def test_other_tests():
+    assert engine.oneway_sample(0.05, 0.8, 0.25, 3) == 53
+    assert engine.pearson_sample(0.05, 0.8, 0.3) == 85
+    assert engine.logistic_reg_sample(0.05, 0.8, 2.0, 0.3, 0.1) == 87
+    assert engine.chi_ind_sample(0.05, 0.8, 0.3, 4) == 133
+
+
+def test_arrays_match_scalars():
+    d = [0.2, 0.5, 0.8]
+    np.testing.assert_array_equal(engine.indep_t_sample(0.05, 0.8, d), [engine.indep_t_sample(0.05, 0.8, v) for v in d])
+    groups = [2, 3, 5]
+    np.testing.assert_array_equal(engine.oneway_sample(0.05, 0.8, 0.25, groups),
+                                  [engine.oneway_sample(0.05, 0.8, 0.25, k) for k in groups])
+
+
+def test_invalid_inputs_give_nan():
+    assert np.isnan(engine.indep_t_sample(0.05, 0.8, 0.0))
+    assert np.isnan(engine.indep_t_sample(0.05, 1.5, 0.5))
+    assert np.isnan(engine.pearson_sample(0.05, 0.8, 1.0))
+    assert np.isnan(engine.oneway_sample(0.05, 0.8, 0.25, 1))
+
+
+def test_linear_reg_sample_is_exact():
+    # G*Power: f2 = 0.15 with 3 predictors needs N = 77
+    assert engine.linear_reg_sample(0.05, 0.8, 0.15, 3) == 77
+    n = engine.linear_reg_sample(0.05, 0.8, [0.02, 0.15, 0.35], [1, 3, 8])
+    assert (engine.linear_reg_power(0.05, n, [0.02, 0.15, 0.35], [1, 3, 8]) >= 0.8).all()
+    assert (engine.linear_reg_power(0.05, n - 1, [0.02, 0.15, 0.35], [1, 3, 8]) < 0.8).all()
+    assert np.isnan(engine.linear_reg_sample(0.05, 0.8, 0.15, [np.nan, 0, 2.5])).all()
+
+
+def test_tails_must_be_known():
+    # Anything else used to run a one-tailed test silently (51 per group instead of 64)
+    for tails in ("two-sided", "banana", None):
+        with pytest.raises(ValueError):
+            engine.indep_t_sample(0.05, 0.8, 0.5, tails)
+        with pytest.raises(ValueError):
+            engine.pearson_power(0.05, 85, 0.3, tails)
+    tails = np.array([engine.TWO_TAILED, "two-sided", engine.ONE_TAILED])
+    np.testing.assert_array_equal(engine.indep_t_sample(0.05, 0.8, 0.5, tails), [64, np.nan, 51])
+    assert np.isnan(engine.one_t_power(0.05, 34, 0.5, tails)[1])
+    assert np.isnan(engine.pearson_sample(0.05, 0.8, 0.3, tails)[1])
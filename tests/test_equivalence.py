@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""TOST power via Owen's Q against numerical integration and PowerTOST, and the non-inferiority tests."""
+
+import numpy as np
+from scipy import integrate, stats
+
+from sample_size import engine, equivalence
+
+
+def test_owens_q_matches_quad():
+    for df, t, delta, b in ((5, 2.0, 1.0, 3.0), (18, -1.7, -0.5, 2.5), (60, 1.67, 3.0, 20.0)):
+        expected, _ = integrate.quad(lambda x: stats.norm.cdf(t * x / np.sqrt(df) - delta) * stats.chi.pdf(x, df),
+                                     0, b, epsabs=1e-13, limit=200)
+        assert abs(equivalence.owens_q(df, t, delta, 0, b) - expected) < 1e-10
+
+
+def _tost_power_by_quadrature(alpha, n, d, lower, upper):
+    """P(both one-sided t-tests reject), integrating the normal difference over the sample SD."""
+    df, se = 2 * n - 2, np.sqrt(2 / n)
+    crit = stats.t.isf(alpha, df)
+    delta1, delta2 = (d - lower) / se, (d - upper) / se
+
+    def given_sd(x): # x = sqrt(df) * s / sigma
+        v = x / np.sqrt(df)
+        return max(stats.norm.cdf(-crit * v - delta2) - stats.norm.cdf(crit * v - delta1), 0.0) * stats.chi.pdf(x, df)
+    return integrate.quad(given_sd, 0, np.inf, epsabs=1e-13, limit=200)[0]
+
+
+def test_tost_power_matches_quadrature():
+    for n, d, lower, upper in ((10, 0.0, -1.0, 1.0), (25, 0.2, -0.5, 0.8), (60, -0.1, -0.4, 0.4), (8, 0.3, -2.0, 1.0)):
+        expected = _tost_power_by_quadrature(0.05, n, d, lower, upper)
+        assert abs(equivalence.mean_equivalence_power(0.05, n, d, lower, upper) - expected) < 1e-8
+
+
+def test_tost_sample_powertost():
+    # PowerTOST sampleN.TOST for a 2x2 crossover, theta0 = 0.95, limits 0.80-1.25: CV 20% -> N = 20 (power
+    # 0.834680), CV 30% -> N = 40 (0.815845). In SD units of sigma_w / sqrt(2) it is a parallel design of N / 2
+    for cv, n, power in ((0.2, 10, 0.834680), (0.3, 20, 0.815845)):
+        sd = np.sqrt(np.log(1 + cv ** 2) / 2)
+        d, lower, upper = np.log(0.95) / sd, np.log(0.8) / sd, np.log(1.25) / sd
+        assert equivalence.mean_equivalence_sample(0.05, 0.8, d, lower, upper) == n
+        assert abs(equivalence.mean_equivalence_power(0.05, n, d, lower, upper) - power) < 1e-6
+    assert np.isnan(equivalence.mean_equivalence_sample(0.05, 0.8, [0.5, -0.5, 0.0], -0.5, [0.5, 0.5, -0.6])).all()
+
+
+def test_noninferiority_is_a_shifted_t_test():
+    # True difference 0 with margin 0.5 is the one-sided t-test of an effect of 0.5
+    assert equivalence.mean_noninferiority_sample(0.05, 0.8, 0.0, 0.5) == engine.indep_t_sample(
+        0.05, 0.8, 0.5, engine.ONE_TAILED)
+    # Proportions: (z_alpha + z_beta)^2 (0.21 + 0.21) / 0.1^2 = 329.7 and 259.7 per group
+    assert equivalence.prop_noninferiority_sample(0.025, 0.8, 0.7, 0.7, 0.1) == 330
+    assert equivalence.prop_noninferiority_sample(0.05, 0.8, 0.7, 0.7, 0.1) == 260
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Exact-test power against full enumerations with scipy's fisher_exact,
+barnard_exact (pooled, n=200) and binomtest, which take seconds per design.
+"""
+
+import pytest
+
+from sample_size import engine, exact
+
+# (test, n1, n2, p1, p2, tails, power at alpha = 0.05)
+TWO_SAMPLE_POWER = (
+    ("Fisher", 20, 20, 0.2, 0.6, engine.TWO_TAILED, 0.6502249209351988),
+    ("Fisher", 15, 30, 0.1, 0.5, engine.TWO_TAILED, 0.7625381440122609),
+    ("Fisher", 25, 25, 0.3, 0.7, engine.ONE_TAILED, 0.8594585985107851),
+    ("Barnard", 20, 20, 0.2, 0.6, engine.TWO_TAILED, 0.7278621778257174),
+    ("Barnard", 15, 30, 0.1, 0.5, engine.TWO_TAILED, 0.7840762889828038),
+    ("Barnard", 25, 25, 0.3, 0.7, engine.ONE_TAILED, 0.8638567179374289),
+)
+
+
+def test_two_sample_power():
+    for test, n1, n2, p1, p2, tails, power in TWO_SAMPLE_POWER:
+        assert exact.two_sample_power(test, 0.05, n1, p1, p2, tails, n2 / n1) == pytest.approx(power, abs=1e-10)
+
+
+def test_binomial_power():
+    assert exact.binomial_power(0.05, 30, 0.2, 0.45) == pytest.approx(0.864955712252959, abs=1e-10)
+    assert exact.binomial_power(0.05, 50, 0.5, 0.3) == pytest.approx(0.782193222728047, abs=1e-10)
+
+
+def test_two_sample_sample():
+    for args, n in ((("Fisher", 0.05, 0.8, 0.1, 0.3), 69),
+                    (("Barnard", 0.05, 0.8, 0.1, 0.3), 61),
+                    (("Barnard", 0.05, 0.9, 0.1, 0.3, engine.ONE_TAILED, 2.0), 55),
+                    (("Barnard", 0.05, 0.8, 0.05, 0.1), 432)):
+        test, alpha, power, p1, p2, *rest = args
+        result = exact.two_sample_sample(*args)
+        assert result.n == n and result.size <= alpha
+        # Searching from a neighbouring N's critical value gives the same test as starting afresh
+        assert result.power == pytest.approx(exact.two_sample_power(test, alpha, n, p1, p2, *rest), abs=1e-12)
+        assert all(exact.two_sample_power(test, alpha, n - k, p1, p2, *rest) < power
+                   for k in range(1, exact.SAWTOOTH + 1))
+
+
+def test_binomial_sample():
+    result = exact.binomial_sample(0.05, 0.8, 0.2, 0.35)
+    assert result.n == 66 and result.power >= 0.8
+    assert (exact.binomial_power(0.05, list(range(1, 66)), 0.2, 0.35) < 0.8).all()
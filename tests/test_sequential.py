@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Group sequential boundaries against the textbook constants (Jennison & Turnbull 2000, chapter 2)."""
+
+import numpy as np
+
+from sample_size import sequential
+
+
+def test_pocock_constants():
+    for looks, constant in ((2, 2.178), (5, 2.413)):
+        result = sequential.boundaries(0.05, 0.8, looks, "Pocock")
+        np.testing.assert_allclose(result.upper, constant, atol=1e-3)
+
+
+def test_obrien_fleming_constants():
+    result = sequential.boundaries(0.05, 0.8, 2, "O'Brien-Fleming")
+    np.testing.assert_allclose(result.upper, [2.797, 1.977], atol=1e-3)
+    result = sequential.boundaries(0.05, 0.8, 5, "O'Brien-Fleming")
+    np.testing.assert_allclose(result.upper, [4.562, 3.226, 2.634, 2.281, 2.040], atol=1e-3)
+
+
+def test_alpha_is_spent_exactly():
+    for boundary in ("Pocock", "O'Brien-Fleming"):
+        result = sequential.boundaries(0.05, 0.8, 5, boundary)
+        assert abs(float(np.ravel(result.alpha_spent)[-1]) - 0.05) < 1e-9
+
+
+def test_inflation_factors():
+    # Maximum sample size over the fixed design, alpha = 0.05, power 0.8
+    assert abs(float(sequential.boundaries(0.05, 0.8, 5, "Pocock").inflation) - 1.229) < 2e-3
+    assert abs(float(sequential.boundaries(0.05, 0.8, 5, "O'Brien-Fleming").inflation) - 1.028) < 2e-3
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""HTTP service: answers, bad requests (400) and internal errors (500), all as JSON on a live connection."""
+
+import http.client
+import json
+import threading
+
+import pytest
+
+from sample_size import server
+
+
+@pytest.fixture(scope="module")
+def connection():
+    httpd = server.make_server(port=0, workers=2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection(*httpd.server_address[:2], timeout=60)
+    yield conn
+    conn.close()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _post(conn, path, body):
+    conn.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_sample_size(connection):
+    status, result = _post(connection, "/sample_size/indep_t", {"alpha": 0.05, "power": 0.8, "effect": 0.5})
+    assert status == 200 and result == {"n": 64, "n_total": 128}
+    status, result = _post(connection, "/sample_size/indep_t",
+                           {"alpha": 0.05, "power": 0.8, "effect": 0.5, "tails": "One-tailed"})
+    assert status == 200 and result == {"n": 51, "n_total": 102}
+
+
+def test_bad_fields_give_400(connection):
+    for path, body in (
+            ("/factorial", {"alpha": 0.05, "power": 0.8, "f_effect": 0.25, "levels": [2, 2], "max_order": "2"}),
+            ("/factorial", {"alpha": 0.05, "power": 0.8, "f_effect": 0.25, "levels": [2, [2]]}),
+            ("/simulate/linear_reg", {"alpha": 0.05, "n": 50, "f2": 0.15, "predictors": 3, "seed": "abc"}),
+            ("/simulate/linear_reg", {"alpha": 0.05, "n": 50, "f2": 0.15, "predictors": 2.5}),
+            ("/curve", {"test_type": "Chi-Square", "alpha": 0.05, "effect": 0.3, "design": 1, "max": 300,
+                        "points": 10 ** 9}),
+            ("/curve", {"test_type": "Chi-Square", "alpha": 0.05, "effect": 0.3, "design": 1, "max": 1e12}),
+            ("/curve", {"test_type": "Chi-Square", "alpha": 0.05, "x": "effect", "n": 100, "design": 1, "max": 50}),
+            ("/power", {"test_type": "Nope", "alpha": 0.05, "n": 10, "effect": 0.5}),
+            ("/sample_size/nope", {"alpha": 0.05, "power": 0.8, "effect": 0.5}),
+            ("/sample_size/indep_t", {"alpha": "x", "power": 0.8, "effect": 0.5}),
+            ("/sample_size/indep_t", {"power": 0.8, "effect": 0.5}),
+            ("/sample_size/indep_t", {"alpha": 0.05, "power": 0.8, "effect": 0.5, "tails": "two-sided"}),
+            ("/sample_size/pearson", {"alpha": 0.05, "power": 0.8, "effect": 0.3, "tails": "banana"}),
+            ("/sample_size/one_t", {"alpha": 0.05, "power": 0.8, "effect": 0.5, "tails": None}),
+            ("/curve", {"test_type": "Chi-Square", "alpha": 0.05, "effect": 0.3, "design": "abc", "max": 300}),
+            ("/curve", {"test_type": "Chi-Square", "alpha": 0.05, "effect": 0.3, "max": 300}),
+            ("/sequential", {"test_type": "ANOVA (One-way)", "alpha": 0.05, "power": 0.8, "effect": 0.25,
+                             "design": [3]}),
+            ("/sequential", {"test_type": "Chi-Square", "alpha": 0.05, "power": 0.8, "effect": 0.3})):
+        status, result = _post(connection, path, body)
+        assert status == 400, (path, body, result)
+        assert "error" in result
+
+
+def test_unknown_path_gives_404(connection):
+    status, _ = _post(connection, "/nowhere", {})
+    assert status == 404
+
+
+def test_unexpected_error_gives_500(connection, monkeypatch):
+    def fail(body):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(server.CalculationService, "_factorial", staticmethod(fail))
+    status, result = _post(connection, "/factorial", {})
+    assert status == 500 and "boom" in result["error"]
+    # The connection is still usable
+    status, result = _post(connection, "/curve", {"test_type": "Chi-Square", "alpha": 0.05, "effect": 0.3,
+                                                  "design": 1, "max": 300, "points": 5})
+    assert status == 200 and len(result["power"]) == 5
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Simulated N search: odds ratios below 1 and targets out of reach."""
+
+import math
+
+from sample_size import simulation
+
+
+def test_logistic_search_below_one():
+    # An odds ratio of 0.5 is the mirror image of 2: about the same N, and no crash on Hsieh's prior
+    below = simulation.logistic_reg_sample(0.05, 0.8, 0.5, 0.3, seed=1, workers=1, max_simulations=6000)
+    above = simulation.logistic_reg_sample(0.05, 0.8, 2.0, 0.3, seed=1, workers=1, max_simulations=6000)
+    assert below.n_low <= above.n_high and above.n_low <= below.n_high
+
+
+def test_unreachable_target_gives_nan():
+    result = simulation.search_n("linear_reg", 0.8, (0.05, 1e-7, 3, "Normal"), 50, min_n=5, seed=1, workers=1,
+                                 max_n=1000)
+    assert math.isnan(result.n) and math.isnan(result.n_low) and math.isnan(result.power)
+    assert max(n for n, _, _ in result.points) <= 1000
+    result = simulation.search_n("linear_reg", 0.8, (0.05, 1e-7, 3, "Normal"), 50, min_n=5, seed=1, workers=1,
+                                 max_simulations=8000)
+    assert math.isnan(result.n) and result.simulations <= 8000
+    result = simulation.linear_reg_sample(0.05, 0.8, 1e-6, 3, seed=1, workers=1, max_n=2000)
+    assert math.isnan(result.n) and result.simulations == 0
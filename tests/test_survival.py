@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Log-rank events and power: textbook values and input checks."""
+
+import numpy as np
+import pytest
+
+from sample_size import survival
+
+
+def test_events_reference_values():
+    # Schoenfeld, hr = 0.5, alpha = 0.05 two-sided, power 0.8, equal groups: 4 (1.96 + 0.84)^2 / log(2)^2
+    assert survival.events(0.05, 0.8, 0.5) == 66
+    assert survival.events(0.05, 0.8, 0.5, "Freedman") == 71
+
+
+def test_power_inverts_events():
+    for method in survival.METHODS:
+        for ratio in (1.0, 2.0):
+            d = survival.events(0.05, 0.8, 0.7, method, ratio=ratio)
+            assert survival.power(0.05, d, 0.7, method, ratio=ratio) >= 0.8
+            assert survival.power(0.05, d - 1, 0.7, method, ratio=ratio) < 0.8
+
+
+def test_invalid_inputs():
+    for method in survival.METHODS:
+        assert np.isnan(survival.events(0.05, 0.8, [1.0, -0.5, 0.5], method, ratio=[1.0, 1.0, 0.0])).all()
+        assert np.isnan(survival.power(0.05, 100, 0.5, method, ratio=-1.0))
+    with pytest.raises(ValueError):
+        survival.events(0.05, 0.8, 0.5, "Peto")
+    with pytest.raises(ValueError):
+        survival.power(0.05, 100, 0.5, "Peto")
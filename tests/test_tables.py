@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""The noncentrality tables give the same sample sizes as the exact solvers."""
+
+import numpy as np
+import pytest
+
+from sample_size import engine, tables
+
+
+@pytest.fixture(scope="module")
+def small_tables(tmp_path_factory):
+    # A full build takes minutes; a few df cover the same lookup and refinement paths
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(tables, "CHI_DF_MAX", 4)
+        mp.setattr(tables, "ANOVA_DFN_MAX", 3)
+        directory = str(tmp_path_factory.mktemp("tables"))
+        tables.build(directory, report=lambda message: None)
+        yield tables.load(directory)
+    tables.load.cache_clear()
+
+
+def _grid():
+    alpha, power, effect = np.meshgrid([0.01, 0.05, 0.1], [0.7, 0.8, 0.9, 0.95], [0.1, 0.25, 0.4], indexing="ij")
+    return alpha.ravel(), power.ravel(), effect.ravel()
+
+
+def _table_and_exact(monkeypatch, table, solve):
+    monkeypatch.setattr(tables, "load", lambda: table)
+    from_table = solve()
+    monkeypatch.setattr(tables, "load", lambda: None)
+    return from_table, solve()
+
+
+def test_chi_square_matches_exact(monkeypatch, small_tables):
+    alpha, power, w = _grid()
+    for df in (1, 2, 4):
+        from_table, exact = _table_and_exact(monkeypatch, small_tables,
+                                             lambda: engine.chi_ind_sample(alpha, power, w, np.full(w.shape, df)))
+        np.testing.assert_array_equal(from_table, exact)
+
+
+def test_anova_matches_exact(monkeypatch, small_tables):
+    alpha, power, f = _grid()
+    for groups in (2, 3, 4):
+        from_table, exact = _table_and_exact(monkeypatch, small_tables,
+                                             lambda: engine.oneway_sample(alpha, power, f, np.full(f.shape, groups)))
+        np.testing.assert_array_equal(from_table, exact)
+
+
+def test_lookup_covers_the_grid(small_tables):
+    alpha, power, w = _grid()
+    _, _, inside = small_tables.chi_ind_sample(alpha, power, w, np.full(w.shape, 2.0))
+    assert inside.all()
+    _, _, inside = small_tables.chi_ind_sample(alpha, power, w, np.full(w.shape, 5.0))
+    assert not inside.any() # Beyond the built df: left to the exact solver